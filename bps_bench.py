@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Benchmark scenarios for the bps_m05 engine;     #
+#                       each scenario prints its measurements and ex-   #
+#                       -its non-zero when a configured budget is hit   #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import argparse                     # LIBRARY 01:  Parser for command-line options, arguments and subcommands           https://docs.python.org/3/library/argparse.html
+import os                           # LIBRARY 02:  Miscellaneous operating system interfaces                            https://docs.python.org/3/library/os.html
+import socket                       # LIBRARY 03:  low-level networking interface                                       https://github.com/python/cpython/tree/3.13/Lib/socket.py
+import statistics                   # LIBRARY 04:  Mathematical statistics functions                                    https://docs.python.org/3/library/statistics.html
+import subprocess                   # LIBRARY 05:  Subprocess management                                                https://docs.python.org/3/library/subprocess.html
+import sys                          # LIBRARY 06:  System-specific parameters and functions                             https://docs.python.org/3/library/sys.html#module-sys
+import threading                    # LIBRARY 07:  Thread-based parallelism                                             https://github.com/python/cpython/tree/3.13/Lib/threading.py
+import time                         # LIBRARY 08:  Time access and conversions                                          https://docs.python.org/3/library/time.html#module-time
+
+# CONSTANT VARIABLES
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark scenarios for the port scanner")
+    scenarios = parser.add_subparsers(dest="scenario", required=True)
+
+    startup = scenarios.add_parser("startup", help="Import time and single-port CLI wall time of bps_m05")
+    startup.add_argument("--runs", type=int, default=10, help="Number of interpreter launches to sample")
+    startup.add_argument("--budget_ms", type=float, default=60.0, help="Maximum median import time of bps_m05 in milliseconds")
+    startup.add_argument("--csv_path", default="", help="Service CSV passed to the CLI run (empty skips the file)")
+    startup.set_defaults(func=bench_startup)
+
+    backends = scenarios.add_parser("backends", help="Loopback throughput and memory of the asyncio and threads backends")
+    backends.add_argument("--ports", type=int, default=5000, help="Size of the scanned loopback port range")
+    backends.add_argument("--listeners", type=int, default=50, help="Open ports placed inside the range")
+    backends.add_argument("--concurrency", type=int, default=500, help="Probe slots (asyncio) or worker threads (threads)")
+    backends.set_defaults(func=bench_backends)
+
+    timeouts = scenarios.add_parser("timeouts", help="Event-loop CPU per probe for wait_for, asyncio.timeout and the timer wheel")
+    timeouts.add_argument("--probes", type=int, default=50000, help="Concurrent simulated probes per run")
+    timeouts.add_argument("--expire_ratio", type=float, default=0.1, help="Fraction of probes that outlive their deadline")
+    timeouts.set_defaults(func=bench_timeouts)
+
+    services = scenarios.add_parser("services", help="Lookup speed and memory of the per-port dict and the interval service table")
+    services.add_argument("--csv_path", help="IANA service-names CSV to load (default: a synthetic table of similar shape)")
+    services.add_argument("--lookups", type=int, default=500000, help="Random port lookups timed per structure")
+    services.set_defaults(func=bench_services)
+
+    loops = scenarios.add_parser("loops", help="Loopback connects/sec and CPU per probe on the asyncio and uvloop event loops")
+    loops.add_argument("--ports", type=int, default=20000, help="Size of the scanned loopback port range")
+    loops.add_argument("--listeners", type=int, default=50, help="Open ports placed inside the range")
+    loops.add_argument("--concurrency", type=int, default=2000, help="Probe slots")
+    loops.add_argument("--runs", type=int, default=3, help="Scans per loop; the median is reported")
+    loops.add_argument("--banners", action="store_true", help="Also open streams and read banners on open ports")
+    loops.set_defaults(func=bench_loops)
+
+    netsim = scenarios.add_parser("netsim", help="Scheduler throughput and correctness against a simulated network on virtual time")
+    netsim.add_argument("--model", help="JSON network spec (see bps_netsim); default: a synthetic network from the options below")
+    netsim.add_argument("--target", default="10.0.0.0/27", help="Scanned CIDR block or address")
+    netsim.add_argument("--hosts", type=int, default=16, help="Synthetic live hosts at the start of --target")
+    netsim.add_argument("--start_port", type=int, default=1, help="Start of the scanned port range")
+    netsim.add_argument("--end_port", type=int, default=65535, help="End of the scanned port range")
+    netsim.add_argument("--open_ratio", type=float, default=0.002, help="Synthetic share of open ports per host")
+    netsim.add_argument("--filtered_ratio", type=float, default=0.2, help="Synthetic share of filtered ports per host")
+    netsim.add_argument("--rtt", type=float, default=0.05, help="Synthetic median round trip in seconds (varies 0.5-2x per host)")
+    netsim.add_argument("--jitter", type=float, default=0.3, help="Log-normal sigma of each round trip")
+    netsim.add_argument("--loss", type=float, default=0.0, help="Probability a round trip is lost")
+    netsim.add_argument("--tarpits", type=int, default=0, help="Synthetic hosts that accept every port")
+    netsim.add_argument("--seed", type=int, default=4543, help="Seed of the synthetic network")
+    netsim.add_argument("--concurrency", type=int, default=5000, help="Probe slots")
+    netsim.add_argument("--max_hosts", type=int, default=100, help="Hosts scanned at once")
+    netsim.add_argument("--batch_size", type=int, default=5000, help="Ports gathered per batch")
+    netsim.add_argument("--timeout", type=float, default=1.0, help="Connect timeout in (virtual) seconds")
+    netsim.add_argument("--retry_timeouts", action="store_true", help="Run the scanner's retry pass over timed-out ports")
+    netsim.add_argument("--no_port_learning", action="store_true", help="Probe every host in numeric order (no subnet port learning)")
+    netsim.set_defaults(func=bench_netsim)
+    return parser
+
+# DECLARED VARIABLES
+#   VAR 01:         start_listeners
+#   DESCRIPTION:    Opens loopback listeners that accept and immediately close; returns (ports, stop)
+def start_listeners(count, greeting=b""):
+    servers = []
+    for _ in range(count):
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind(("127.0.0.1", 0))
+        s.listen(1024)
+        servers.append(s)
+    stopped = threading.Event()
+
+    def serve(server):
+        server.settimeout(0.2)
+        while not stopped.is_set():
+            try:
+                conn, _ = server.accept()
+            except (socket.timeout, OSError):
+                continue
+            try:
+                if greeting:
+                    conn.sendall(greeting)
+            except OSError:
+                pass
+            conn.close()
+
+    for server in servers:
+        threading.Thread(target=serve, args=(server,), daemon=True).start()
+
+    def stop():
+        stopped.set()
+        for server in servers:
+            server.close()
+
+    return [s.getsockname()[1] for s in servers], stop
+
+#   VAR 02:         measure_import_us
+#   DESCRIPTION:    Cumulative -X importtime of one module in a fresh interpreter, in microseconds
+def measure_import_us(module):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=HERE, capture_output=True, text=True, check=True)
+    for line in reversed(proc.stderr.splitlines()):
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+#   VAR 03:         run_scanner
+#   DESCRIPTION:    Scans one loopback range with a given ScanConfig; returns (open ports, seconds, peak bytes)
+def run_scanner(config, target="127.0.0.1"):
+    import asyncio
+    import tracemalloc
+    from bps_m05 import Scanner
+
+    async def scan():
+        return [result async for result in Scanner(config).scan(target)]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = asyncio.run(scan())
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return len(results), elapsed, peak
+
+#   VAR 04:         report
+#   DESCRIPTION:    Prints one labelled measurement line
+def report(label, value, unit):
+    print(f"{label:<40} {value:>12.2f} {unit}")
+
+# FUNCTIONS
+#   FUNC 01:        bench_startup
+#   DESCRIPTION:    Startup budget for the single-port health-check use case
+def bench_startup(args):
+    import_ms = [measure_import_us("bps_m05") / 1000 for _ in range(args.runs)]
+
+    ports, stop = start_listeners(1)
+    wall_ms = []
+    try:
+        command = [sys.executable, os.path.join(HERE, "bps_m05.py"), "127.0.0.1",
+                   "--start_port", str(ports[0]), "--end_port", str(ports[0]),
+                   "--display", "plain", "--output", "", "--csv_path", args.csv_path]
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=HERE, capture_output=True, check=True)
+            wall_ms.append((time.perf_counter() - start) * 1000)
+    finally:
+        stop()
+
+    report("import bps_m05 (median)", statistics.median(import_ms), "ms")
+    report("single-port CLI wall time (median)", statistics.median(wall_ms), "ms")
+    report("import budget", args.budget_ms, "ms")
+    return 0 if statistics.median(import_ms) <= args.budget_ms else 1
+
+#   FUNC 02:        bench_backends
+#   DESCRIPTION:    Same loopback scan through both engines; closed ports answer with RST immediately
+def bench_backends(args):
+    from bps_m05 import ScanConfig
+    ports, stop = start_listeners(args.listeners)
+    start_port = min(ports)
+    end_port = start_port + args.ports - 1
+    try:
+        for backend in ("asyncio", "threads"):
+            config = ScanConfig(start_port=start_port, end_port=end_port, backend=backend,
+                                max_concurrency=args.concurrency, batch_size=args.concurrency,
+                                banner_timeout=0.2, health_sample=0)
+            found, elapsed, peak = run_scanner(config)
+            report(f"{backend}: ports/sec", args.ports / elapsed, "p/s")
+            report(f"{backend}: peak traced memory", peak / 1024, "KiB")
+            report(f"{backend}: open ports found", found, "")
+    finally:
+        stop()
+    return 0
+
+#   FUNC 03:        bench_timeouts
+#   DESCRIPTION:    Simulated probes that each wrap one awaited operation in a deadline, the way scan_port
+#                   wraps connect and banner reads. "before" is asyncio.wait_for (the pre-wheel code path),
+#                   "after" is the shared TimerWheel; asyncio.timeout is shown for reference.
+def bench_timeouts(args):
+    import asyncio
+    from bps_timers import TimerWheel
+
+    async def run(style):
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel()
+        expire_every = int(1 / args.expire_ratio) if args.expire_ratio else 0
+
+        def finish(future):
+            if not future.done():
+                future.set_result(None)
+
+        async def operation(i):
+            future = loop.create_future()
+            if not (expire_every and i % expire_every == 0):
+                loop.call_later(0.05, finish, future)
+            return await future
+
+        async def probe(i):
+            try:
+                if style == "wait_for":
+                    await asyncio.wait_for(operation(i), 0.2)
+                elif style == "asyncio.timeout":
+                    async with asyncio.timeout(0.2):
+                        await operation(i)
+                else:
+                    async with wheel.timeout(0.2):
+                        await operation(i)
+            except TimeoutError:
+                pass
+
+        await asyncio.gather(*[probe(i) for i in range(args.probes)])
+
+    for style in ("wait_for", "asyncio.timeout", "wheel"):
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        asyncio.run(run(style))
+        cpu = time.process_time() - cpu
+        report(f"{style}: loop CPU per probe", cpu / args.probes * 1e6, "us")
+        report(f"{style}: wall time", time.perf_counter() - wall, "s")
+    return 0
+
+#   FUNC 04:        bench_services
+#   DESCRIPTION:    Loads the same CSV as the old per-port dict (load_port_service_mapping) and as the
+#                   ServiceDatabase interval table, then compares build time, traced memory and the cost
+#                   of one lookup over uniformly random ports (most of which are unregistered)
+def bench_services(args):
+    import random
+    import tempfile
+    import tracemalloc
+    from bps_m05 import ServiceDatabase, load_port_service_mapping
+
+    csv_path = args.csv_path
+    if not csv_path:
+        csv_path = write_synthetic_services(tempfile.mkdtemp())
+
+    def measure(build):
+        tracemalloc.start()
+        start = time.perf_counter()
+        value = build()
+        elapsed = time.perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return value, elapsed, size
+
+    mapping, dict_build, dict_bytes = measure(lambda: load_port_service_mapping(csv_path))
+    services, table_build, table_bytes = measure(lambda: ServiceDatabase.from_csv(csv_path).load())
+    ports = [random.randrange(65536) for _ in range(args.lookups)]
+
+    start = time.perf_counter()
+    for port in ports:
+        mapping.get(port, 'Unknown Service')
+    dict_lookup = (time.perf_counter() - start) / len(ports)
+    lookup = services.lookup
+    start = time.perf_counter()
+    for port in ports:
+        lookup(port)
+    table_lookup = (time.perf_counter() - start) / len(ports)
+
+    report("dict: ports with entries", len(mapping), "")
+    report("dict: build time", dict_build * 1000, "ms")
+    report("dict: traced memory", dict_bytes / 1024, "KiB")
+    report("dict: lookup", dict_lookup * 1e9, "ns")
+    report("intervals: intervals", len(services.starts), "")
+    report("intervals: build time", table_build * 1000, "ms")
+    report("intervals: traced memory", table_bytes / 1024, "KiB")
+    report("intervals: lookup", table_lookup * 1e9, "ns")
+    return 0
+
+#   FUNC 05:        bench_netsim
+#   DESCRIPTION:    Full Scanner run (discovery, batching, semaphore, timer wheel, health breaker, banners)
+#                   against a bps_netsim.SimulatedNetwork on virtual time. Reports wall and virtual time,
+#                   probe rates and the network's counters, and checks the open ports found against the
+#                   model; exits 1 on a mismatch when the model has no loss.
+def bench_netsim(args):
+    import asyncio
+    import json
+    import bps_netsim
+    from bps_m05 import ScanConfig, Scanner
+
+    if args.model:
+        with open(args.model, encoding='utf-8') as file:
+            network = bps_netsim.SimulatedNetwork.from_spec(json.load(file))
+    else:
+        network = bps_netsim.SimulatedNetwork.synthetic(
+            args.target, args.hosts, args.start_port, args.end_port, args.open_ratio, args.filtered_ratio,
+            args.rtt, args.jitter, args.loss, args.tarpits, args.seed)
+    config = ScanConfig(start_port=args.start_port, end_port=args.end_port, timeout=args.timeout,
+                        batch_size=args.batch_size, max_concurrency=args.concurrency, max_hosts=args.max_hosts,
+                        http_paths=('/',),
+                        retry_timeouts=args.retry_timeouts, learn_ports=not args.no_port_learning)
+
+    async def scan():
+        loop = asyncio.get_running_loop()
+        scanner = Scanner(config, semaphore=asyncio.Semaphore(args.concurrency), dns_cache={},
+                          transport=network)
+        started = loop.time()
+        results, seen = [], []
+        async for result in scanner.scan(args.target):
+            results.append(result)
+            seen.append(loop.time() - started)
+        return results, seen, loop.time() - started, scanner
+
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    results, seen, virtual, scanner = bps_netsim.run(scan())
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+
+    found = {(r['Host'], r['Port']) for r in results if not r['Flags']}
+    expected = network.expected_open(args.start_port, args.end_port)
+    tarpits = {host.address for host in network.hosts.values() if host.tarpit}
+    expected = {pair for pair in expected if pair[0] in scanner.host_reports}
+    missing, extra = expected - found, found - expected - {(h, p) for h, p in found if h in tarpits}
+    report("probes", network.probes, "")
+    report("wall time", wall, "s")
+    report("loop CPU per probe", cpu / max(network.probes, 1) * 1e6, "us")
+    report("wall probes/sec", network.probes / wall, "p/s")
+    report("virtual scan time", virtual, "s")
+    report("virtual probes/sec", network.probes / virtual if virtual else 0.0, "p/s")
+    report("open ports found", len(found), "")
+    report("open ports missed", len(missing), "")
+    report("unexpected open ports", len(extra), "")
+    for share in (0.5, 0.9):
+        if seen:
+            report(f"virtual time to {share:.0%} of results", seen[max(int(len(seen) * share) - 1, 0)], "s")
+    spans = {}
+    for result, at in zip(results, seen):
+        first, _ = spans.get(result['Host'], (at, at))
+        spans[result['Host']] = (first, at)
+    if spans:
+        report("per-host first to last result (median)", statistics.median(b - a for a, b in spans.values()), "s")
+    if scanner.retry_probed:
+        report("retry pass: ports re-probed", scanner.retry_probed, "")
+        report("retry pass: flipped to open", scanner.retry_opened, "")
+    for host, health in sorted(scanner.host_reports.items()):
+        if health.state != 'normal':
+            print(f"{host}: {health.state}")
+    print(network.summary())
+    return 1 if (missing or extra) and not network.retransmitted else 0
+
+#   FUNC 06:        bench_loops
+#   DESCRIPTION:    The same loopback scan on each event loop bps_m05 --loop accepts; loops that are not
+#                   installed are reported and skipped. CPU is process time, so it includes the listener
+#                   threads, which do the same work for every loop.
+def bench_loops(args):
+    import asyncio
+    from bps_m05 import ScanConfig, Scanner, event_loop_factory, loop_name
+
+    ports, stop = start_listeners(args.listeners, b"SSH-2.0-bench\r\n")
+    start_port = min(ports)
+    config = ScanConfig(start_port=start_port, end_port=start_port + args.ports - 1, max_concurrency=args.concurrency,
+                        batch_size=args.concurrency, banner_timeout=0.2, health_sample=0, banners=args.banners)
+
+    async def scan():
+        results = [result async for result in Scanner(config).scan("127.0.0.1")]
+        return len(results), loop_name(asyncio.get_running_loop())
+
+    try:
+        for name in ("asyncio", "uvloop"):
+            factory = event_loop_factory(name)
+            if name != "asyncio" and factory is None:
+                print(f"{name}: skipped")
+                continue
+            walls, cpus = [], []
+            for _ in range(args.runs):
+                cpu = time.process_time()
+                wall = time.perf_counter()
+                with asyncio.Runner(loop_factory=factory) as runner:
+                    found, running = runner.run(scan())
+                walls.append(time.perf_counter() - wall)
+                cpus.append(time.process_time() - cpu)
+            wall, cpu = statistics.median(walls), statistics.median(cpus)
+            report(f"{running}: connects/sec", args.ports / wall, "p/s")
+            report(f"{running}: CPU per probe", cpu / args.ports * 1e6, "us")
+            report(f"{running}: open ports found", found, "")
+    finally:
+        stop()
+    return 0
+
+#   VAR 05:         write_synthetic_services
+#   DESCRIPTION:    IANA-shaped CSV: ~6000 single-port TCP rows, aliases on common ports and a few wide
+#                   ranged registrations; returns its path
+def write_synthetic_services(directory):
+    import csv
+    import random
+    rng = random.Random(4543)
+    rows = [(f"svc{port}", str(port)) for port in sorted(rng.sample(range(1, 49152), 6000))]
+    rows += [(f"alias{port}", str(port)) for port in (21, 22, 23, 25, 53, 80, 110, 143, 443, 8080)]
+    rows += [("x11", "6000-6063"), ("dynamic-a", "49152-57343"), ("dynamic-b", "57344-65535"), ("batch", "20000-29999")]
+    path = os.path.join(directory, "service-names.csv")
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Service Name", "Port Number", "Transport Protocol"])
+        writer.writerows((name, port, "tcp") for name, port in rows)
+    return path
+
+if __name__ == "__main__":
+    parsed_args = parse_arguments().parse_args()
+    sys.exit(parsed_args.func(parsed_args))
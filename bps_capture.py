@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Raw response capture: every banner and HTTP     #
+#                       response appended to segment files with an      #
+#                       offset index, read back through mmap            #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# CAPTURE FORMAT (one directory, shared by every scan captured into it), all integers little-endian
+#   segment-NNNNN.bin := record*         (a new segment is started once the current one reaches segment_bytes)
+#   record            := label_len:u16 | label:utf-8 | payload      (zlib/lzma-compressed as a whole when
+#                                                                    that saves space; see entry.codec)
+#   index.bin         := entry*          (fixed 40 bytes, in capture order, so one scan's entries are contiguous)
+#   entry             := scan:u32 | host:4 bytes IPv4 | port:u16 | kind:u8 | codec:u8 | segment:u32
+#                        | offset:u64 | length:u32 | raw_length:u32 | seen:f64
+#   scans.jsonl       := one line per finished scan: id, target, times, [first, end) index entries, sizes
+#   kind 1 'banner' is the bytes read after the generic "\r\n" probe (label empty); kind 2 'http' is one
+#   deep-probe response, headers and all, labelled with its request path. Plugin ports are not captured.
+#   Records reach the segment before their entries reach the index, so the index never points past the
+#   data; a scan that died keeps its entries but has no scans.jsonl line. One writer per directory.
+#
+# USAGE
+#   Record:  bps_m05.py 10.0.0.0/24 --capture captures/ --capture_compression zlib
+#   Browse:  bps_capture.py scans captures/
+#            bps_capture.py show captures/ --scan 3 --port 22
+#            bps_capture.py show captures/ --scan 3 --host 10.0.0.5 --port 80 --raw > response.bin
+#   Replay:  bps_capture.py replay captures/ --scan 3      (banners re-derived by the current parsers)
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import argparse                     # LIBRARY 01:  Parser for command-line options, arguments and subcommands           https://docs.python.org/3/library/argparse.html
+import asyncio                      # LIBRARY 02:  Compression off the event loop in the default executor               https://docs.python.org/3/library/asyncio-eventloop.html
+import json                         # LIBRARY 03:  JSON encoder and decoder                                             https://docs.python.org/3/library/json.html
+import mmap                         # LIBRARY 04:  Memory-mapped segment and index files                                https://docs.python.org/3/library/mmap.html
+import os                           # LIBRARY 05:  Miscellaneous operating system interfaces                            https://docs.python.org/3/library/os.html
+import socket                       # LIBRARY 06:  IPv4 address packing for index entries                               https://github.com/python/cpython/tree/3.13/Lib/socket.py
+import struct                       # LIBRARY 07:  Interpret bytes as packed binary data                                https://docs.python.org/3/library/struct.html
+import sys                          # LIBRARY 08:  System-specific parameters and functions                             https://docs.python.org/3/library/sys.html#module-sys
+import time                         # LIBRARY 09:  Time access and conversions                                          https://docs.python.org/3/library/time.html#module-time
+from collections import namedtuple  # LIBRARY 10:  Lightweight records for decoded index entries                        https://docs.python.org/3/library/collections.html#collections.namedtuple
+
+# DEFERRED MODULES
+#   zlib, lzma                      loaded only when compressing or reading compressed records
+#   bps_m05, bps_http               loaded only by replay
+
+# CONSTANT VARIABLES
+ENTRY = struct.Struct('<I4sHBBIQIId')
+LABEL = struct.Struct('<H')
+SEGMENT_BYTES = 256 * 1024 * 1024
+FLUSH_BYTES = 64 * 1024
+KINDS = {'banner': 1, 'http': 2}
+KIND_NAMES = {code: name for name, code in KINDS.items()}
+CODECS = ('none', 'zlib', 'lzma')
+INDEX_FILE = "index.bin"
+SCANS_FILE = "scans.jsonl"
+
+CaptureEntry = namedtuple('CaptureEntry', 'scan host port kind codec segment offset length raw_length seen')
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Browse and replay raw responses captured with bps_m05 --capture")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scans = commands.add_parser("scans", help="List the scans in a capture directory")
+    scans.add_argument("directory", help="Capture directory written by --capture")
+
+    for name, text in (("show", "Captured records matching every given filter"),
+                       ("replay", "Re-derive banner lines from captured bytes with the current parsers")):
+        command = commands.add_parser(name, help=text)
+        command.add_argument("directory", help="Capture directory written by --capture")
+        command.add_argument("--scan", type=int, help="Scan id (see the scans command)")
+        command.add_argument("--host", help="Host IPv4 address")
+        command.add_argument("--port", type=int, help="Port number")
+        command.add_argument("--kind", choices=sorted(KINDS), help="Record kind")
+        command.add_argument("--limit", type=int, default=0, help="Maximum records (0 for all)")
+        command.add_argument("--format", choices=["plain", "jsonl"], default="plain", help="Output format")
+        if name == "show":
+            command.add_argument("--raw", action="store_true", help="Write the payload bytes themselves to stdout")
+    return parser
+
+# CLASSES
+#   CLASS 01:       CaptureWriter
+#   DESCRIPTION:    Appends one scan's responses to the capture directory. record() is cheap enough for the
+#                   event loop: records are buffered and the index is only written after the segment data
+#                   it points at has been flushed. With compression and a running loop, record() only
+#                   queues the response; a background task compresses the queue in batches in the default
+#                   executor and appends them in capture order, so probes never wait on zlib or lzma.
+#                   Async callers await drain() before close(); close() compresses any leftovers itself.
+class CaptureWriter:
+    def __init__(self, directory, compression='none', target=None, metadata=None, segment_bytes=SEGMENT_BYTES):
+        if compression not in CODECS:
+            raise ValueError(f"compression must be one of {', '.join(CODECS)}, not {compression!r}")
+        os.makedirs(directory, exist_ok=True)
+        self.path = directory
+        self.codec = CODECS.index(compression)
+        self.target = target
+        self.metadata = dict(metadata or {})
+        self.segment_bytes = segment_bytes
+        self.started = time.time()
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self.index_start = repair_index(self.index_path)
+        self.scan_id = next_scan_id(directory, self.index_path, self.index_start)
+        self.index = open(self.index_path, 'ab')
+        segments = segment_numbers(directory)
+        self.segment_number = segments[-1] if segments else 0
+        self.segment = open(segment_path(directory, self.segment_number), 'ab')
+        self.offset = self.segment.tell()
+        self.pending = bytearray()
+        self.queue = []
+        self.inflight = None
+        self.compressing = None
+        self.records = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    #   METHOD 01:      record
+    #   DESCRIPTION:    Appends one response; kind is 'banner' or 'http', label the HTTP request path
+    def record(self, host, port, kind, data, label=''):
+        label = label.encode('utf-8')
+        item = (host, port, kind, LABEL.pack(len(label)) + label + data, len(data), time.time())
+        if not self.codec:
+            self.append(item, item[3], 0)
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.append(item, *pack(self.codec, item[3]))
+            return
+        self.queue.append(item)
+        if self.compressing is None:
+            self.compressing = loop.create_task(self.compress_queue())
+
+    def append(self, item, blob, codec):
+        host, port, kind, _, raw_length, seen = item
+        if self.offset and self.offset + len(blob) > self.segment_bytes:
+            self.roll()
+        self.segment.write(blob)
+        self.pending += ENTRY.pack(self.scan_id, socket.inet_aton(host), port, KINDS[kind], codec,
+                                   self.segment_number, self.offset, len(blob), raw_length, seen)
+        self.offset += len(blob)
+        self.records += 1
+        self.raw_bytes += raw_length
+        self.stored_bytes += len(blob)
+        if len(self.pending) >= FLUSH_BYTES:
+            self.flush()
+
+    async def compress_queue(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self.queue:
+                batch = self.inflight = self.queue
+                self.queue = []
+                packed = await loop.run_in_executor(None, pack_all, self.codec, [item[3] for item in batch])
+                if batch is not self.inflight:
+                    return
+                self.inflight = None
+                for item, (blob, codec) in zip(batch, packed):
+                    self.append(item, blob, codec)
+        finally:
+            self.compressing = None
+
+    #   METHOD 02:      drain
+    #   DESCRIPTION:    Waits until every queued response has been compressed and appended
+    async def drain(self):
+        while self.compressing is not None:
+            await asyncio.shield(self.compressing)
+
+    #   METHOD 03:      flush
+    #   DESCRIPTION:    Segment data first, then the index entries that point into it
+    def flush(self):
+        self.segment.flush()
+        if self.pending:
+            self.index.write(self.pending)
+            self.index.flush()
+            self.pending = bytearray()
+
+    def roll(self):
+        self.flush()
+        self.segment.close()
+        self.segment_number += 1
+        self.segment = open(segment_path(self.path, self.segment_number), 'ab')
+        self.offset = 0
+
+    #   METHOD 04:      close
+    #   DESCRIPTION:    Compresses what drain() did not get to, flushes everything and appends the scan's
+    #                   line to scans.jsonl
+    def close(self):
+        if self.segment.closed:
+            return
+        if self.compressing is not None:
+            self.compressing.cancel()
+        leftovers = (self.inflight or []) + self.queue
+        self.inflight, self.queue = None, []
+        for item in leftovers:
+            self.append(item, *pack(self.codec, item[3]))
+        self.flush()
+        end = self.index.tell() // ENTRY.size
+        self.segment.close()
+        self.index.close()
+        scan = {'scan': self.scan_id, 'target': self.target, 'started': self.started, 'finished': time.time(),
+                'entries': [self.index_start, end], 'records': self.records, 'raw_bytes': self.raw_bytes,
+                'stored_bytes': self.stored_bytes, 'compression': CODECS[self.codec], 'metadata': self.metadata}
+        with open(os.path.join(self.path, SCANS_FILE), 'a', encoding='utf-8') as file:
+            file.write(json.dumps(scan, default=str) + "\n")
+
+    def annotate(self, **fields):
+        self.metadata.update(fields)
+
+    def summary(self):
+        stored = f", {self.stored_bytes} stored" if self.codec else ""
+        return (f"Captured {self.records} responses ({self.raw_bytes} bytes{stored}) to {self.path} "
+                f"as scan {self.scan_id}")
+
+#   CLASS 02:       CaptureReader
+#   DESCRIPTION:    Read-only view of a capture directory. The index and each segment are memory-mapped on
+#                   first use, so looking up one record touches only the pages it lives on. A lookup by
+#                   host and/or port goes through a table keyed on the given (scan, host, port) fields,
+#                   built by one pass over the index the first time that combination is asked for.
+class CaptureReader:
+    def __init__(self, directory):
+        self.path = directory
+        self.maps = {}
+        self.files = []
+        self.tables = {}
+        self.index = self.map(os.path.join(directory, INDEX_FILE))
+        self.count = len(self.index) // ENTRY.size if self.index is not None else 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def map(self, path):
+        try:
+            file = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        self.files.append(file)
+        size = os.fstat(file.fileno()).st_size
+        return mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) if size else None
+
+    #   METHOD 01:      scans
+    #   DESCRIPTION:    Finished scans from scans.jsonl, oldest first
+    def scans(self):
+        try:
+            with open(os.path.join(self.path, SCANS_FILE), encoding='utf-8') as file:
+                return [json.loads(line) for line in file if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    #   METHOD 02:      entries
+    #   DESCRIPTION:    Index entries matching every given filter, in capture order; a host or port filter
+    #                   goes through the keyed table and a scan alone is read from its own range of the
+    #                   index only
+    def entries(self, scan=None, host=None, port=None, kind=None):
+        address = socket.inet_aton(host) if host else None
+        kind = KINDS[kind] if kind else None
+        if address is not None or port is not None:
+            numbers = self.lookup(scan, address, port)
+        else:
+            start, end = 0, self.count
+            if scan is not None:
+                for info in self.scans():
+                    if info['scan'] == scan:
+                        start, end = info['entries']
+                        break
+            numbers = range(start, min(end, self.count))
+        for number in numbers:
+            fields = ENTRY.unpack_from(self.index, number * ENTRY.size)
+            if ((scan is None or fields[0] == scan) and (address is None or fields[1] == address)
+                    and (port is None or fields[2] == port) and (kind is None or fields[3] == kind)):
+                yield CaptureEntry(fields[0], socket.inet_ntoa(fields[1]), fields[2], KIND_NAMES.get(fields[3], '?'),
+                                   *fields[4:])
+
+    #   METHOD 03:      lookup
+    #   DESCRIPTION:    Entry numbers, ascending, whose fields equal every given one of scan, packed host
+    #                   address and port
+    def lookup(self, scan=None, address=None, port=None):
+        given = tuple(field for field, value in enumerate((scan, address, port)) if value is not None)
+        table = self.tables.get(given)
+        if table is None:
+            table = self.tables[given] = {}
+            if self.count:
+                with memoryview(self.index) as view, view[:self.count * ENTRY.size] as entries:
+                    for number, fields in enumerate(ENTRY.iter_unpack(entries)):
+                        table.setdefault(tuple(fields[field] for field in given), []).append(number)
+        return table.get(tuple((scan, address, port)[field] for field in given), ())
+
+    #   METHOD 04:      read
+    #   DESCRIPTION:    (label, payload bytes) of one entry
+    def read(self, entry):
+        segment = self.maps.get(entry.segment)
+        if segment is None:
+            segment = self.maps[entry.segment] = self.map(segment_path(self.path, entry.segment))
+        if segment is None or entry.offset + entry.length > len(segment):
+            raise ValueError(f"segment {entry.segment} does not hold record at offset {entry.offset}")
+        blob = segment[entry.offset:entry.offset + entry.length]
+        if entry.codec:
+            blob = decompress(entry.codec, blob)
+        size, = LABEL.unpack_from(blob)
+        return blob[LABEL.size:LABEL.size + size].decode('utf-8'), blob[LABEL.size + size:]
+
+    def close(self):
+        for segment in self.maps.values():
+            if segment is not None:
+                segment.close()
+        if self.index is not None:
+            self.index.close()
+        for file in self.files:
+            file.close()
+        self.maps = {}
+        self.files = []
+
+# DECLARED VARIABLES
+#   VAR 01:         segment_path / segment_numbers
+#   DESCRIPTION:    Segment file names and the numbers already present in a directory
+def segment_path(directory, number):
+    return os.path.join(directory, f"segment-{number:05d}.bin")
+
+def segment_numbers(directory):
+    return sorted(int(name[8:13]) for name in os.listdir(directory)
+                  if name.startswith("segment-") and name.endswith(".bin") and name[8:13].isdigit())
+
+#   VAR 02:         repair_index
+#   DESCRIPTION:    Drops a partial trailing entry left by a crash; returns the number of whole entries
+def repair_index(path):
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+    if size % ENTRY.size:
+        with open(path, 'r+b') as file:
+            file.truncate(size - size % ENTRY.size)
+    return size // ENTRY.size
+
+#   VAR 03:         next_scan_id
+#   DESCRIPTION:    One past the highest id in scans.jsonl or on the last index entry (a crashed scan has
+#                   entries but no scans.jsonl line)
+def next_scan_id(directory, index_path, count):
+    highest = 0
+    try:
+        with open(os.path.join(directory, SCANS_FILE), encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    highest = max(highest, json.loads(line)['scan'])
+    except FileNotFoundError:
+        pass
+    if count:
+        with open(index_path, 'rb') as file:
+            file.seek((count - 1) * ENTRY.size)
+            highest = max(highest, ENTRY.unpack(file.read(ENTRY.size))[0])
+    return highest + 1
+
+#   VAR 04:         compress / decompress / pack
+#   DESCRIPTION:    Codec 1 is zlib, 2 is lzma; pack keeps a record uncompressed (codec 0) when
+#                   compressing does not make it smaller, pack_all does a whole batch in one executor job
+def compress(codec, data):
+    if codec == 1:
+        import zlib
+        return zlib.compress(data, 6)
+    import lzma
+    return lzma.compress(data)
+
+def decompress(codec, data):
+    if codec == 1:
+        import zlib
+        return zlib.decompress(data)
+    import lzma
+    return lzma.decompress(data)
+
+def pack(codec, blob):
+    packed = compress(codec, blob)
+    return (packed, codec) if len(packed) < len(blob) else (blob, 0)
+
+def pack_all(codec, blobs):
+    return [pack(codec, blob) for blob in blobs]
+
+#   VAR 05:         fingerprint
+#   DESCRIPTION:    Banner line the current scanner code derives from captured bytes
+def fingerprint(kind, label, payload):
+    if kind == 'http':
+        import bps_http
+        parser = bps_http.HttpResponseParser()
+        if not parser.feed(payload):
+            parser.eof()
+        return bps_http.summarize([parser.as_dict(label)] if parser.status else [])
+    from bps_m05 import clean_banner
+    banner = payload.decode('utf-8', errors='ignore').strip()
+    return clean_banner(banner) if banner else 'No banner'
+
+#   VAR 06:         preview
+#   DESCRIPTION:    Printable one-line excerpt of a payload
+def preview(payload, width=100):
+    text = payload[:width].decode('utf-8', errors='backslashreplace')
+    text = text.encode('unicode_escape').decode('ascii')
+    return text + ('...' if len(payload) > width else '')
+
+# FUNCTIONS
+#   FUNC 01:        main
+#   DESCRIPTION:    Dispatches the scans, show and replay commands
+def main(parsed_args):
+    if not os.path.isdir(parsed_args.directory):
+        print(f"Capture directory not found: {parsed_args.directory}")
+        return 1
+    with CaptureReader(parsed_args.directory) as reader:
+        if parsed_args.command == 'scans':
+            for scan in reader.scans():
+                first, end = scan['entries']
+                print(f"{scan['scan']:>6}  {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(scan['started']))}  "
+                      f"{end - first:>8} records  {scan['raw_bytes']:>12} bytes  {scan['compression']:<5} "
+                      f"{scan['target']}")
+            return 0
+
+        count = 0
+        for entry in reader.entries(parsed_args.scan, parsed_args.host, parsed_args.port, parsed_args.kind):
+            if parsed_args.limit and count >= parsed_args.limit:
+                break
+            count += 1
+            try:
+                label, payload = reader.read(entry)
+            except ValueError as e:
+                print(f"{entry.host}:{entry.port}: {e}", file=sys.stderr)
+                continue
+            if parsed_args.command == 'show' and parsed_args.raw:
+                sys.stdout.buffer.write(payload)
+                continue
+            row = {'Scan': entry.scan, 'Host': entry.host, 'Port': entry.port, 'Kind': entry.kind, 'Path': label,
+                   'Seen': entry.seen, 'Bytes': entry.raw_length}
+            if parsed_args.command == 'show':
+                row['Payload'] = preview(payload)
+            else:
+                row['Banner'] = fingerprint(entry.kind, label, payload)
+            if parsed_args.format == 'jsonl':
+                print(json.dumps(row))
+            else:
+                detail = row.get('Payload', row.get('Banner'))
+                print(f"{entry.scan:>6}  {entry.host}:{entry.port}\t{entry.kind}\t{label or '-'}\t"
+                      f"{entry.raw_length}\t{detail}")
+        if parsed_args.format == 'plain' and not getattr(parsed_args, 'raw', False):
+            print(f"{count} records")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(parse_arguments().parse_args()))
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Distributed scanning: a coordinator splits ta-  #
+#                       -rgets into leased work units and merges the    #
+#                       results streamed back by worker nodes           #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# PROTOCOL
+#   Workers connect to the coordinator over TCP; both sides send one JSON object per line.
+#     worker      -> {"type": "hello", "worker": "scan-box-1", "capacity": 4}
+#     coordinator -> {"type": "error", "message": ...}       (malformed hello: the connection is closed)
+#     coordinator -> {"type": "unit", "unit": 12, "target": "10.0.0.5", "start_port": 1, "end_port": 1024,
+#                     "config": {"timeout": 0.5, ...}, "lease": 30.0}                (up to `capacity` at once)
+#     worker      -> {"type": "result", "unit": 12, "Host": ..., "Port": ..., ...}   (as ports are found)
+#     worker      -> {"type": "heartbeat", "units": [12, 13]}                        (every lease / 3 seconds)
+#     worker      -> {"type": "done", "unit": 12, "open": 3}      or {"type": "error", "unit": 12, "message": ...}
+#     coordinator -> {"type": "revoke", "unit": 12}                                  (lease expired elsewhere)
+#     coordinator -> {"type": "finished"}                                            (no work left)
+#   A unit whose lease runs out without a heartbeat, or whose worker disconnects, goes back on the
+#   queue and is handed to the next free worker, up to --max_attempts times. Results are merged by
+#   (Host, Port), so a unit that was partly scanned before being reassigned is not reported twice.
+#   A late "done" from a worker that lost its lease still completes a unit that was reported failed;
+#   one for a unit another worker already finished is logged and dropped (its results were merged).
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import argparse                     # LIBRARY 01:  Parser for command-line options, arguments and subcommands           https://docs.python.org/3/library/argparse.html
+import asyncio                      # LIBRARY 02:  Concurrent programming design for high-performance network queues    https://realpython.com/async-io-python/
+import json                         # LIBRARY 03:  JSON encoder and decoder                                             https://docs.python.org/3/library/json.html
+import socket                       # LIBRARY 04:  low-level networking interface                                       https://github.com/python/cpython/tree/3.13/Lib/socket.py
+import sys                          # LIBRARY 05:  System-specific parameters and functions                             https://docs.python.org/3/library/sys.html#module-sys
+import time                         # LIBRARY 06:  Time access and conversions                                          https://docs.python.org/3/library/time.html#module-time
+from collections import deque       # LIBRARY 07:  Queue of work units waiting to be reassigned                         https://docs.python.org/3/library/collections.html#collections.deque
+
+# SCANNER ENGINE
+from bps_daemon import CONFIG_FIELDS, send, split_host_port
+from bps_m05 import DEFAULT_CSV_PATH, concurrency_value, source_addresses_value, ScanConfig, Scanner, ServiceDatabase
+from bps_sockets import raise_nofile_limit, socket_budget
+from bps_timers import TimerWheel
+
+# CONSTANT VARIABLES
+DEFAULT_ADDRESS = "127.0.0.1:7700"
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Distributed port scanning across worker nodes")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinate = commands.add_parser("coordinate", help="Split targets into work units and serve them to workers")
+    coordinate.add_argument("targets", nargs="+", help="Target IP addresses, hostnames or CIDR ranges")
+    coordinate.add_argument("--listen", default=DEFAULT_ADDRESS, help="HOST:PORT the workers connect to")
+    coordinate.add_argument("--start_port", type=int, default=1, help="Start of port range to scan")
+    coordinate.add_argument("--end_port", type=int, default=1024, help="End of port range to scan")
+    coordinate.add_argument("--unit_ports", type=int, default=1024, help="Ports of one host per work unit")
+    coordinate.add_argument("--timeout", type=float, default=0.5, help="Socket timeout for each port")
+    coordinate.add_argument("--no_banner", action="store_true", help="Workers only check connects")
+    coordinate.add_argument("--lease", type=float, default=30.0, help="Seconds a unit stays assigned without a heartbeat")
+    coordinate.add_argument("--max_attempts", type=int, default=3, help="Assignments of one unit before it is reported failed")
+    coordinate.add_argument("--output", help="Merged results file; the format follows the extension (see bps_m05 --output)")
+
+    work = commands.add_parser("work", help="Connect to a coordinator and scan the units it hands out")
+    work.add_argument("--connect", default=DEFAULT_ADDRESS, help="Coordinator HOST:PORT")
+    work.add_argument("--name", default=socket.gethostname(), help="Worker name shown by the coordinator")
+    work.add_argument("--capacity", type=int, default=4, help="Work units scanned at the same time")
+    work.add_argument("--max_concurrency", type=concurrency_value, default=500, help="Probe slots shared by this worker's units, or 'auto'")
+    work.add_argument("--source_addresses", type=source_addresses_value, default=(), metavar="ADDRS", help="Local IPs or CIDR blocks this worker binds probes to in round-robin order")
+    work.add_argument("--csv_path", default=DEFAULT_CSV_PATH, help="Path to the service names CSV file")
+    return parser
+
+# CLASSES
+#   CLASS 01:       WorkUnit
+#   DESCRIPTION:    One host and port range, with the worker currently holding its lease
+class WorkUnit:
+    def __init__(self, unit_id, target, start_port, end_port):
+        self.unit_id = unit_id
+        self.target = target
+        self.start_port = start_port
+        self.end_port = end_port
+        self.worker = None
+        self.deadline = 0.0
+        self.attempts = 0
+
+#   CLASS 02:       WorkerLink
+#   DESCRIPTION:    Coordinator-side view of one connected worker
+class WorkerLink:
+    def __init__(self, name, writer, capacity):
+        self.name = name
+        self.writer = writer
+        self.capacity = capacity
+        self.units = set()
+        self.completed = 0
+        self.results = 0
+        self.last_seen = time.monotonic()
+
+#   CLASS 03:       Coordinator
+#   DESCRIPTION:    Hands out work units lazily (a /16 sweep is never materialized), tracks leases and
+#                   merges results; serve() returns once every unit is done or has failed
+class Coordinator:
+    def __init__(self, targets, start_port=1, end_port=1024, unit_ports=1024, config=None, lease=30.0,
+                 max_attempts=3, writer=None):
+        self.pending = partition(targets, start_port, end_port, unit_ports)
+        self.exhausted = False
+        self.waiting = deque()
+        self.active = {}
+        self.workers = {}
+        self.config = config or {}
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.writer = writer
+        self.seen = set()
+        self.failed = []
+        self.completed = 0
+        self.reassigned = 0
+        self.next_unit = 1
+        self.finished = asyncio.Event()
+        self.handlers = set()
+        self.address = None
+
+    #   METHOD 01:      serve
+    #   DESCRIPTION:    Accepts workers until all work is finished, then tells them to stop and waits
+    #                   briefly for them to hang up; `address` is the bound HOST:PORT (port 0 picks one)
+    async def serve(self, listen):
+        host, port = split_host_port(listen)
+        server = await asyncio.start_server(self.handle_worker, host, port)
+        host, port = server.sockets[0].getsockname()[:2]
+        self.address = f"{host}:{port}"
+        print(f"Coordinator listening on {self.address}")
+        sweeper = asyncio.create_task(self.sweep_leases())
+        try:
+            async with server:
+                self.check_finished()
+                await self.finished.wait()
+                for link in list(self.workers.values()):
+                    send_line(link.writer, {'type': 'finished'})
+                if self.handlers:
+                    await asyncio.wait(self.handlers, timeout=5.0)
+                for link in list(self.workers.values()):
+                    link.writer.close()
+                if self.handlers:
+                    await asyncio.wait(self.handlers, timeout=1.0)
+        finally:
+            sweeper.cancel()
+
+    #   METHOD 02:      handle_worker
+    #   DESCRIPTION:    Registers a worker, feeds it units and processes its messages; on disconnect its
+    #                   units go back on the queue
+    async def handle_worker(self, reader, writer):
+        link = None
+        handler = asyncio.current_task()
+        self.handlers.add(handler)
+        try:
+            hello = json.loads(await reader.readline() or b"{}")
+            if not isinstance(hello, dict) or hello.get('type') != 'hello':
+                return
+            problem = hello_error(hello)
+            if problem:
+                print(f"Rejected worker: {problem}")
+                send_line(writer, {'type': 'error', 'message': problem})
+                return
+            name = hello.get('worker') or f"worker-{len(self.workers) + 1}"
+            while name in self.workers:
+                name += "+"
+            link = self.workers[name] = WorkerLink(name, writer, hello.get('capacity', 1))
+            print(f"Worker {name} joined (capacity {link.capacity})")
+            self.dispatch()
+            while line := await reader.readline():
+                message = json.loads(line)
+                kind = message.get('type')
+                link.last_seen = time.monotonic()
+                if kind == 'result':
+                    self.merge(link, message)
+                elif kind == 'heartbeat':
+                    deadline = time.monotonic() + self.lease
+                    for unit_id in message.get('units', []):
+                        unit = self.active.get(unit_id)
+                        if unit and unit.worker == name:
+                            unit.deadline = deadline
+                elif kind == 'done':
+                    self.complete(link, message['unit'])
+                elif kind == 'error':
+                    print(f"Worker {name}: unit {message['unit']} failed: {message.get('message')}")
+                    unit = self.active.get(message['unit'])
+                    if unit and unit.worker == name:
+                        link.units.discard(unit.unit_id)
+                        self.requeue(unit)
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError, ValueError):
+            pass
+        finally:
+            self.handlers.discard(handler)
+            writer.close()
+            if link:
+                del self.workers[link.name]
+                lost = [self.active[unit_id] for unit_id in link.units if unit_id in self.active]
+                if lost and not self.finished.is_set():
+                    print(f"Worker {link.name} left; reassigning {len(lost)} units")
+                for unit in lost:
+                    self.requeue(unit)
+                self.dispatch()
+
+    #   METHOD 03:      take_unit
+    #   DESCRIPTION:    Next unit to assign: waiting (mostly reassigned) units first, then fresh ones from
+    #                   the partition
+    def take_unit(self):
+        if self.waiting:
+            return self.waiting.popleft()
+        if self.exhausted:
+            return None
+        try:
+            target, start_port, end_port = next(self.pending)
+        except StopIteration:
+            self.exhausted = True
+            return None
+        unit = WorkUnit(self.next_unit, target, start_port, end_port)
+        self.next_unit += 1
+        return unit
+
+    #   METHOD 04:      dispatch
+    #   DESCRIPTION:    Tops every responsive worker up to its capacity; a worker silent for a whole lease
+    #                   gets nothing new until it speaks again
+    def dispatch(self):
+        now = time.monotonic()
+        for link in self.workers.values():
+            if now - link.last_seen > self.lease:
+                continue
+            while len(link.units) < link.capacity:
+                unit = self.take_unit()
+                if unit is None:
+                    self.check_finished()
+                    return
+                unit.worker = link.name
+                unit.attempts += 1
+                unit.deadline = time.monotonic() + self.lease
+                self.active[unit.unit_id] = unit
+                link.units.add(unit.unit_id)
+                link.writer.write(json.dumps({
+                    'type': 'unit', 'unit': unit.unit_id, 'target': unit.target, 'start_port': unit.start_port,
+                    'end_port': unit.end_port, 'config': self.config, 'lease': self.lease}).encode() + b"\n")
+
+    #   METHOD 05:      requeue
+    #   DESCRIPTION:    Takes a unit away from its worker; it is retried or, past max_attempts, reported failed
+    def requeue(self, unit):
+        self.active.pop(unit.unit_id, None)
+        unit.worker = None
+        if unit.attempts >= self.max_attempts:
+            self.failed.append(unit)
+        else:
+            self.reassigned += 1
+            self.waiting.append(unit)
+
+    #   METHOD 06:      merge
+    #   DESCRIPTION:    Writes a streamed result unless that host and port was already reported
+    def merge(self, link, message):
+        key = (message['Host'], message['Port'])
+        if key in self.seen:
+            return
+        self.seen.add(key)
+        link.results += 1
+        result = {k: v for k, v in message.items() if k not in ('type', 'unit')}
+        print(f"{result['Host']}:{result['Port']}\t{result['Service']}\t{result['Status']}\t{result['Banner']}")
+        if self.writer:
+            self.writer.write(result)
+
+    #   METHOD 07:      complete
+    #   DESCRIPTION:    Records a finished unit, even from a worker whose lease already moved on: a unit
+    #                   waiting for reassignment or already reported failed counts as completed; a second
+    #                   "done" for a unit that is complete is logged and ignored
+    def complete(self, link, unit_id):
+        link.units.discard(unit_id)
+        unit = self.active.pop(unit_id, None)
+        if unit is None:
+            if any(u.unit_id == unit_id for u in self.waiting):
+                self.waiting = deque(u for u in self.waiting if u.unit_id != unit_id)
+            elif any(u.unit_id == unit_id for u in self.failed):
+                self.failed = [u for u in self.failed if u.unit_id != unit_id]
+                print(f"Unit {unit_id} completed by {link.name} after it was reported failed")
+            else:
+                print(f"Ignoring a late 'done' for unit {unit_id} from {link.name}: already completed")
+                self.dispatch()
+                return
+        elif unit.worker and unit.worker != link.name and unit.worker in self.workers:
+            self.workers[unit.worker].units.discard(unit_id)
+            send_line(self.workers[unit.worker].writer, {'type': 'revoke', 'unit': unit_id})
+        self.completed += 1
+        link.completed += 1
+        self.dispatch()
+        self.check_finished()
+
+    #   METHOD 08:      sweep_leases
+    #   DESCRIPTION:    Revokes units whose worker stopped sending heartbeats and reassigns them
+    async def sweep_leases(self):
+        while True:
+            await asyncio.sleep(max(self.lease / 4, 0.1))
+            now = time.monotonic()
+            for unit in [u for u in self.active.values() if u.deadline < now]:
+                link = self.workers.get(unit.worker)
+                print(f"Lease of unit {unit.unit_id} ({unit.target}:{unit.start_port}-{unit.end_port}) "
+                      f"expired on {unit.worker}; reassigning")
+                if link:
+                    link.units.discard(unit.unit_id)
+                    send_line(link.writer, {'type': 'revoke', 'unit': unit.unit_id})
+                self.requeue(unit)
+            self.dispatch()
+            self.check_finished()
+
+    #   METHOD 09:      check_finished
+    #   DESCRIPTION:    Sets `finished` once nothing is queued, assigned or left to partition
+    def check_finished(self):
+        if self.active or self.waiting:
+            return
+        unit = self.take_unit()
+        if unit is None:
+            self.finished.set()
+        else:
+            self.waiting.appendleft(unit)
+
+    #   METHOD 10:      summary
+    #   DESCRIPTION:    Closing report: units, reassignments, failures and per-worker totals
+    def summary(self):
+        lines = [f"{self.completed} units completed, {self.reassigned} reassigned, {len(self.failed)} failed, "
+                 f"{len(self.seen)} open ports"]
+        for unit in self.failed:
+            lines.append(f"  failed: {unit.target}:{unit.start_port}-{unit.end_port} after {unit.attempts} attempts")
+        return "\n".join(lines)
+
+#   CLASS 04:       ClusterWorker
+#   DESCRIPTION:    Runs units from one coordinator on a single loop; all units share this machine's
+#                   probe budget, timer wheel and hostname cache
+class ClusterWorker:
+    def __init__(self, name, services, capacity=4, max_concurrency=500, source_addresses=()):
+        self.name = name
+        self.services = services
+        self.capacity = capacity
+        self.source_addresses = tuple(source_addresses)
+        self.budget = socket_budget(max_concurrency, len(self.source_addresses) or 1)
+        self.semaphore = None
+        self.wheel = TimerWheel()
+        self.dns_cache = {}
+        self.tasks = {}
+        self.completed = 0
+
+    #   METHOD 01:      run
+    #   DESCRIPTION:    Works until the coordinator sends "finished" or the connection drops; returns
+    #                   the number of units this worker completed
+    async def run(self, address):
+        self.services.load()
+        self.semaphore = asyncio.Semaphore(self.budget.limit)
+        reader, writer = await asyncio.open_connection(*split_host_port(address))
+        await send(writer, {'type': 'hello', 'worker': self.name, 'capacity': self.capacity})
+        heartbeat = None
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                kind = message.get('type')
+                if kind == 'unit':
+                    if heartbeat is None:
+                        heartbeat = asyncio.create_task(self.heartbeat(writer, message['lease'] / 3))
+                    task = asyncio.create_task(self.run_unit(message, writer))
+                    self.tasks[message['unit']] = task
+                elif kind == 'revoke':
+                    task = self.tasks.pop(message['unit'], None)
+                    if task:
+                        task.cancel()
+                elif kind == 'error':
+                    print(f"Coordinator refused this worker: {message.get('message')}")
+                    break
+                elif kind == 'finished':
+                    break
+        finally:
+            if heartbeat:
+                heartbeat.cancel()
+            for task in self.tasks.values():
+                task.cancel()
+            writer.close()
+        return self.completed
+
+    #   METHOD 02:      heartbeat
+    #   DESCRIPTION:    Renews the leases of every unit still running
+    async def heartbeat(self, writer, interval):
+        while True:
+            await asyncio.sleep(interval)
+            await send(writer, {'type': 'heartbeat', 'units': list(self.tasks)})
+
+    #   METHOD 03:      run_unit
+    #   DESCRIPTION:    Scans one unit and streams its results
+    async def run_unit(self, message, writer):
+        unit_id = message['unit']
+        try:
+            settings = {k: v for k, v in message.get('config', {}).items() if k in CONFIG_FIELDS}
+            config = ScanConfig(**{**settings, 'start_port': message['start_port'], 'end_port': message['end_port'],
+                                   'source_addresses': self.source_addresses})
+            scanner = Scanner(config, self.services, self.semaphore, None, self.dns_cache, self.wheel)
+            found = 0
+            async for result in scanner.scan(message['target']):
+                found += 1
+                await send(writer, {'type': 'result', 'unit': unit_id, **result})
+            await send(writer, {'type': 'done', 'unit': unit_id, 'open': found})
+            self.completed += 1
+        except (socket.gaierror, ValueError, OSError) as e:
+            await send(writer, {'type': 'error', 'unit': unit_id, 'message': f"{type(e).__name__}: {e}"})
+        finally:
+            self.tasks.pop(unit_id, None)
+
+# DECLARED VARIABLES
+#   VAR 01:         partition
+#   DESCRIPTION:    Lazily yields (host, start_port, end_port) work units; CIDR ranges are expanded
+#                   to their hosts here, hostnames are left for the worker to resolve in its own zone
+def partition(targets, start_port, end_port, unit_ports):
+    import ipaddress
+    unit_ports = max(unit_ports, 1)
+    for target in targets:
+        try:
+            hosts = (str(ip) for ip in ipaddress.ip_network(target, strict=False).hosts())
+        except ValueError:
+            hosts = [target]
+        for host in hosts:
+            for low in range(start_port, end_port + 1, unit_ports):
+                yield host, low, min(low + unit_ports - 1, end_port)
+
+#   VAR 02:         send_line
+#   DESCRIPTION:    Queues one JSON line without waiting for the peer to drain it
+def send_line(writer, message):
+    if not writer.is_closing():
+        writer.write(json.dumps(message).encode() + b"\n")
+
+#   VAR 03:         hello_error
+#   DESCRIPTION:    Why a worker's hello cannot be accepted, or None: the name must be a string and the
+#                   capacity a positive integer
+def hello_error(hello):
+    name, capacity = hello.get('worker'), hello.get('capacity', 1)
+    if name is not None and not isinstance(name, str):
+        return f"Field worker must be of type str, not {type(name).__name__}"
+    if isinstance(capacity, bool) or not isinstance(capacity, int):
+        return f"Field capacity must be of type int, not {type(capacity).__name__}"
+    if capacity < 1:
+        return "Field capacity must be at least 1"
+    return None
+
+# FUNCTIONS
+#   FUNC 01:        coordinate
+#   DESCRIPTION:    Command-line coordinator
+async def coordinate(parsed_args):
+    writer = None
+    if parsed_args.output:
+        from bps_writers import open_writer
+        writer = open_writer(parsed_args.output, metadata={'targets': parsed_args.targets,
+                                                           'start_port': parsed_args.start_port,
+                                                           'end_port': parsed_args.end_port})
+    config = {'timeout': parsed_args.timeout, 'banners': not parsed_args.no_banner}
+    coordinator = Coordinator(parsed_args.targets, parsed_args.start_port, parsed_args.end_port,
+                              parsed_args.unit_ports, config, parsed_args.lease, parsed_args.max_attempts, writer)
+    start_time = time.time()
+    try:
+        await coordinator.serve(parsed_args.listen)
+    finally:
+        if writer:
+            writer.close()
+    print(coordinator.summary())
+    if writer:
+        print(f"Merged results logged to {writer.path} ({writer.rows_written} rows)")
+    print(f"Distributed scan completed in {time.time() - start_time:.2f} seconds.")
+    return 1 if coordinator.failed else 0
+
+#   FUNC 02:        work
+#   DESCRIPTION:    Command-line worker
+async def work(parsed_args):
+    worker = ClusterWorker(parsed_args.name, ServiceDatabase.from_csv(parsed_args.csv_path),
+                           parsed_args.capacity, parsed_args.max_concurrency, parsed_args.source_addresses)
+    try:
+        completed = await worker.run(parsed_args.connect)
+    except (ConnectionRefusedError, ConnectionResetError) as e:
+        print(f"Lost the coordinator at {parsed_args.connect}: {e}")
+        return 1
+    print(f"Worker {parsed_args.name} completed {completed} units.")
+    return 0
+
+#   FUNC 03:        main
+#   DESCRIPTION:    Dispatches the coordinate and work commands
+def main(parsed_args):
+    command = coordinate if parsed_args.command == 'coordinate' else work
+    if command is work:
+        raise_nofile_limit()
+    try:
+        return asyncio.run(command(parsed_args))
+    except KeyboardInterrupt:
+        return 130
+
+if __name__ == "__main__":
+    sys.exit(main(parse_arguments().parse_args()))
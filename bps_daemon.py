@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Long-running scan daemon: accepts jobs over a   #
+#                       local socket, runs them on one shared loop and  #
+#                       streams results back as JSON lines              #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# PROTOCOL
+#   Each request is one JSON object per line; a connection may send several requests in turn.
+#     {"op": "scan", "target": "10.0.0.5", "start_port": 1, "end_port": 1024, "weight": 1, ...}
+#         -> {"type": "accepted", "job": 7}
+#         -> {"type": "result", "job": 7, "Host": ..., "Port": ..., "Service": ..., "Status": ..., "Banner": ...}
+#         -> {"type": "done", "job": 7, "open": 3, "elapsed": 0.42}      or {"type": "error", "job": 7, "message": ...}
+#     {"op": "status"}
+#         -> {"type": "status", "capacity": 500, "in_use": 12, "jobs": [{"job": 7, "target": ..., "in_flight": 12, ...}]}
+#   Any ScanConfig field may be given in a scan request; unknown fields and values of the wrong type are
+#   rejected with an error reply. Tuple fields take a JSON list or the command-line comma syntax
+#   (host_weights as [["10.0.0.0/24", 2], ...] or "10.0.0.0/24=2"). Jobs always run on the asyncio
+#   backend: the threads backend would bypass the daemon's shared probe budget.
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import argparse                     # LIBRARY 01:  Parser for command-line options, arguments and subcommands           https://docs.python.org/3/library/argparse.html
+import asyncio                      # LIBRARY 02:  Concurrent programming design for high-performance network queues    https://realpython.com/async-io-python/
+import dataclasses                  # LIBRARY 03:  Field introspection of ScanConfig for request validation             https://docs.python.org/3/library/dataclasses.html
+import json                         # LIBRARY 04:  JSON encoder and decoder                                             https://docs.python.org/3/library/json.html
+import os                           # LIBRARY 05:  Miscellaneous operating system interfaces                            https://docs.python.org/3/library/os.html
+import socket                       # LIBRARY 06:  low-level networking interface                                       https://github.com/python/cpython/tree/3.13/Lib/socket.py
+import sys                          # LIBRARY 07:  System-specific parameters and functions                             https://docs.python.org/3/library/sys.html#module-sys
+import time                         # LIBRARY 08:  Time access and conversions                                          https://docs.python.org/3/library/time.html#module-time
+
+# SCANNER ENGINE
+from bps_m05 import DEFAULT_CSV_PATH, FairShareLimiter, concurrency_value, ScanConfig, Scanner, ServiceDatabase
+from bps_m05 import host_weights_value, paths_value, ports_value, source_addresses_value
+from bps_logging import LogPipeline
+from bps_sockets import raise_nofile_limit, socket_budget
+
+# CONSTANT VARIABLES
+DEFAULT_SOCKET_PATH = "/tmp/bps_daemon.sock"
+CONFIG_FIELDS = {f.name: f.type for f in dataclasses.fields(ScanConfig)}
+TUPLE_PARSERS = {'source_addresses': source_addresses_value, 'http_ports': ports_value, 'http_paths': paths_value,
+                 'host_weights': host_weights_value}
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Port scanner daemon with a local job queue")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the daemon")
+    serve.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket path to listen on")
+    serve.add_argument("--listen", help="Listen on HOST:PORT over TCP instead of a Unix socket")
+    serve.add_argument("--csv_path", default=DEFAULT_CSV_PATH, help="Path to the service names CSV file")
+    serve.add_argument("--max_concurrency", type=concurrency_value, default=500, help="Probe slots shared fairly by all running jobs, or 'auto'")
+    serve.add_argument("--max_hosts", type=int, default=100, help="Hosts scanned concurrently across all jobs")
+    serve.add_argument("--dns_ttl", type=float, default=300.0, help="Seconds before cached hostname lookups are dropped")
+    serve.add_argument("--log_level", choices=["debug", "info", "warning", "error"], default="warning", help="Lowest diagnostic level written to stderr or --log_file")
+    serve.add_argument("--log_file", help="Write diagnostics to this file instead of stderr")
+
+    submit = commands.add_parser("submit", help="Submit one scan job and print its results")
+    submit.add_argument("target", help="Target IP address, hostname, or CIDR range to scan")
+    submit.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket path of the daemon")
+    submit.add_argument("--connect", help="Daemon HOST:PORT when it listens over TCP")
+    submit.add_argument("--start_port", type=int, default=1, help="Start of port range to scan")
+    submit.add_argument("--end_port", type=int, default=1024, help="End of port range to scan")
+    submit.add_argument("--timeout", type=float, default=0.5, help="Socket timeout for each port")
+    submit.add_argument("--weight", type=float, default=1, help="Relative share of the daemon's probe slots")
+
+    status = commands.add_parser("status", help="Print the daemon's running jobs")
+    status.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket path of the daemon")
+    status.add_argument("--connect", help="Daemon HOST:PORT when it listens over TCP")
+    return parser
+
+# DECLARED VARIABLES
+#   VAR 01:         split_host_port
+#   DESCRIPTION:    Parses HOST:PORT command-line values
+def split_host_port(value):
+    host, _, port = value.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+#   CLASS 01:       ScanDaemon
+#   DESCRIPTION:    Owns the state that stays warm between jobs: service database, plugins,
+#                   hostname cache and the fair-share connection budget
+class ScanDaemon:
+    def __init__(self, services, max_concurrency=500, max_hosts=100, dns_ttl=300.0):
+        self.services = services
+        self.budget = socket_budget(max_concurrency)
+        self.limiter = FairShareLimiter(self.budget.limit)
+        self.host_semaphore = asyncio.Semaphore(max_hosts)
+        self.dns_cache = {}
+        self.dns_ttl = dns_ttl
+        self.jobs = {}
+        self.next_job = 1
+
+    #   METHOD 01:      serve
+    #   DESCRIPTION:    Listens on a Unix socket (or TCP address) until cancelled
+    async def serve(self, socket_path=None, listen=None):
+        self.services.load()
+        print(self.budget.summary())
+        if listen:
+            host, port = split_host_port(listen)
+            server = await asyncio.start_server(self.handle_client, host, port)
+        else:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            server = await asyncio.start_unix_server(self.handle_client, socket_path)
+        cache_sweeper = asyncio.create_task(self.expire_dns_cache())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            cache_sweeper.cancel()
+            if not listen and os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    #   METHOD 02:      expire_dns_cache
+    #   DESCRIPTION:    Drops cached hostname lookups every dns_ttl seconds
+    async def expire_dns_cache(self):
+        while True:
+            await asyncio.sleep(self.dns_ttl)
+            self.dns_cache.clear()
+
+    #   METHOD 03:      handle_client
+    #   DESCRIPTION:    Reads JSON-line requests from one client and answers them in order
+    async def handle_client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    await send(writer, {'type': 'error', 'message': f"Invalid JSON: {e}"})
+                    continue
+                if not isinstance(request, dict):
+                    await send(writer, {'type': 'error', 'message': "A request must be a JSON object"})
+                    continue
+                op = request.pop('op', 'scan')
+                if op == 'scan':
+                    await self.run_job(request, writer)
+                elif op == 'status':
+                    await send(writer, self.status())
+                else:
+                    await send(writer, {'type': 'error', 'message': f"Unknown op: {op}"})
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    #   METHOD 04:      run_job
+    #   DESCRIPTION:    Runs one scan job on the shared loop and streams its results to the client
+    async def run_job(self, request, writer):
+        job_id = self.next_job
+        self.next_job += 1
+        target = request.pop('target', None)
+        weight = request.pop('weight', 1)
+        try:
+            if not isinstance(target, str) or not target:
+                raise ValueError("A target is required")
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not weight > 0:
+                raise ValueError("The weight must be a positive number")
+            config = job_config(request)
+        except ValueError as e:
+            await send(writer, {'type': 'error', 'job': job_id, 'message': str(e)})
+            return
+
+        share = self.limiter.share(job_id, weight)
+        scanner = Scanner(config, self.services, share, self.host_semaphore, self.dns_cache)
+        job = {'job': job_id, 'target': target, 'weight': weight, 'open': 0, 'started': time.time(), 'share': share}
+        self.jobs[job_id] = job
+        try:
+            await send(writer, {'type': 'accepted', 'job': job_id})
+            async for result in scanner.scan(target):
+                job['open'] += 1
+                await send(writer, {'type': 'result', 'job': job_id, **result})
+            await send(writer, {'type': 'done', 'job': job_id, 'open': job['open'],
+                                'elapsed': round(time.time() - job['started'], 3)})
+        except (socket.gaierror, ValueError) as e:
+            await send(writer, {'type': 'error', 'job': job_id, 'message': str(e)})
+        finally:
+            del self.jobs[job_id]
+            self.limiter.remove(share)
+
+    #   METHOD 05:      status
+    #   DESCRIPTION:    Snapshot of the connection budget and running jobs
+    def status(self):
+        return {
+            'type': 'status',
+            'capacity': self.limiter.capacity,
+            'in_use': self.limiter.in_use,
+            'jobs': [{'job': j['job'], 'target': j['target'], 'weight': j['weight'], 'open': j['open'],
+                      'in_flight': j['share'].in_flight, 'waiting': len(j['share'].waiters),
+                      'running_for': round(time.time() - j['started'], 3)} for j in self.jobs.values()]
+        }
+
+#   VAR 02:         send
+#   DESCRIPTION:    Writes one JSON line and waits for the client to drain it
+async def send(writer, message):
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+#   VAR 03:         open_daemon
+#   DESCRIPTION:    Connects to a daemon over its Unix socket or TCP address
+async def open_daemon(socket_path=None, connect=None):
+    if connect:
+        return await asyncio.open_connection(*split_host_port(connect))
+    return await asyncio.open_unix_connection(socket_path)
+
+#   VAR 04:         request_lines
+#   DESCRIPTION:    Async iterator of decoded replies to one request, ending at its final reply
+async def request_lines(request, socket_path=None, connect=None):
+    reader, writer = await open_daemon(socket_path, connect)
+    try:
+        await send(writer, request)
+        while line := await reader.readline():
+            reply = json.loads(line)
+            yield reply
+            if reply['type'] in ('done', 'error', 'status'):
+                break
+    finally:
+        writer.close()
+
+#   VAR 05:         job_config
+#   DESCRIPTION:    ScanConfig for the fields of a scan request; raises ValueError naming the first unknown
+#                   field or badly typed value
+def job_config(request):
+    unknown = set(request) - set(CONFIG_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {sorted(unknown)}")
+    fields = {}
+    for name, value in request.items():
+        expected = CONFIG_FIELDS[name]
+        if expected is tuple:
+            value = tuple_field(name, value)
+        elif expected is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        elif type(value) is not expected:
+            raise ValueError(f"Field {name} must be of type {expected.__name__}, not {type(value).__name__}")
+        fields[name] = value
+    if fields.get('backend', 'asyncio') != 'asyncio':
+        raise ValueError("Only the asyncio backend is available: it shares the daemon's probe budget")
+    return ScanConfig(**fields)
+
+#   VAR 06:         tuple_field
+#   DESCRIPTION:    Parses a tuple field given as a JSON list or in the command-line comma syntax
+def tuple_field(name, value):
+    try:
+        text = value
+        if isinstance(value, list):
+            if name == 'host_weights':
+                text = ",".join(f"{network}={weight}" for network, weight in value)
+            else:
+                text = ",".join(str(item) for item in value)
+        if not isinstance(text, str):
+            raise TypeError
+        return TUPLE_PARSERS[name](text)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for {name}: {json.dumps(value)}") from None
+
+# FUNCTIONS
+#   FUNC 01:        submit
+#   DESCRIPTION:    Command-line client for one scan job
+async def submit(parsed_args):
+    request = {'op': 'scan', 'target': parsed_args.target, 'start_port': parsed_args.start_port,
+               'end_port': parsed_args.end_port, 'timeout': parsed_args.timeout, 'weight': parsed_args.weight}
+    async for reply in request_lines(request, parsed_args.socket, parsed_args.connect):
+        if reply['type'] == 'result':
+            print(f"{reply['Host']}:{reply['Port']}\t{reply['Service']}\t{reply['Status']}\t{reply['Banner']}")
+        elif reply['type'] == 'done':
+            print(f"Job {reply['job']} completed: {reply['open']} open ports in {reply['elapsed']:.2f} seconds.")
+        elif reply['type'] == 'error':
+            print(f"Job failed: {reply['message']}")
+            return 1
+    return 0
+
+#   FUNC 02:        show_status
+#   DESCRIPTION:    Command-line client for the status request
+async def show_status(parsed_args):
+    async for reply in request_lines({'op': 'status'}, parsed_args.socket, parsed_args.connect):
+        print(json.dumps(reply, indent=2))
+    return 0
+
+#   FUNC 03:        main
+#   DESCRIPTION:    Dispatches the serve, submit and status commands
+def main(parsed_args):
+    if parsed_args.command == 'serve':
+        raise_nofile_limit()
+        daemon = ScanDaemon(ServiceDatabase.from_csv(parsed_args.csv_path), parsed_args.max_concurrency,
+                            parsed_args.max_hosts, parsed_args.dns_ttl)
+        try:
+            with LogPipeline(parsed_args.log_level, parsed_args.log_file):
+                asyncio.run(daemon.serve(parsed_args.socket, parsed_args.listen))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if parsed_args.command == 'submit':
+        return asyncio.run(submit(parsed_args))
+    return asyncio.run(show_status(parsed_args))
+
+if __name__ == "__main__":
+    sys.exit(main(parse_arguments().parse_args()))
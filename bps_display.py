@@ -0,0 +1,138 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Live scan display: open ports as they are fo-   #
+#                       -und plus a progress line (ports/sec, ETA) re-  #
+#                       -drawn at a fixed frame rate                    #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import asyncio                      # LIBRARY 01:  Concurrent programming design for high-performance network queues    https://realpython.com/async-io-python/
+import shutil                       # LIBRARY 02:  Terminal width for the progress line                                 https://docs.python.org/3/library/shutil.html
+import sys                          # LIBRARY 03:  System-specific parameters and functions                             https://docs.python.org/3/library/sys.html#module-sys
+import time                         # LIBRARY 04:  Time access and conversions                                          https://docs.python.org/3/library/time.html#module-time
+from collections import deque       # LIBRARY 05:  Sliding window of progress samples for the ports/sec rate            https://docs.python.org/3/library/collections.html#collections.deque
+
+# CONSTANT VARIABLES
+CLEAR_LINE = "\r\x1b[K"
+RATE_WINDOW = 2.0
+
+# CLASSES
+#   CLASS 01:       LiveDisplay
+#   DESCRIPTION:    Async context manager wrapped around a scan. add() only queues a result; a frame task
+#                   writes queued results and the progress line in one write every 1/fps seconds. When
+#                   the stream is not a TTY, results are streamed as plain lines and a progress line goes
+#                   to stderr every progress_interval seconds instead of being redrawn in place.
+class LiveDisplay:
+    def __init__(self, scanner, stream=None, fps=10, progress_interval=5.0):
+        self.scanner = scanner
+        self.stream = stream or sys.stdout
+        self.tty = self.stream.isatty()
+        self.interval = 1 / fps
+        self.progress_interval = progress_interval
+        self.pending = []
+        self.found = 0
+        self.samples = deque()
+        self.started = 0.0
+        self.last_progress = 0.0
+        self.task = None
+
+    async def __aenter__(self):
+        self.started = self.last_progress = time.monotonic()
+        self.task = asyncio.create_task(self.run())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.frame(final=True)
+
+    #   METHOD 01:      add
+    #   DESCRIPTION:    Queues one open-port result for the next frame
+    def add(self, result):
+        self.pending.append(result)
+        self.found += 1
+
+    #   METHOD 02:      run
+    #   DESCRIPTION:    Frame loop
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.frame()
+
+    #   METHOD 03:      rate
+    #   DESCRIPTION:    Ports per second over the last RATE_WINDOW seconds (since the start on the first frame)
+    def rate(self, now, done):
+        samples = self.samples
+        samples.append((now, done))
+        while len(samples) > 2 and now - samples[1][0] >= RATE_WINDOW:
+            samples.popleft()
+        then, done_then = samples[0]
+        if now - then <= 0:
+            then, done_then = self.started, 0
+        return (done - done_then) / (now - then) if now > then else 0.0
+
+    #   METHOD 04:      status
+    #   DESCRIPTION:    Progress line: completed/total ports, percent, ports/sec, ETA, open ports, hosts (how many
+    #                   are still running and the least complete of them)
+    def status(self, now):
+        done, total = self.scanner.ports_done, self.scanner.ports_total
+        rate = self.rate(now, done)
+        percent = done / total * 100 if total else 0.0
+        if rate > 0 and total > done:
+            eta = format_seconds((total - done) / rate)
+        elif total and done >= total:
+            eta = "done"
+        else:
+            eta = "--:--"
+        line = (f"[{done}/{total} ports {percent:5.1f}%] {rate:,.0f} ports/s  ETA {eta}  "
+                f"open {self.found}  elapsed {format_seconds(now - self.started)}")
+        hosts = len(self.scanner.host_reports)
+        if hosts > 1:
+            line += f"  hosts {hosts}"
+            active = self.scanner.host_progress(active=True)
+            if len(active) > 1:
+                slowest = active[0]
+                percent = slowest['done'] / slowest['planned'] * 100 if slowest['planned'] else 100.0
+                line += f" ({len(active)} active, slowest {slowest['host']} {percent:.0f}%)"
+        return line
+
+    #   METHOD 05:      frame
+    #   DESCRIPTION:    Writes queued results above the progress line, then redraws it
+    def frame(self, final=False):
+        now = time.monotonic()
+        out = [CLEAR_LINE] if self.tty else []
+        out.extend(f"{r['Host']}:{r['Port']}\t{r['Service']}\t{r['Status']}\t{r['Banner']}\n" for r in self.pending)
+        self.pending.clear()
+        if self.tty:
+            width = shutil.get_terminal_size().columns - 1
+            out.append(self.status(now)[:width])
+            if final:
+                out.append("\n")
+        if out:
+            self.stream.write("".join(out))
+            self.stream.flush()
+        if not self.tty and (final or now - self.last_progress >= self.progress_interval):
+            self.last_progress = now
+            print(self.status(now), file=sys.stderr, flush=True)
+
+# DECLARED VARIABLES
+#   VAR 01:         format_seconds
+#   DESCRIPTION:    H:MM:SS (or M:SS under an hour)
+def format_seconds(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
@@ -0,0 +1,270 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            HTTP deep probe: incremental response parsing   #
+#                       (status, headers, <title>) and several paths    #
+#                       fetched over one keep-alive connection          #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# FRAMING AND REUSE
+#   A connection is reused for the next path only when the response body was framed (Content-Length or
+#   chunked, or no body at all: HEAD, 1xx, 204, 304), fully drained within MAX_DRAIN bytes, and the server
+#   kept the connection open (HTTP/1.1 without "Connection: close", or HTTP/1.0 with keep-alive).
+#   Otherwise parsing stops as soon as the title is found (or TITLE_WINDOW bytes of body went by) and the
+#   next path gets a fresh connection. Only the first TITLE_WINDOW bytes of a body are kept in memory.
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import html                         # LIBRARY 01:  Entity decoding for page titles                                      https://docs.python.org/3/library/html.html
+import re                           # LIBRARY 02:  Regular expression operations                                        https://docs.python.org/3/library/re.html
+
+# CONSTANT VARIABLES
+MAX_HEADER = 16384
+MAX_DRAIN = 65536
+TITLE_WINDOW = 16384
+TITLE_PATTERN = re.compile(rb"<title[^>]*>(.*?)</title", re.IGNORECASE | re.DOTALL)
+STATUS_PATTERN = re.compile(rb"HTTP/(\d)\.(\d) +(\d{3})(?: +(.*))?")
+
+# CLASSES
+#   CLASS 01:       HttpResponseParser
+#   DESCRIPTION:    Push parser: feed() bytes as they arrive until `done`; fields are usable as soon as
+#                   they are parsed. State goes status -> headers -> body (length, chunked or until-close)
+#                   -> done. `reusable` says whether the connection may carry the next request.
+class HttpResponseParser:
+    def __init__(self, method='GET'):
+        self.method = method
+        self.state = 'status'
+        self.buffer = bytearray()
+        self.version = None
+        self.status = None
+        self.reason = ''
+        self.headers = {}
+        self.title = None
+        self.body = bytearray()
+        self.body_bytes = 0
+        self.remaining = 0
+        self.chunked = False
+        self.framed = True
+        self.reusable = False
+
+    @property
+    def done(self):
+        return self.state in ('done', 'error')
+
+    #   METHOD 01:      feed
+    #   DESCRIPTION:    Consumes one read; returns True once the response is finished (or unparseable)
+    def feed(self, data):
+        self.buffer += data
+        while not self.done:
+            if self.state in ('status', 'headers'):
+                end = self.buffer.find(b"\r\n")
+                if end < 0:
+                    if len(self.buffer) > MAX_HEADER:
+                        self.state = 'error'
+                    break
+                line = bytes(self.buffer[:end])
+                del self.buffer[:end + 2]
+                if self.state == 'status':
+                    self.parse_status(line)
+                else:
+                    self.parse_header(line)
+            elif self.state == 'body':
+                self.take_body()
+                break
+            elif self.state == 'chunk_size':
+                end = self.buffer.find(b"\r\n")
+                if end < 0:
+                    break
+                size = self.buffer[:end].split(b";")[0].strip()
+                del self.buffer[:end + 2]
+                try:
+                    self.remaining = int(size, 16)
+                except ValueError:
+                    self.state = 'error'
+                    break
+                self.state = 'chunk_data' if self.remaining else 'trailer'
+            elif self.state == 'chunk_data':
+                self.take_body()
+                if self.state == 'chunk_data':
+                    if self.remaining:
+                        break
+                    self.state = 'chunk_end'
+            elif self.state == 'chunk_end':
+                if len(self.buffer) < 2:
+                    break
+                del self.buffer[:2]
+                self.state = 'chunk_size'
+            elif self.state == 'trailer':
+                end = self.buffer.find(b"\r\n")
+                if end < 0:
+                    break
+                del self.buffer[:end + 2]
+                if end == 0:
+                    self.finish()
+        return self.done
+
+    #   METHOD 02:      eof
+    #   DESCRIPTION:    The server closed the connection; an until-close body ends here
+    def eof(self):
+        if self.state == 'body' and not self.framed:
+            self.state = 'done'
+        elif not self.done:
+            self.state = 'error'
+        self.reusable = False
+
+    def parse_status(self, line):
+        match = STATUS_PATTERN.match(line)
+        if not match:
+            self.state = 'error'
+            return
+        major, minor, status, reason = match.groups()
+        self.version = (int(major), int(minor))
+        self.status = int(status)
+        self.reason = (reason or b"").decode('latin-1').strip()
+        self.state = 'headers'
+
+    def parse_header(self, line):
+        if line:
+            name, _, value = line.partition(b":")
+            self.headers.setdefault(name.strip().lower().decode('latin-1'), value.strip().decode('latin-1'))
+            return
+        if 100 <= self.status < 200:
+            self.state = 'status'
+            self.headers = {}
+            return
+        connection = self.headers.get('connection', '').lower()
+        self.reusable = ('close' not in connection) if self.version >= (1, 1) else ('keep-alive' in connection)
+        if self.method == 'HEAD' or self.status in (204, 304):
+            self.finish()
+        elif 'chunked' in self.headers.get('transfer-encoding', '').lower():
+            self.chunked = True
+            self.state = 'chunk_size'
+        elif self.headers.get('content-length', '').isdigit():
+            self.remaining = int(self.headers['content-length'])
+            if self.remaining:
+                self.state = 'body'
+            else:
+                self.finish()
+        else:
+            self.framed = False
+            self.reusable = False
+            self.state = 'body'
+
+    #   METHOD 03:      take_body
+    #   DESCRIPTION:    Moves body bytes out of the buffer, keeping only the title window
+    def take_body(self):
+        take = len(self.buffer) if not self.framed else min(len(self.buffer), self.remaining)
+        if take == 0:
+            return
+        if self.title is None and len(self.body) < TITLE_WINDOW:
+            self.body += self.buffer[:min(take, TITLE_WINDOW - len(self.body))]
+            match = TITLE_PATTERN.search(self.body)
+            if match:
+                self.title = " ".join(html.unescape(match.group(1).decode('utf-8', 'replace')).split())
+        del self.buffer[:take]
+        self.body_bytes += take
+        if self.framed:
+            self.remaining -= take
+            if not self.remaining and not self.chunked:
+                self.finish()
+        if not self.done and (self.body_bytes > MAX_DRAIN or (not self.framed and self.title_settled())):
+            self.reusable = False
+            self.state = 'done'
+
+    def title_settled(self):
+        return self.title is not None or len(self.body) >= TITLE_WINDOW
+
+    def finish(self):
+        self.state = 'done'
+        if self.buffer:
+            self.reusable = False
+
+    #   METHOD 04:      as_dict
+    #   DESCRIPTION:    Structured fields stored with the scan result
+    def as_dict(self, path):
+        return {
+            'path': path,
+            'status': self.status,
+            'reason': self.reason,
+            'server': self.headers.get('server'),
+            'content_type': self.headers.get('content-type'),
+            'location': self.headers.get('location'),
+            'title': self.title,
+            'length': self.body_bytes,
+        }
+
+# DECLARED VARIABLES
+#   VAR 01:         build_request
+#   DESCRIPTION:    Minimal keep-alive GET request
+def build_request(host, port, path, method='GET'):
+    authority = host if port == 80 else f"{host}:{port}"
+    return (f"{method} {path} HTTP/1.1\r\nHost: {authority}\r\nUser-Agent: bps-scanner\r\n"
+            f"Accept: */*\r\nConnection: keep-alive\r\n\r\n").encode('ascii', 'ignore')
+
+#   VAR 02:         fetch_paths
+#   DESCRIPTION:    Requests each path in turn, appending a page dict to `pages` per response, reusing the
+#                   connection while the server allows it and calling connect() for a new one when it does
+#                   not. Every request runs inside a fresh deadline(); close(writer) is awaited for every
+#                   connection given up, including the one in use when an error escapes (pages fetched so
+#                   far stay in `pages`). Returns the writer still open, or None. Stops at the first
+#                   response that is not HTTP. With `capture`, capture(path, raw bytes) receives each
+#                   complete response as read from the wire. With `unparsed` (a bytearray), the bytes read
+#                   before the first status line parsed are appended to it as they arrive, so a caller can
+#                   still report what a non-HTTP service sent, even if the read then timed out.
+async def fetch_paths(host, port, paths, pages, reader, writer, connect, close, deadline, capture=None, unparsed=None):
+    try:
+        for path in paths:
+            if writer is None:
+                reader, writer = await connect()
+            parser = HttpResponseParser()
+            raw = bytearray() if capture else None
+            async with deadline():
+                writer.write(build_request(host, port, path))
+                await writer.drain()
+                while not parser.done:
+                    data = await reader.read(4096)
+                    if not data:
+                        parser.eof()
+                        break
+                    if capture:
+                        raw += data
+                    if unparsed is not None and parser.status is None and not pages:
+                        unparsed += data
+                    parser.feed(data)
+            if parser.status is None:
+                break
+            pages.append(parser.as_dict(path))
+            if capture:
+                capture(path, bytes(raw))
+            if not parser.reusable:
+                await close(writer)
+                reader = writer = None
+    except BaseException:
+        if writer:
+            await close(writer)
+        raise
+    return writer
+
+#   VAR 03:         summarize
+#   DESCRIPTION:    One-line banner for the first page: "HTTP 200 OK | nginx/1.24 | Welcome"
+def summarize(pages):
+    if not pages:
+        return 'No banner'
+    page = pages[0]
+    parts = [f"HTTP {page['status']} {page['reason']}".rstrip()]
+    if page['server']:
+        parts.append(page['server'])
+    if page['title']:
+        parts.append(page['title'])
+    elif page['location']:
+        parts.append(f"-> {page['location']}")
+    return " | ".join(parts)
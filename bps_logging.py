@@ -0,0 +1,120 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Diagnostics pipeline for the scanner: leveled   #
+#                       records sampled per message, queued by the ev-  #
+#                       -ent loop and written by a listener thread      #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# PIPELINE
+#   logger "bps.*" --> SamplingFilter --> LoopQueueHandler --> SimpleQueue --> QueueListener thread --> stderr/file
+#   The loop thread only builds the LogRecord, bumps a counter and puts it on the queue; %-formatting,
+#   tracebacks and the blocking write happen on the listener thread. Records are sampled per message
+#   template (the unformatted msg), so "%s:%d connection timed out" for 65,000 ports prints the first
+#   `sample_limit` lines and a single count line at shutdown.
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import logging                      # LIBRARY 01:  Logging facility for Python                                          https://docs.python.org/3/library/logging.html
+import logging.handlers             # LIBRARY 02:  QueueHandler and QueueListener                                       https://docs.python.org/3/library/logging.handlers.html
+import queue                        # LIBRARY 03:  Thread-safe queue between the loop and the listener                  https://docs.python.org/3/library/queue.html
+import sys                          # LIBRARY 04:  System-specific parameters and functions                             https://docs.python.org/3/library/sys.html#module-sys
+
+# CONSTANT VARIABLES
+LOGGER_NAME = "bps"
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+LEVELS = {'debug': logging.DEBUG, 'info': logging.INFO, 'warning': logging.WARNING, 'error': logging.ERROR}
+
+# CLASSES
+#   CLASS 01:       SamplingFilter
+#   DESCRIPTION:    Passes the first `limit` records of each (level, message template) and counts the rest;
+#                   a limit of 0 passes everything
+class SamplingFilter(logging.Filter):
+    def __init__(self, limit=20):
+        super().__init__()
+        self.limit = limit
+        self.counts = {}
+
+    def filter(self, record):
+        key = (record.levelno, record.msg)
+        count = self.counts.get(key, 0) + 1
+        self.counts[key] = count
+        return not self.limit or count <= self.limit
+
+    #   METHOD 01:      suppressed
+    #   DESCRIPTION:    (level, template, total, dropped) for every template that went over the limit
+    def suppressed(self):
+        if not self.limit:
+            return []
+        return [(level, msg, count, count - self.limit)
+                for (level, msg), count in self.counts.items() if count > self.limit]
+
+#   CLASS 02:       LoopQueueHandler
+#   DESCRIPTION:    QueueHandler that enqueues the record untouched. The stock prepare() formats the message
+#                   and traceback on the calling thread so the record can be pickled; this queue never
+#                   leaves the process, so that work is left to the listener thread.
+class LoopQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        return record
+
+#   CLASS 03:       LogPipeline
+#   DESCRIPTION:    Installs the queue handler on the "bps" logger and runs the listener thread; use as a
+#                   context manager or call start()/stop()
+class LogPipeline:
+    def __init__(self, level='warning', log_file=None, sample_limit=20):
+        self.level = LEVELS.get(level, level)
+        self.log_file = log_file
+        self.sampler = SamplingFilter(sample_limit)
+        self.output = None
+        self.handler = None
+        self.listener = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    #   METHOD 01:      start
+    #   DESCRIPTION:    Routes "bps" records through the queue; they no longer propagate to the root logger
+    def start(self):
+        if self.log_file:
+            self.output = logging.FileHandler(self.log_file, encoding='utf-8')
+        else:
+            self.output = logging.StreamHandler(sys.stderr)
+        self.output.setFormatter(logging.Formatter(LOG_FORMAT))
+        records = queue.SimpleQueue()
+        self.handler = LoopQueueHandler(records)
+        self.handler.addFilter(self.sampler)
+        self.listener = logging.handlers.QueueListener(records, self.output)
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.setLevel(self.level)
+        logger.addHandler(self.handler)
+        logger.propagate = False
+        self.listener.start()
+
+    #   METHOD 02:      stop
+    #   DESCRIPTION:    Drains the queue, writes the suppressed-message counts and detaches the handler
+    def stop(self):
+        if self.listener is None:
+            return
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.removeHandler(self.handler)
+        logger.propagate = True
+        self.listener.stop()
+        for level, msg, total, dropped in self.sampler.suppressed():
+            self.output.handle(logging.LogRecord(
+                LOGGER_NAME, level, __file__, 0, "%d of %d similar messages suppressed: %s",
+                (dropped, total, msg), None))
+        self.output.close()
+        self.listener = None
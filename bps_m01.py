@@ -30,10 +30,6 @@ parser = argparse.ArgumentParser(description = "Basic Port Scanner")
 parser.add_argument("target", help = "Target IP address or hostname to scan")                           # param1   Sets the target IP address to scan and explains functionality when help() is called
 parser.add_argument("--start_port", type = int, default = 1, help = "Start of port range to scan")      # param2   Sets the starting port range to scan based on IP address in param1 
 parser.add_argument("--end_port", type = int, default = 1024, help = "End of port range to scan")       # param2   Sets the ending port range to scan based on IP address in param1 
-args = parser.parse_args()                                                                              # Runs the parser and places the extracted data in a argparse.Namespace object (see: ArgumentParser.parse_args())
-target = args.target                                                                                    # Initializes "target" as a constant object
-start_port = args.start_port                                                                            # Initializes "start_port" ... 
-end_port = args.end_port                                                                                # Initializes "end_port" ... 
 
 
 # VARIABLES
@@ -89,6 +85,10 @@ def port_scan(target, start_port, end_port):
 #   FUNC 01:        Scanner Function
 #   DESCRIPTION:    HandleS IP or hostname resolution
 if __name__ == "__main__":                                                                              # Checks whether the scanner is being ran directly
+    args = parser.parse_args()                                                                          #   Runs the parser only when executed directly so the module can be imported without side effects
+    target = args.target                                                                                #   Initializes "target" as a constant object
+    start_port = args.start_port                                                                        #   Initializes "start_port" ...
+    end_port = args.end_port                                                                            #   Initializes "end_port" ...
     try:                                                                                                #   Beginning of try-catch for nature of code execution
         target_ip = socket.gethostbyname(target)                                                        #       Attempts to resolve scan target and convert hostname to its corresponding IP address
     except socket.gaierror:                                                                             #   Catches unresolvable hostnames
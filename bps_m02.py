@@ -31,6 +31,7 @@ from tabulate import tabulate       # LIBRARY 08:  Displays results in a table w
 from colorama import Fore, Style    # LIBRARY 09:  Use colors to highlight open ports or errors                        https://github.com/tartley/colorama
 import colorama                     # LIBRARY 10:  Import colorama                                                     https://github.com/tartley/colorama
 import re                           # LIBRARY 11:  For regular expressions to clean banner                             https://github.com/python/cpython/tree/3.13/Lib/re/
+from itertools import islice        # LIBRARY 12:  Functions creating iterators for efficient looping                  https://docs.python.org/3/library/itertools.html
 
 # CONSTANTS
 parser = argparse.ArgumentParser(description = "Basic Port Scanner")                                                                                # The description of the custom argument/command line
@@ -38,10 +39,8 @@ parser.add_argument("target", help = "Target IP address or hostname to scan")
 parser.add_argument("--start_port", type = int, default = 1, help = "Start of port range to scan")                                                  # param2   Sets the starting port range to scan based on IP address in param1 
 parser.add_argument("--end_port", type = int, default = 1024, help = "End of port range to scan")                                                   # param2   Sets the ending port range to scan based on IP address in param1 
 parser.add_argument("--csv_path", default = "/home/kali/Desktop/service-names-port-numbers.csv", help = "Path to the service names CSV file")       # param3   Sets the preferred directory for scanning criteria
-args = parser.parse_args()                                                                                                                          # Runs the parser and places the extracted data in a argparse.Namespace object (see: ArgumentParser.parse_args())
-target = args.target                                                                                                                                # Initializes "target" as a constant object
-start_port = args.start_port                                                                                                                        # Initializes "start_port" ... 
-end_port = args.end_port                                                                                                                            # Initializes "end_port" ... 
+parser.add_argument("--max_workers", type = int, default = 500, help = "Number of scanning threads")                                                # param4   Sets the number of worker threads probing ports at once
+parser.add_argument("--window", type = int, default = 0, help = "Maximum ports submitted but not yet finished (default: 2 x --max_workers)")        # param5   Bounds queued work so memory stays flat for any port range
 lock = threading.Lock()                                                                                                                             # Initializes lock instance from threading module/library
 colorama.init()                                                                                                                                     # Initialized colorama for tabular output formatting
 
@@ -88,8 +87,8 @@ def load_port_service_mapping(csv_file_path):
                         pass
     return port_service_mapping
 
-# Stores port number and service information from .CSV to port_service_mapping
-port_service_mapping = load_port_service_mapping(args.csv_path)
+# Stores port number and service information from .CSV to port_service_mapping (loaded once arguments are parsed)
+port_service_mapping = {}
 
 #   VAR 02:         get_service_name
 #   DESCRIPTION:    Obtains service information of scanned port number
@@ -109,12 +108,12 @@ def clean_banner(banner):
 
 #   VAR 04:         scan_port
 #   DESCRIPTION:    Establishing socket-to-port connections
-def scan_port(target, port):
+def scan_port(target, port, timeout=0.5):
     try:
         # Creates a TCP socket connection
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            # Sets socket timeout to half of a second
-            s.settimeout(0.5)
+            # Sets socket timeout (half of a second by default)
+            s.settimeout(timeout)
             # Attempts to connect to the target port
             result = s.connect_ex((target, port))
             # Checks if the connection was successful
@@ -122,7 +121,7 @@ def scan_port(target, port):
                 # Initializes banner as an empty string
                 banner = ''
                 # Sets a timeout for recv before receiving data
-                s.settimeout(0.5)
+                s.settimeout(timeout)
                 try:
                     # Receives initial data (banner) from the socket
                     banner = s.recv(4096).decode('UTF-8', errors='ignore').strip()
@@ -136,7 +135,7 @@ def scan_port(target, port):
                         http_request = f"GET / HTTP/1.1\r\nHost: {target}\r\n\r\n"
                         # Sends the HTTP GET request
                         s.sendall(http_request.encode())
-                        s.settimeout(0.5)
+                        s.settimeout(timeout)
                         try:
                             # Receives the response after the request
                             banner = s.recv(4096).decode('UTF-8', errors='ignore').strip()
@@ -148,7 +147,7 @@ def scan_port(target, port):
                     else:
                         # Transmits a generic request to elicit a response
                         s.sendall(b"\r\n")
-                        s.settimeout(0.5)
+                        s.settimeout(timeout)
                         try:
                             # Receives the response from the port
                             banner = s.recv(1024).decode('UTF-8', errors='ignore').strip()
@@ -189,9 +188,41 @@ def scan_port(target, port):
 
     return None
 
-#   VAR 05:         port_scan
+#   VAR 05:         scan_ports_bounded
+#   DESCRIPTION:    Memory-bounded thread pool that submits ports lazily and yields results as they complete
+def scan_ports_bounded(target, ports, timeout=0.5, max_workers=500, window=0):
+    # Keeps at most `window` futures alive instead of one per port in the range
+    window = window or 2 * max_workers
+    ports = iter(ports)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Maps in-flight futures to their port numbers
+        pending = {}
+        try:
+            while True:
+                # Tops the window back up from the lazy port iterator
+                for port in islice(ports, window - len(pending)):
+                    pending[executor.submit(scan_port, target, port, timeout)] = port
+                if not pending:
+                    break
+                # Waits for at least one probe to finish, then hands its result to the caller
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    port = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        print(f'Port {port} generated an exception: {exc}')
+                        continue
+                    if result:
+                        yield result
+        finally:
+            # Drops queued probes if the caller stops iterating early
+            for future in pending:
+                future.cancel()
+
+#   VAR 06:         port_scan
 #   DESCRIPTION:    Port range loopback for port connectivity
-def port_scan(target, start_port, end_port):
+def port_scan(target, start_port, end_port, timeout=0.5, max_workers=500, window=0):
     try:
         # Checks whether inputted port values are valid (1-65535) and if start_port is less than or equal to end_port
         if (1 <= start_port <= 65535) and (1 <= end_port <= 65535) and (start_port <= end_port):
@@ -202,27 +233,9 @@ def port_scan(target, start_port, end_port):
             # Compiled threaded list of open port results
             results = []
 
-            # Processes and stores scanned ports using threads
-            def threaded_scan(port):
-                # Stores the scanned ports as result
-                result = scan_port(target, port)
-                if result:
-                    # Ensures control over frequency of writes to results[] and appends them accordingly
-                    with lock:
-                        results.append(result)
-
-            # Sets a numeric limitation on the number of threads to prevent overexhaustion; adjust discretionarily
-            max_workers = 500
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Schedules threaded_scan to be executed immediately after scanning a port
-                future_to_port = {executor.submit(threaded_scan, port): port for port in range(start_port, end_port + 1)}
-                for future in concurrent.futures.as_completed(future_to_port):
-                    # Maps "futures" (scanned ports) to their corresponding port numbers
-                    port = future_to_port[future]
-                    try:
-                        future.result()
-                    except Exception as exc:
-                        print(f'Port {port} generated an exception: {exc}')
+            # Streams results from a bounded pool so only `window` ports are ever queued at once
+            for result in scan_ports_bounded(target, range(start_port, end_port + 1), timeout, max_workers, window):
+                results.append(result)
 
             # Runtime stopwatch: finishes recording time after final port scan
             end_time = time.time()
@@ -287,10 +300,17 @@ def port_scan(target, start_port, end_port):
 
 # Checks whether the scanner is being run directly
 if __name__ == "__main__":
+    # Runs the parser only when executed directly so the module can be imported without side effects
+    args = parser.parse_args()
+    target = args.target
+    start_port = args.start_port
+    end_port = args.end_port
+    # Loads port number and service information from .CSV
+    port_service_mapping = load_port_service_mapping(args.csv_path)
     try:
         # Attempts to resolve scan target and convert hostname to its corresponding IP address
         target_ip = socket.gethostbyname(target)
-        port_scan(target_ip, start_port, end_port)
+        port_scan(target_ip, start_port, end_port, max_workers=args.max_workers, window=args.window)
     # Catches unresolvable hostnames and exits
     except socket.gaierror as e:
         print(f"Could not resolve hostname: {target}")
@@ -42,7 +42,6 @@ parser.add_argument("--start_port", type = int, default = 1, help = "Start of po
 parser.add_argument("--end_port", type = int, default = 1024, help = "End of port range to scan")                                                   # param2   Sets the ending port range to scan based on IP address in param1 
 parser.add_argument("--csv_path", default = "/home/kali/Desktop/service-names-port-numbers.csv", help = "Path to the service names CSV file")       # param3   Sets the preferred directory for scanning criteria
 parser.add_argument("--timeout", type=float, default=0.5, help="Socket timeout for each port")                                                      # param4   Sets the timeout value for each port scan
-args = parser.parse_args()                                                                                                                          # Runs the parser and places the extracted data in a argparse.Namespace object (see: ArgumentParser.parse_args())
 
 #   VAR 01:         load_port_service_mapping
 #   DESCRIPTION:    Parses and filters data from specified .csv file
@@ -81,8 +80,8 @@ def load_port_service_mapping(csv_file_path):
                     pass
     return port_service_mapping
 
-# Stores port number and service information from .CSV to port_service_mapping
-port_service_mapping = load_port_service_mapping(args.csv_path)
+# Stores port number and service information from .CSV to port_service_mapping (loaded once arguments are parsed)
+port_service_mapping = {}
 
 #   VAR 02:         get_service_name
 #   DESCRIPTION:    Obtains service information of scanned port number
@@ -252,6 +251,10 @@ async def scan_network(target_range, start_port, end_port, timeout):
 #   FUNC 01:        Scanner Function
 #   DESCRIPTION:    Handles IP or hostname resolution
 if __name__ == "__main__":
+    # Runs the parser only when executed directly so the module can be imported without side effects
+    args = parser.parse_args()
+    # Loads port number and service information from .CSV
+    port_service_mapping = load_port_service_mapping(args.csv_path)
     if '/' in args.target:
         # Scans a network range if target is in CIDR notation
         asyncio.run(scan_network(args.target, args.start_port, args.end_port, args.timeout))
@@ -47,7 +47,7 @@ parser.add_argument("--timeout", type=float, default=0.5, help="Socket timeout f
 parser.add_argument("--batch_size", type=int, default=100, help="Number of concurrent connections")                                                 # param5    Sets the batch size value for the scan
 parser.add_argument("--verbose", action="store_true", help="Enable verbose output for debugging")                                                   # param6    Sets the scan output to contain line-by-line information on each scan
 
-args = parser.parse_args()                                                                                                                          # Runs the parser and places the extracted data in a argparse.Namespace object (see: ArgumentParser.parse_args())
+args = None                                                                                                                                         # Populated by the parser when executed directly
 colorama.init()                                                                                                                                     # Initialized colorama for tabular output formatting
 
 #   VAR 01:         load_port_service_mapping
@@ -87,8 +87,8 @@ def load_port_service_mapping(csv_file_path):
                     pass
     return port_service_mapping
 
-# Stores port number and service information from .CSV to port_service_mapping
-port_service_mapping = load_port_service_mapping(args.csv_path)
+# Stores port number and service information from .CSV to port_service_mapping (loaded once arguments are parsed)
+port_service_mapping = {}
 
 #   VAR 02:         get_service_name
 #   DESCRIPTION:    Obtains service information of scanned port number
@@ -158,7 +158,7 @@ async def scan_port(target, port, timeout):
             }
         except Exception as e:
             # Stores common errors like timeouts and connection refusals as verbose data
-            if args.verbose:
+            if args and args.verbose:
                 print(f"Exception when connecting to port {port}: {type(e).__name__}: {e}")
                 # Stack traceback for exceptions
                 traceback.print_exc()
@@ -249,6 +249,10 @@ async def scan_network(target_range, start_port, end_port, timeout):
 #   FUNC 01:        Scanner Function
 #   DESCRIPTION:    Handles IP or hostname resolution
 if __name__ == "__main__":
+    # Runs the parser only when executed directly so the module can be imported without side effects
+    args = parser.parse_args()
+    # Loads port number and service information from .CSV
+    port_service_mapping = load_port_service_mapping(args.csv_path)
     if '/' in args.target:
         # Scans a network range if target is in CIDR notation
         asyncio.run(scan_network(args.target, args.start_port, args.end_port, args.timeout))
@@ -24,45 +24,378 @@
 import socket                       # LIBRARY 01:  low-level networking interface                                       https://github.com/python/cpython/tree/3.13/Lib/socket.py
 import argparse                     # LIBRARY 02:  Parser for command-line options, arguments and subcommands           https://docs.python.org/3/library/argparse.html
 import time                         # LIBRARY 04:  Time access and conversions                                          https://docs.python.org/3/library/time.html#module-time
-import csv                          # LIBRARY 05:  File reading and writing                                             https://github.com/python/cpython/blob/3.13/Lib/csv.py
 import asyncio                      # LIBRARY 06:  Concurrent programming design for high-performance network queues    https://realpython.com/async-io-python/
-import colorama                     # LIBRARY 07:  Import colorama                                                      https://github.com/tartley/colorama
 import re                           # LIBRARY 08:  For regular expressions to clean banner                              https://github.com/python/cpython/tree/3.13/Lib/re/
-import ipaddress                    # LIBRARY 09:  IPv4/IPv6 manipulation library                                       https://github.com/python/cpython/blob/3.13/Lib/ipaddress.py 
-from tabulate import tabulate       # LIBRARY 10:  Displays results in a table with columns for specified fields        https://github.com/astanin/python-tabulate 
-from colorama import Fore, Style    # LIBRARY 11:  Use colors to highlight open ports or errors                         https://github.com/tartley/colorama
 from itertools import islice        # LIBRARY 12:  Functions creating iterators for efficient looping                   https://docs.python.org/3/library/itertools.html
-import traceback                    # LIBRARY 13:  Print or retrieve a stack traceback                                  https://docs.python.org/3/library/traceback.html
-import platform                     # LIBRARY 14:  Access to underlying platform’s identifying data                     https://docs.python.org/3/library/platform.html
 import os                           # LIBRARY 15:  Miscellaneous operating system interfaces                            https://docs.python.org/3/library/os.html
+from dataclasses import dataclass   # LIBRARY 16:  Generated __init__/__repr__ for plain configuration records          https://docs.python.org/3/library/dataclasses.html
+from collections import deque       # LIBRARY 17:  Double-ended queue for per-share waiter lists                        https://docs.python.org/3/library/collections.html#collections.deque
+from contextlib import nullcontext  # LIBRARY 18:  No-op context manager when --profile is off                          https://docs.python.org/3/library/contextlib.html
+from time import perf_counter_ns    # LIBRARY 19:  Nanosecond clock for --profile stage timings                         https://docs.python.org/3/library/time.html#time.perf_counter_ns
+import logging                      # LIBRARY 20:  Leveled diagnostics queued to the bps_logging listener               https://docs.python.org/3/library/logging.html
+from bisect import bisect_right     # LIBRARY 21:  Binary search over the service port intervals                        https://docs.python.org/3/library/bisect.html
+from array import array             # LIBRARY 22:  Compact unsigned 16-bit interval bounds                              https://docs.python.org/3/library/array.html
+
+# DEFERRED MODULES (imported on first use to keep single-port startup fast; see bps_bench.py startup)
+#   csv                             LIBRARY 05:  loaded with the service database on first lookup
+#   colorama, tabulate              LIBRARY 07/10/11:  loaded only when table output is printed
+#   ipaddress, platform             LIBRARY 09/14:  loaded only for CIDR targets and host discovery
+#   traceback                       LIBRARY 13:  loaded only when an unexpected error is reported
+#   signal                          LIBRARY 23:  loaded by the CLI to stop a scan gracefully on Ctrl-C
+#   bps_profile                     loaded only with --profile
+#   bps_logging                     loaded by the CLI to run the logging pipeline (logging.handlers, queue)
+#   bps_display                     loaded only with --display live
+#   bps_http                        loaded on the first HTTP deep probe
+#   bps_capture                     loaded only with --capture
+#   uvloop                          loaded only with --loop uvloop (optional; falls back to asyncio)
+
+# SCANNER MODULES
+from bps_sockets import SourcePool, abort_with_rst, close_with_rst, connect_socket, is_resource_error, raise_nofile_limit, socket_budget
+from bps_timers import TimerWheel
 
 # PLUGINS
 from service_plugins import service_plugins, register_plugin
-colorama.init()
 
 # CONSTANT VARIABLES
-args = None
-port_service_mapping = {}
-semaphore = asyncio.Semaphore(500)
-network_semaphore = asyncio.Semaphore(100)
-output_file = "/home/kali/Desktop/Programs/scan_results.csv"
+DEFAULT_CSV_PATH = "/home/kali/Desktop/service-names-port-numbers.csv"
+DEFAULT_OUTPUT_PATH = "scan_results.csv"
+COMMON_PORTS = frozenset((
+    7, 20, 21, 22, 23, 25, 26, 37, 53, 79, 80, 81, 88, 106, 110, 111, 113, 119, 135, 139, 143, 144,
+    179, 199, 389, 427, 443, 444, 445, 465, 513, 514, 515, 543, 544, 548, 554, 587, 631, 646, 873,
+    990, 993, 995, 1025, 1026, 1027, 1433, 1521, 1723, 1900, 2000, 2049, 2121, 2717, 3000, 3128,
+    3306, 3389, 3986, 4899, 5000, 5009, 5051, 5060, 5101, 5190, 5357, 5432, 5631, 5666, 5800, 5900,
+    5985, 6000, 6001, 6379, 6646, 7070, 8000, 8008, 8009, 8080, 8081, 8443, 8888, 9100, 9200, 9999,
+    10000, 11211, 27017, 32768, 49152, 49153, 49154, 49155, 49156, 49157))
+log = logging.getLogger("bps.scanner")
+
+def concurrency_value(value):
+    return None if value == 'auto' else int(value)
+
+def ports_value(value):
+    return tuple(int(item) for item in value.split(',') if item.strip())
+
+def host_weights_value(value):
+    import ipaddress
+    weights = []
+    for item in value.split(','):
+        if item.strip():
+            network, _, weight = item.partition('=')
+            weight = float(weight) if weight else 1.0
+            if weight <= 0:
+                raise ValueError(weight)
+            weights.append((str(ipaddress.ip_network(network.strip(), strict=False)), weight))
+    return tuple(weights)
+
+def paths_value(value):
+    return tuple(p if p.startswith('/') else '/' + p for p in (item.strip() for item in value.split(',')) if p)
+
+def source_addresses_value(value):
+    import ipaddress
+    addresses = []
+    for item in value.split(','):
+        item = item.strip()
+        if '/' in item:
+            addresses.extend(str(ip) for ip in ipaddress.ip_network(item, strict=False).hosts())
+        elif item:
+            addresses.append(str(ipaddress.ip_address(item)))
+    return tuple(addresses)
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Asynchronous Multi-Target Port Scanner")
     parser.add_argument("target", help="Target IP address, hostname, or CIDR range to scan")
     parser.add_argument("--start_port", type=int, default=1, help="Start of port range to scan")
     parser.add_argument("--end_port", type=int, default=1024, help="End of port range to scan")
-    parser.add_argument("--csv_path", default="/home/kali/Desktop/service-names-port-numbers.csv", help="Path to the service names CSV file")
+    parser.add_argument("--csv_path", default=DEFAULT_CSV_PATH, help="Path to the service names CSV file")
     parser.add_argument("--timeout", type=float, default=0.5, help="Socket timeout for each port")
+    parser.add_argument("--retry_timeouts", action="store_true", help="Re-probe ports whose connect timed out in a second pass after the scan, at a lower rate and a longer timeout")
+    parser.add_argument("--retry_timeout", type=float, default=2.0, help="Connect timeout for the retry pass")
+    parser.add_argument("--retry_concurrency", type=int, default=50, help="Retry-pass probes in flight at once")
     parser.add_argument("--batch_size", type=int, default=100, help="Number of concurrent connections")
-    parser.add_argument("--verbose", action="store_true", help="Enable verbose output for debugging")
+    parser.add_argument("--host_weights", type=host_weights_value, default=(), metavar="WEIGHTS", help="Comma-separated ADDRESS[/PREFIX]=WEIGHT entries giving hosts a larger or smaller share of probe slots than the default 1 (e.g. 10.0.0.5=4,10.0.1.0/24=0.5)")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose output for debugging (same as --log_level debug)")
+    parser.add_argument("--log_level", choices=["debug", "info", "warning", "error"], default="warning", help="Lowest diagnostic level written to stderr or --log_file")
+    parser.add_argument("--log_file", help="Write diagnostics to this file instead of stderr")
+    parser.add_argument("--log_sample", type=int, default=20, help="Repeats of one diagnostic message written before the rest are only counted (0 writes all)")
+    parser.add_argument("--display", choices=["live", "table", "plain"], default="live", help="Result display: 'live' prints open ports as found under a progress line; 'table' and 'plain' print every result at the end ('plain' skips loading the table libraries)")
+    parser.add_argument("--max_concurrency", type=concurrency_value, default=500, help="Probes in flight at once, or 'auto' to size from the file-descriptor limit and ephemeral port range")
+    parser.add_argument("--source_addresses", type=source_addresses_value, default=(), metavar="ADDRS", help="Comma-separated local IPs or CIDR blocks to bind probes to in round-robin order (e.g. 127.0.0.2,127.0.0.3)")
+    parser.add_argument("--graceful_close", action="store_true", help="Close probes with FIN instead of RST (leaves sockets in TIME_WAIT)")
+    parser.add_argument("--no_port_learning", action="store_true", help="CIDR scans: probe every host in numeric port order instead of trying ports open on already-scanned siblings first")
+    parser.add_argument("--no_banner", action="store_true", help="Connect-only scan: report open ports without reading banners")
+    parser.add_argument("--http_paths", type=paths_value, default=('/',), metavar="PATHS", help="Comma-separated paths fetched from HTTP ports over one keep-alive connection (empty disables the HTTP probe)")
+    parser.add_argument("--http_ports", type=ports_value, default=ScanConfig.http_ports, metavar="PORTS", help="Comma-separated ports given the HTTP probe instead of the generic banner read")
+    parser.add_argument("--stop_grace", type=float, default=0.5, help="Seconds in-flight probes get to finish after Ctrl-C before they are cancelled (a second Ctrl-C cancels them at once)")
+    parser.add_argument("--loop", choices=["asyncio", "uvloop"], default="asyncio", help="Event loop implementation; 'uvloop' falls back to asyncio when it is not installed")
+    parser.add_argument("--backend", choices=["asyncio", "threads"], default="asyncio", help="Probe engine; 'threads' uses the bounded thread pool from bps_m02")
+    parser.add_argument("--profile", metavar="DIR", help="Record per-stage timings and event-loop lag into DIR")
+    parser.add_argument("--profiler", choices=["none", "cprofile", "sample"], default="none", help="With --profile: also run cProfile, or sample loop-thread stacks for a flame graph")
+    parser.add_argument("--sample_interval", type=float, default=0.005, help="Seconds between stack samples for --profiler sample")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH, help="Results file path; an empty value disables the file")
+    parser.add_argument("--output_format", choices=["csv", "jsonl", "packed", "parquet", "sqlite"], help="Results file format (default: inferred from the --output extension)")
+    parser.add_argument("--store", metavar="DB", help="Also append this scan to a bps_store SQLite history (see bps_store.py query)")
+    parser.add_argument("--capture", metavar="DIR", help="Append the raw bytes of every banner and HTTP response to this capture directory (asyncio backend; see bps_capture.py)")
+    parser.add_argument("--capture_compression", choices=["none", "zlib", "lzma"], default="none", help="Per-record compression of --capture data (kept only where it saves space)")
     return parser
 
+# CLASSES
+#   CLASS 01:       ScanConfig
+#   DESCRIPTION:    Per-scan settings; replaces the parsed argparse namespace inside the engine
+@dataclass
+class ScanConfig:
+    start_port: int = 1
+    end_port: int = 1024
+    timeout: float = 0.5
+    banner_timeout: float = 1.0
+    batch_size: int = 100
+    max_concurrency: int = 500
+    max_hosts: int = 100
+    health_sample: int = 100
+    tarpit_ratio: float = 0.9
+    banner_sample: int = 10
+    backend: str = 'asyncio'
+    banners: bool = True
+    rst_close: bool = True
+    resource_retries: int = 5
+    timer_resolution: float = 0.01
+    source_addresses: tuple = ()
+    http_ports: tuple = (80, 81, 591, 3000, 5000, 8000, 8008, 8080, 8081, 8888)
+    http_paths: tuple = ('/',)
+    retry_timeouts: bool = False
+    retry_timeout: float = 2.0
+    retry_concurrency: int = 50
+    learn_ports: bool = True
+    host_weights: tuple = ()
+
+    @classmethod
+    def from_args(cls, parsed_args):
+        return cls(start_port=parsed_args.start_port,
+                   end_port=parsed_args.end_port,
+                   timeout=parsed_args.timeout,
+                   batch_size=parsed_args.batch_size,
+                   backend=parsed_args.backend,
+                   banners=not parsed_args.no_banner,
+                   max_concurrency=parsed_args.max_concurrency,
+                   rst_close=not parsed_args.graceful_close,
+                   source_addresses=parsed_args.source_addresses,
+                   http_ports=parsed_args.http_ports,
+                   http_paths=parsed_args.http_paths,
+                   retry_timeouts=parsed_args.retry_timeouts,
+                   retry_timeout=parsed_args.retry_timeout,
+                   retry_concurrency=parsed_args.retry_concurrency,
+                   learn_ports=not parsed_args.no_port_learning,
+                   host_weights=parsed_args.host_weights)
+
+#   CLASS 02:       ServiceDatabase
+#   DESCRIPTION:    Port-to-service lookup that several scanners can share; a CSV-backed database
+#                   is only parsed on the first lookup, so scans that find nothing never read it.
+#                   Registrations are kept as sorted, non-overlapping port intervals (starts/ends
+#                   arrays searched with bisect) each carrying every name registered for it in CSV
+#                   order, so a "6000-6063" row is one interval rather than 64 dict entries and a
+#                   later row for the same port adds a name instead of replacing the first.
+class ServiceDatabase:
+    def __init__(self, mapping=None, csv_path=None, ranges=None):
+        self.csv_path = csv_path
+        self.ranges = [(port, port, name) for port, name in mapping.items()] if mapping is not None else ranges
+        self.starts = None
+        self.ends = None
+        self.entries = None
+
+    @classmethod
+    def from_csv(cls, csv_file_path):
+        return cls(csv_path=csv_file_path)
+
+    def load(self):
+        if self.starts is None:
+            ranges = self.ranges
+            if ranges is None:
+                ranges = load_service_ranges(self.csv_path) if self.csv_path else []
+            self.starts, self.ends, self.entries = build_service_intervals(ranges)
+            self.ranges = None
+        return self
+
+    #   METHOD 01:      names
+    #   DESCRIPTION:    Every service name registered for a port, in CSV order (empty tuple if none)
+    def names(self, port):
+        if self.starts is None:
+            self.load()
+        i = bisect_right(self.starts, port) - 1
+        if i >= 0 and port <= self.ends[i]:
+            return self.entries[i]
+        return ()
+
+    #   METHOD 02:      lookup
+    #   DESCRIPTION:    Primary (first registered) service name of a port
+    def lookup(self, port):
+        if self.starts is None:
+            self.load()
+        i = bisect_right(self.starts, port) - 1
+        if i >= 0 and port <= self.ends[i]:
+            return self.entries[i][0]
+        return 'Unknown Service'
+
+#   CLASS 03:       FairShareLimiter
+#   DESCRIPTION:    Connection budget split between weighted shares (one per job or host); a freed
+#                   slot goes to the waiting share with the fewest in-flight probes per unit of
+#                   weight, so idle share is redistributed and no share can starve the others.
+#                   `waiting` holds the shares with queued waiters, so an uncontended acquire and
+#                   every release cost O(waiting shares), not O(shares).
+class FairShareLimiter:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.in_use = 0
+        self.shares = []
+        self.waiting = set()
+
+    def share(self, key, weight=1):
+        share = LimiterShare(self, key, weight)
+        self.shares.append(share)
+        return share
+
+    def remove(self, share):
+        if share in self.shares:
+            self.shares.remove(share)
+
+    async def acquire(self, share):
+        if self.in_use < self.capacity and not self.waiting:
+            self.in_use += 1
+            share.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        share.waiters.append(waiter)
+        self.waiting.add(share)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(share)
+            else:
+                try:
+                    share.waiters.remove(waiter)
+                except ValueError:
+                    pass
+                if not share.waiters:
+                    self.waiting.discard(share)
+            raise
+
+    def release(self, share):
+        self.in_use -= 1
+        share.in_flight -= 1
+        while self.in_use < self.capacity and self.waiting:
+            best = min(self.waiting, key=lambda s: s.in_flight / s.weight)
+            waiter = best.waiters.popleft()
+            if not best.waiters:
+                self.waiting.discard(best)
+            if waiter.done():
+                continue
+            self.in_use += 1
+            best.in_flight += 1
+            waiter.set_result(None)
+
+#   CLASS 04:       LimiterShare
+#   DESCRIPTION:    One share of a FairShareLimiter; usable anywhere a semaphore is (async with)
+class LimiterShare:
+    def __init__(self, limiter, key, weight):
+        self.limiter = limiter
+        self.key = key
+        self.weight = weight
+        self.in_flight = 0
+        self.waiters = deque()
+
+    async def __aenter__(self):
+        await self.limiter.acquire(self)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.limiter.release(self)
+
+#   CLASS 05:       HostHealth
+#   DESCRIPTION:    Per-host circuit breaker fed by early probe outcomes. After health_sample probes a
+#                   host that never answered is 'filtered' (the rest of its range is cut down to
+#                   COMMON_PORTS) and one that accepted nearly everything is a 'tarpit' (banners are
+#                   skipped); a host whose first banner_sample open ports all stall on the banner read
+#                   is 'mute' (banners are skipped). The state is copied into each result's Flags.
+#                   Connects that failed for another reason (local resource exhaustion, unexpected
+#                   errors) are counted as errors: they say nothing about the host, so they are left
+#                   out of the sample the breaker judges. timed_out collects the ports whose connect
+#                   timed out, two bytes each, for the retry pass. share is the host's LimiterShare of
+#                   the scanner's probe slots and planned the number of ports its scan covers.
+class HostHealth:
+    def __init__(self, host, config):
+        self.host = host
+        self.config = config
+        self.state = 'normal'
+        self.evaluated = False
+        self.probes = 0
+        self.opened = 0
+        self.refused = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.banners = 0
+        self.banner_timeouts = 0
+        self.skipped = 0
+        self.timed_out = array('H')
+        self.unscanned = array('H')
+        self.share = None
+        self.planned = 0
+
+    @property
+    def done(self):
+        return self.probes + self.skipped
+
+    @property
+    def grab_banners(self):
+        return self.state not in ('tarpit', 'mute')
+
+    @property
+    def flag(self):
+        return '' if self.state == 'normal' else self.state
+
+    def record_connect(self, outcome):
+        self.probes += 1
+        if outcome == 'open':
+            self.opened += 1
+        elif outcome == 'refused':
+            self.refused += 1
+        elif outcome == 'timeout':
+            self.timeouts += 1
+        else:
+            self.errors += 1
+
+    def record_banner(self, timed_out):
+        self.banners += 1
+        self.banner_timeouts += timed_out
+        sample = self.config.banner_sample
+        if self.state == 'normal' and sample and self.banners >= sample and self.banner_timeouts == self.banners:
+            self.state = 'mute'
+
+    def evaluate(self):
+        sample = self.config.health_sample
+        judged = self.probes - self.errors
+        if self.evaluated or not sample or judged < sample:
+            return
+        self.evaluated = True
+        if self.opened == 0 and self.refused == 0:
+            self.state = 'filtered'
+        elif self.opened >= judged * self.config.tarpit_ratio:
+            self.state = 'tarpit'
+
+    def admit(self, port):
+        if self.state != 'filtered' or port in COMMON_PORTS:
+            return True
+        self.skipped += 1
+        return False
+
+    def summary(self):
+        return (f"Host {self.host} flagged as {self.state}: {self.opened} open, {self.refused} refused, "
+                f"{self.timeouts} timed out, {self.errors} errors of {self.probes} probes; "
+                f"{self.skipped} ports skipped")
+
 # DECLARED VARIABLES
-#   VAR 01:         load_port_service_mapping
-#   DESCRIPTION:    Parses and filters data from specified .csv file
-def load_port_service_mapping(csv_file_path):
-    port_service_mapping = {}
+#   VAR 01:         load_service_ranges
+#   DESCRIPTION:    Parses and filters data from specified .csv file into (start, end, name) rows in file
+#                   order; single ports have start == end
+def load_service_ranges(csv_file_path):
+    import csv
+    ranges = []
     try:
         with open(csv_file_path, 'r', newline='', encoding='UTF-8') as csvfile:
             reader = csv.DictReader(csvfile)
@@ -74,24 +407,55 @@ def load_port_service_mapping(csv_file_path):
                     try:
                         if '-' in port_number:
                             start_port_range, end_port_range = map(int, port_number.split('-'))
-                            for port in range(start_port_range, end_port_range + 1):
-                                port_service_mapping[port] = service_name.strip()
                         else:
-                            port_service_mapping[int(port_number)] = service_name.strip()
+                            start_port_range = end_port_range = int(port_number)
                     except ValueError:
-                        pass
+                        continue
+                    if 0 <= start_port_range <= end_port_range <= 65535:
+                        ranges.append((start_port_range, end_port_range, service_name.strip()))
     except FileNotFoundError:
         print(f"CSV file not found at path: {csv_file_path}")
     except Exception as e:
         print(f"Error reading CSV file: {e}")
-    return port_service_mapping
+    return ranges
 
-#   VAR 02:         get_service_name
-#   DESCRIPTION:    Obtains service information of scanned port number
-def get_service_name(port):
-    return port_service_mapping.get(port, 'Unknown Service')
+#   VAR 02:         build_service_intervals
+#   DESCRIPTION:    Splits possibly overlapping (start, end, name) rows at every range boundary and
+#                   returns (starts, ends, entries): sorted array('H') bounds of non-overlapping
+#                   intervals and, per interval, the tuple of names covering it. Equal name tuples are
+#                   shared and adjacent intervals with the same names are merged.
+def build_service_intervals(ranges):
+    bounds = sorted({port for start, end, _ in ranges for port in (start, end + 1)})
+    position = {port: i for i, port in enumerate(bounds)}
+    covering = [[] for _ in bounds]
+    for start, end, name in ranges:
+        for i in range(position[start], position[end + 1]):
+            if name not in covering[i]:
+                covering[i].append(name)
+    starts, ends, entries, shared = array('H'), array('H'), [], {}
+    for i, names in enumerate(covering):
+        if not names:
+            continue
+        names = shared.setdefault(tuple(names), tuple(names))
+        if entries and entries[-1] is names and ends[-1] + 1 == bounds[i]:
+            ends[-1] = bounds[i + 1] - 1
+            continue
+        starts.append(bounds[i])
+        ends.append(bounds[i + 1] - 1)
+        entries.append(names)
+    return starts, ends, entries
 
-#   VAR 03:         clean_banner
+#   VAR 03:         load_port_service_mapping
+#   DESCRIPTION:    Previous per-port dict form of the service table (a later row overwrites an earlier
+#                   name); kept for callers that want a plain dict and as the bps_bench baseline
+def load_port_service_mapping(csv_file_path):
+    port_service_mapping = {}
+    for start, end, name in load_service_ranges(csv_file_path):
+        for port in range(start, end + 1):
+            port_service_mapping[port] = name
+    return port_service_mapping
+
+#   VAR 04:         clean_banner
 #   DESCRIPTION:    Cleans the banner to remove excess metadata
 def clean_banner(banner):
     banner = re.sub(r'<\?xml.*?\?>', '', banner, flags=re.DOTALL)
@@ -99,221 +463,950 @@ def clean_banner(banner):
     banner = re.sub(r'<.*?>', '', banner, flags=re.DOTALL)
     return banner.strip()
 
-#   VAR 04:         scan_port
-#   DESCRIPTION:    Establishing socket-to-port connections
-async def scan_port(target, port, timeout):
-    global args
-    async with semaphore:
+#   VAR 05:         is_host_alive
+#   DESCRIPTION:    Network address loopback
+async def is_host_alive(ip):
+    import platform
+    param = '-n' if platform.system().lower() == 'windows' else '-c'
+    command = f"ping {param} 1 {ip}"
+    proc = await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    await proc.communicate()
+    return proc.returncode == 0
+
+#   VAR 06:         batch_ports
+#   DESCRIPTION:    Divides an iterable of ports into fixed-size lists
+def batch_ports(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            break
+        yield batch
+
+#   CLASS 06:       PortLearner
+#   DESCRIPTION:    Shared by the hosts of one CIDR scan: counts, per port, the hosts it was found open on,
+#                   and hands each host its ports with the ones already seen open on its siblings first
+#                   (most hosts first, then port number), then the rest of the range in numeric order.
+#                   Every port of the range is still probed exactly once. The ranking is re-read whenever
+#                   a sibling finds something new, so hosts already under way pick it up from their next
+#                   batch on.
+class PortLearner:
+    def __init__(self):
+        self.counts = {}
+        self.version = 0
+
+    #   METHOD 01:      record
+    #   DESCRIPTION:    One host found `port` open
+    def record(self, port):
+        self.counts[port] = self.counts.get(port, 0) + 1
+        self.version += 1
+
+    #   METHOD 02:      ranked
+    #   DESCRIPTION:    Learned ports within start..end, best first
+    def ranked(self, start, end):
+        counts = self.counts
+        return sorted((port for port in counts if start <= port <= end), key=lambda port: (-counts[port], port))
+
+    #   METHOD 03:      order
+    #   DESCRIPTION:    Probe order for one host; a one-byte-per-port bitmap remembers what was handed out
+    def order(self, start, end):
+        handed = bytearray(end - start + 1)
+        version, ranked, index, port = -1, [], 0, start
+        while True:
+            if version != self.version:
+                version, ranked, index = self.version, self.ranked(start, end), 0
+            while index < len(ranked) and handed[ranked[index] - start]:
+                index += 1
+            if index < len(ranked):
+                next_port = ranked[index]
+                index += 1
+            else:
+                while port <= end and handed[port - start]:
+                    port += 1
+                if port > end:
+                    return
+                next_port = port
+                port += 1
+            handed[next_port - start] = 1
+            yield next_port
+
+    def summary(self, top=10):
+        best = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:top]
+        return "Port learning: probed first " + ", ".join(f"{port} ({count} hosts)" for port, count in best)
+
+#   CLASS 07:       SocketTransport
+#   DESCRIPTION:    The operating system's network as seen by the Scanner: connect, stream setup, close and
+#                   host discovery. Any object with these five methods can stand in for it, e.g. the
+#                   bps_netsim.SimulatedNetwork used to benchmark the scheduler without real hosts.
+class SocketTransport:
+    #   METHOD 01:      connect
+    #   DESCRIPTION:    Connected socket for ip:port; raises ConnectionRefusedError or OSError
+    async def connect(self, ip, port, source=None):
+        return await connect_socket(asyncio.get_running_loop(), ip, port, source)
+
+    #   METHOD 02:      open_streams
+    #   DESCRIPTION:    (reader, writer) over a socket returned by connect()
+    async def open_streams(self, sock):
+        return await asyncio.open_connection(sock=sock)
+
+    #   METHOD 03:      discard
+    #   DESCRIPTION:    Closes a connected socket that never got streams
+    def discard(self, sock, rst=True):
+        close_with_rst(sock) if rst else sock.close()
+
+    #   METHOD 04:      abort
+    #   DESCRIPTION:    Closes a stream writer with RST
+    def abort(self, writer):
+        abort_with_rst(writer)
+
+    #   METHOD 05:      is_alive
+    #   DESCRIPTION:    Host discovery for CIDR scans
+    async def is_alive(self, ip):
+        return await is_host_alive(ip)
+
+#   CLASS 08:       Scanner
+#   DESCRIPTION:    Embeddable scan engine; holds no module-level state so many scanners can share
+#                   one event loop, one ServiceDatabase, one connection budget (a semaphore or a
+#                   LimiterShare) and, optionally, one hostname cache. host_reports keeps the
+#                   HostHealth of every host this scanner has probed; budget records how the
+#                   bps_sockets limits sized its own semaphore and resource_errors counts probes
+#                   delayed by local socket exhaustion. Connect, banner and plugin deadlines are all
+#                   tracked on one shared TimerWheel instead of a wait_for timer per operation. An
+#                   optional bps_profile.ScanProfiler receives per-stage timings. ports_total and
+#                   ports_done are progress counters (ports planned and ports whose connect settled);
+#                   retry_probed, retry_opened and retry_unanswered count the retry pass; learner is
+#                   the PortLearner of the last CIDR scan. stop() ends a scan early but gracefully
+#                   (see METHOD 15); what it left out is in each HostHealth.unscanned and in
+#                   hosts_unstarted / first_unstarted.
+#                   Every probe goes through `transport` (a SocketTransport unless one is given).
+#                   With a bps_capture.CaptureWriter as `capture`, the raw bytes of every banner read
+#                   and HTTP response are recorded before they are cleaned and truncated.
+#                   Probe slots are handed out per host by a FairShareLimiter (one weighted share per
+#                   host being scanned), so a slow or filtered host cannot hold every slot while the
+#                   others queue. When no budget is given the limiter is the budget; a given one (a
+#                   daemon LimiterShare, a shared semaphore) is entered after the host's share.
+class Scanner:
+    def __init__(self, config=None, services=None, semaphore=None, host_semaphore=None, dns_cache=None, wheel=None,
+                 profiler=None, transport=None, capture=None):
+        self.config = config or ScanConfig()
+        self.transport = transport or SocketTransport()
+        self.services = services if services is not None else ServiceDatabase()
+        self.sources = SourcePool(self.config.source_addresses) if self.config.source_addresses else None
+        self.budget = None if semaphore else socket_budget(self.config.max_concurrency, len(self.sources or ()) or 1)
+        self.semaphore = semaphore or nullcontext()
+        self.limiter = FairShareLimiter(self.budget.limit if self.budget else self.config.max_concurrency or 500)
+        self.default_share = self.limiter.share(None)
+        self.resource_errors = 0
+        self.wheel = wheel or TimerWheel(self.config.timer_resolution)
+        self.profiler = profiler
+        self.host_semaphore = host_semaphore or asyncio.Semaphore(self.config.max_hosts)
+        self.dns_cache = dns_cache
+        self.host_reports = {}
+        self.ports_total = 0
+        self.ports_done = 0
+        self.http_requests = 0
+        self.http_connections = 0
+        self.retry_probed = 0
+        self.retry_opened = 0
+        self.retry_unanswered = 0
+        self.learner = None
+        self.capture = capture
+        self.stopping = False
+        self.probing = set()
+        self.discovery = None
+        self.hosts_unstarted = 0
+        self.first_unstarted = None
+
+    #   METHOD 01:      scan
+    #   DESCRIPTION:    Async iterator of open-port results for a hostname, IP address or CIDR range
+    async def scan(self, target):
+        queue = asyncio.Queue()
+        done = object()
+
+        async def produce():
+            try:
+                await self.scan_target(target, queue.put_nowait)
+            finally:
+                queue.put_nowait(done)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                result = await queue.get()
+                if result is done:
+                    break
+                yield result
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+
+    #   METHOD 02:      scan_target
+    #   DESCRIPTION:    Resolves the target and scans every live host, passing each result to emit; with
+    #                   retry_timeouts the retry pass follows
+    async def scan_target(self, target, emit):
+        if '/' in target:
+            await self.scan_network(target, emit)
+        else:
+            started = perf_counter_ns()
+            target_ip = await self.resolve(target)
+            if self.profiler:
+                self.profiler.record('resolve', started)
+            await self.port_scan(target_ip, emit)
+        if self.config.retry_timeouts and not self.stopping:
+            await self.retry_pass(emit)
+
+    #   METHOD 03:      resolve
+    #   DESCRIPTION:    Non-blocking equivalent of socket.gethostbyname; raises socket.gaierror
+    async def resolve(self, target):
+        if self.dns_cache is not None and target in self.dns_cache:
+            return self.dns_cache[target]
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            target, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        if self.dns_cache is not None:
+            self.dns_cache[target] = infos[0][4][0]
+        return infos[0][4][0]
+
+    #   METHOD 04:      scan_network
+    #   DESCRIPTION:    Network subnet range loopback; raises ValueError for an invalid network
+    async def scan_network(self, target_range, emit):
+        import ipaddress
+        network = ipaddress.ip_network(target_range, strict=False)
+        learner = self.learner = PortLearner() if self.config.learn_ports else None
+        tasks = []
+        try:
+            hosts = network.num_addresses if network.prefixlen >= network.max_prefixlen - 1 else network.num_addresses - 2
+            for visited, ip in enumerate(network.hosts()):
+                if self.stopping:
+                    self.hosts_unstarted += hosts - visited
+                    self.first_unstarted = self.first_unstarted or str(ip)
+                    break
+                started = perf_counter_ns()
+                ping = self.discovery = asyncio.ensure_future(self.transport.is_alive(str(ip)))
+                await asyncio.wait((ping,))
+                self.discovery = None
+                if self.profiler:
+                    self.profiler.record('discover', started)
+                if ping.cancelled():
+                    self.hosts_unstarted += hosts - visited
+                    self.first_unstarted = self.first_unstarted or str(ip)
+                    break
+                if not ping.result():
+                    log.info("Host %s is not alive. Skipping.", ip)
+                    continue
+                tasks.append(asyncio.create_task(self.scan_single_host(str(ip), emit, learner)))
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+        for result in results:
+            if isinstance(result, Exception):
+                log.warning("Error scanning host: %s: %s", type(result).__name__, result)
+
+    #   METHOD 05:      scan_single_host
+    #   DESCRIPTION:    Asynchronous semaphore for single-address scans
+    async def scan_single_host(self, ip, emit, learner=None):
+        async with self.host_semaphore:
+            if self.stopping:
+                self.hosts_unstarted += 1
+                self.first_unstarted = self.first_unstarted or ip
+                return
+            await self.port_scan(ip, emit, learner)
+
+    #   METHOD 06:      port_scan
+    #   DESCRIPTION:    Port range loopback for port connectivity; with a PortLearner the ports its
+    #                   siblings found open go first and this host's finds are fed back to it. `ports`
+    #                   (a sized sequence) replaces the configured range. Every result is emitted as soon
+    #                   as its probe finishes, so a cancelled batch loses only the probes still in flight.
+    async def port_scan(self, target, emit, learner=None, ports=None):
+        config = self.config
+        health = self.host_reports[target] = HostHealth(target, config)
+        planned = ports
+        health.planned = len(ports) if ports is not None else config.end_port - config.start_port + 1
+        self.ports_total += health.planned
+        if learner:
+            forward = emit
+
+            def emit(result):
+                if health.state == 'normal':
+                    learner.record(result['Port'])
+                forward(result)
+
+        def admitted():
+            if planned is not None:
+                ports = planned
+            elif learner:
+                ports = learner.order(config.start_port, config.end_port)
+            else:
+                ports = range(config.start_port, config.end_port + 1)
+            ports = iter(ports)
+            for port in ports:
+                if self.stopping:
+                    health.unscanned.append(port)
+                    health.unscanned.extend(ports)
+                    return
+                if health.admit(port):
+                    yield port
+                else:
+                    self.ports_done += 1
+
+        async def probe(port):
+            try:
+                result = await self.scan_port(target, port, health)
+            except asyncio.CancelledError:
+                health.unscanned.append(port)
+                raise
+            if result:
+                emit(result)
+
+        ports = admitted()
+        if config.backend == 'threads':
+            await self.port_scan_threads(target, list(ports), emit, health.unscanned)
+            return
+        health.share = self.limiter.share(target, host_weight(target, config.host_weights))
+        try:
+            for port_batch in batch_ports(ports, config.batch_size):
+                batch_results = await asyncio.gather(*[probe(port) for port in port_batch], return_exceptions=True)
+                health.evaluate()
+                for result in batch_results:
+                    if isinstance(result, Exception):
+                        log.warning("%s: exception occurred: %s: %s", target, type(result).__name__, result)
+        finally:
+            self.limiter.remove(health.share)
+            if self.stopping:
+                for _ in ports:
+                    pass
+
+    #   METHOD 07:      port_scan_threads
+    #   DESCRIPTION:    Runs the bps_m02 bounded thread pool off the loop and streams its results back
+    #                   through emit; max_concurrency sets the worker count (500 when it is 'auto'). It
+    #                   always uses real sockets, whatever the transport. `ports` is built on the loop
+    #                   thread beforehand (the learner is not thread-safe); once the scan is cancelled or
+    #                   stopped no further port is submitted and the rest go to `unscanned`. The worker
+    #                   thread only reads scanner state: results, ports_done (in batch_size steps) and
+    #                   unscanned are handed to the loop with call_soon_threadsafe and applied there.
+    async def port_scan_threads(self, target, ports, emit, unscanned=None):
+        import threading
+        import bps_m02
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+        step = max(self.config.batch_size, 1)
+
+        def advance(count):
+            self.ports_done += count
+
+        def deliver(result, seen):
+            result.update(Host=target, Service=self.services.lookup(result['Port']), Flags='', Seen=seen)
+            emit(result)
+
+        def dispatched():
+            remaining = iter(ports)
+            count = 0
+            try:
+                for port in remaining:
+                    if stop.is_set() or self.stopping:
+                        if unscanned is not None:
+                            loop.call_soon_threadsafe(unscanned.extend, [port, *remaining])
+                        return
+                    count += 1
+                    if count == step:
+                        loop.call_soon_threadsafe(advance, count)
+                        count = 0
+                    yield port
+            finally:
+                if count:
+                    loop.call_soon_threadsafe(advance, count)
+
+        def run():
+            feed = dispatched()
+            for result in bps_m02.scan_ports_bounded(target, feed, self.config.timeout, self.config.max_concurrency or 500):
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(deliver, result, time.time())
+            for _ in feed:
+                pass
+
+        try:
+            await asyncio.to_thread(run)
+        finally:
+            stop.set()
+
+    #   METHOD 08:      open_probe
+    #   DESCRIPTION:    Connect check on a bare socket bounded by the timer wheel; local exhaustion (EMFILE,
+    #                   EADDRNOTAVAIL, ...) says nothing about the port, so it is retried with backoff
+    #                   instead of reported closed. With --source_addresses every attempt, retries
+    #                   included, takes the next source of the pool.
+    async def open_probe(self, target, port, timeout=None):
+        sources = self.sources
+        for attempt in range(self.config.resource_retries + 1):
+            source = sources.next() if sources else None
+            try:
+                async with self.wheel.timeout(timeout or self.config.timeout):
+                    sock = await self.transport.connect(target, port, source)
+                if sources:
+                    sources.record(source, 'open')
+                return sock
+            except OSError as e:
+                if not is_resource_error(e) or attempt == self.config.resource_retries:
+                    raise
+                self.resource_errors += 1
+                if sources:
+                    sources.record(source, 'exhausted')
+                await asyncio.sleep(0.05 * 2 ** attempt)
+
+    #   METHOD 09:      close_probe
+    #   DESCRIPTION:    Aborts with RST (no TIME_WAIT) unless graceful close was requested
+    async def close_probe(self, writer):
+        if writer.is_closing():
+            return
+        if self.config.rst_close:
+            self.transport.abort(writer)
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (RuntimeError, OSError):
+            pass
+
+    #   METHOD 10:      scan_port / probe_port
+    #   DESCRIPTION:    Establishing socket-to-port connections: scan_port takes a probe slot from the host's
+    #                   share (or, once the scan is stopping, records the port as unscanned) and probe_port
+    #                   runs the probe; probes holding a slot are kept in `probing` for abort()
+    async def scan_port(self, target, port, health=None, timeout=None):
+        health = health or HostHealth(target, self.config)
+        async with health.share or self.default_share, self.semaphore:
+            if self.stopping:
+                health.unscanned.append(port)
+                return None
+            task = asyncio.current_task()
+            self.probing.add(task)
+            try:
+                return await self.probe_port(target, port, health, timeout)
+            finally:
+                self.probing.discard(task)
+
+    async def probe_port(self, target, port, health, timeout=None):
+        profiler = self.profiler
+        started = perf_counter_ns()
         try:
-            reader, writer = await asyncio.wait_for(
-                asyncio.open_connection(target, port), timeout=timeout)
-        except (ConnectionRefusedError, ConnectionResetError, asyncio.TimeoutError) as e:
-            if args and args.verbose:
-                print(f"Port {port}: Connection error: {type(e).__name__}: {e}")
+            sock = await self.open_probe(target, port, timeout)
+        except (ConnectionRefusedError, ConnectionResetError) as e:
+            health.record_connect('refused')
+            log.debug("%s:%d connection refused: %s: %s", target, port, type(e).__name__, e)
             return None
-        except asyncio.CancelledError:
+        except asyncio.TimeoutError as e:
+            health.record_connect('timeout')
+            health.timed_out.append(port)
+            log.debug("%s:%d connection timed out", target, port)
             return None
         except Exception as e:
-            if args and args.verbose:
-                print(f"Port {port}: Unexpected error during connection: {type(e).__name__}: {e}")
-                traceback.print_exc()
+            health.record_connect('error')
+            log.warning("%s:%d unexpected error during connection: %s: %s", target, port,
+                        type(e).__name__, e, exc_info=log.isEnabledFor(logging.DEBUG))
             return None
+        finally:
+            self.ports_done += 1
+            if profiler:
+                profiler.record('connect', started)
+        health.record_connect('open')
+
+        if not (self.config.banners and health.grab_banners):
+            self.transport.discard(sock, self.config.rst_close)
+            return self.make_result(target, port, 'No banner', health)
 
         try:
-            if asyncio.current_task().cancelled():
-                return None
+            reader, writer = await self.transport.open_streams(sock)
+        except OSError:
+            self.transport.discard(sock, False)
+            return self.make_result(target, port, 'No banner', health)
 
-            plugin_func = service_plugins.get(port)
-            if plugin_func:
-                banner = await asyncio.wait_for(plugin_func(reader, writer), timeout=1)
-            else:
-                writer.write(b"\r\n")
-                await writer.drain()
-                data = await asyncio.wait_for(reader.read(4096), timeout=1)
-                banner = data.decode('utf-8', errors='ignore').strip()
-                banner = clean_banner(banner) if banner else 'No banner'
-        except (ConnectionResetError, asyncio.TimeoutError, OSError, asyncio.CancelledError) as e:
-            banner = 'No banner'
-            if args and args.verbose:
-                print(f"Port {port}: Error reading banner: {type(e).__name__}: {e}")
+        plugin_func = service_plugins.get(port)
+        pages = []
+        started = perf_counter_ns()
+        try:
+            if not plugin_func and self.config.http_paths and port in self.config.http_ports:
+                banner, writer = await self.http_probe(target, port, pages, reader, writer)
+                health.record_banner(False)
+                if profiler:
+                    profiler.record('http', started)
+                return self.make_result(target, port, banner, health, pages)
+            async with self.wheel.timeout(self.config.banner_timeout):
+                if plugin_func:
+                    banner = await plugin_func(reader, writer)
+                else:
+                    writer.write(b"\r\n")
+                    await writer.drain()
+                    data = await reader.read(4096)
+                    if self.capture and data:
+                        self.capture.record(target, port, 'banner', data)
+            if not plugin_func and self.config.http_paths and data.startswith(b"HTTP/"):
+                await self.close_probe(writer)
+                writer = None
+                banner, writer = await self.http_probe(target, port, pages)
+                health.record_banner(False)
+                if profiler:
+                    profiler.record('http', started)
+            elif not plugin_func:
+                if profiler:
+                    profiler.record('banner', started)
+                    started = perf_counter_ns()
+                banner = banner_text(data)
+                health.record_banner(False)
+                if profiler:
+                    profiler.record('clean', started)
+            elif profiler:
+                profiler.record('plugin', started)
+        except (ConnectionResetError, asyncio.TimeoutError, OSError) as e:
+            banner = self.http_banner(pages) if pages else 'No banner'
+            if profiler:
+                profiler.record('plugin' if plugin_func else 'http' if pages else 'banner', started)
+            if isinstance(e, asyncio.TimeoutError):
+                health.record_banner(True)
+            log.debug("%s:%d error reading banner: %s: %s", target, port, type(e).__name__, e)
         except Exception as e:
             banner = 'No banner'
-            if args and args.verbose:
-                print(f"Port {port}: Unexpected error during banner reading: {type(e).__name__}: {e}")
-                traceback.print_exc()
+            log.warning("%s:%d unexpected error during banner reading: %s: %s", target, port,
+                        type(e).__name__, e, exc_info=log.isEnabledFor(logging.DEBUG))
         finally:
-            if not writer.is_closing():
-                writer.close()
-                try:
-                    await writer.wait_closed()
-                except RuntimeError:
-                    pass
+            if writer:
+                await self.close_probe(writer)
+
+        return self.make_result(target, port, banner, health, pages)
 
-        service_name = get_service_name(port)
+    #   METHOD 11:      make_result
+    #   DESCRIPTION:    Builds the result record for an open port; 'Seen' is the Unix time the probe
+    #                   finished (the results store dates rows by it) and HTTP ports also carry the
+    #                   structured per-path fields of the deep probe under 'HTTP' (kept by the JSON
+    #                   Lines writer)
+    def make_result(self, target, port, banner, health, pages=None):
         if len(banner) > 80:
             banner = banner[:80] + '...'
 
-        return {
+        result = {
+            'Host': target,
             'Port': port,
-            'Service': service_name,
+            'Service': self.services.lookup(port),
             'Status': 'Open',
-            'Banner': banner
+            'Banner': banner,
+            'Flags': health.flag,
+            'Seen': time.time()
         }
+        if pages:
+            result['HTTP'] = pages
+        return result
 
-#   VAR 05:         port_scan
-#   DESCRIPTION:    Port range loopback for port connectivity
-async def port_scan(target, start_port, end_port, timeout, batch_size=1000):
-    try: 
-        start_time = time.time()
-        print(f"Scanning {target} from port {start_port} to {end_port}")
+    #   METHOD 12:      http_probe
+    #   DESCRIPTION:    bps_http deep probe of the configured paths into `pages`, reusing the probe's connection
+    #                   (or opening one when none is given) for as long as the server keeps it alive; returns
+    #                   the banner line and the writer still open, or None. A service that answers with
+    #                   something other than HTTP (SSH, Redis, a raw proxy on 8080) gets the same banner
+    #                   and capture the generic read would have given it.
+    async def http_probe(self, target, port, pages, reader=None, writer=None):
+        import bps_http
 
-        results = []
-        errors = []
+        async def connect():
+            sock = await self.open_probe(target, port)
+            self.http_connections += 1
+            return await self.transport.open_streams(sock)
 
-        def batch_ports(iterable, size):
-            iterator = iter(iterable)
-            while True:
-                batch = list(islice(iterator, size))
-                if not batch:
-                    break
-                yield batch
-
-        for port_batch in batch_ports(range(start_port, end_port + 1), batch_size):
-            if asyncio.current_task().cancelled():
-                print("Scan cancelled.")
-                break
-            tasks = [scan_port(target, port, timeout) for port in port_batch]
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    if args and args.verbose:
-                        print(f"Exception occurred: {type(result).__name__}: {result}")
-                    errors.append({'Error': str(result)})
-                elif result:
-                    results.append(result)
-
-        elapsed_time = time.time() - start_time
-
-        if results:
-            results_table = [[f"{Fore.GREEN}{r['Port']}{Style.RESET_ALL}",
-                            f"{Fore.CYAN}{r['Service']}{Style.RESET_ALL}",
-                            f"{Fore.GREEN}{r['Status']}{Style.RESET_ALL}",
-                            r['Banner']] for r in results]
-            print(tabulate(results_table, headers=['Port', 'Service', 'Status', 'Banner']))
-            log_scan_results_to_file(results, "/home/kali/Desktop/Programs/scan_results.csv")
-        else:
-            print("No open ports found.")
+        def capture(path, raw):
+            self.capture.record(target, port, 'http', raw, path)
 
-        if errors and args.verbose:
-            print("\nErrors encountered during scanning:")
-            error_table = [[e.get('Port', 'Unknown'), e['Error']] for e in errors]
-            print(tabulate(error_table, headers=['Port', 'Error Message']))
+        if writer:
+            self.http_connections += 1
+        fetched = len(pages)
+        unparsed = bytearray()
+        try:
+            writer = await bps_http.fetch_paths(
+                target, port, self.config.http_paths, pages, reader, writer, connect, self.close_probe,
+                lambda: self.wheel.timeout(self.config.banner_timeout), capture if self.capture else None, unparsed)
+        except (asyncio.TimeoutError, OSError):
+            if pages or not unparsed:
+                raise
+            writer = None
+        finally:
+            self.http_requests += len(pages) - fetched
+        if not pages and unparsed:
+            if self.capture:
+                self.capture.record(target, port, 'banner', bytes(unparsed))
+            return banner_text(unparsed), writer
+        return bps_http.summarize(pages), writer
 
-        print(f"\nScanning of {target} completed in {elapsed_time:.2f} seconds.")
-    except Exception as e:
-        print(f"An error occurred during port scan of {target}: {e}")
-        traceback.print_exc()
+    #   METHOD 13:      http_banner
+    #   DESCRIPTION:    Banner line for the pages a deep probe fetched before it was cut short
+    def http_banner(self, pages):
+        import bps_http
+        return bps_http.summarize(pages)
 
-#   VAR 06:         is_host_alive
-#   DESCRIPTION:    Network address loopback
-async def is_host_alive(ip):
-    param = '-n' if platform.system().lower() == 'windows' else '-c'
-    command = f"ping {param} 1 {ip}"
-    proc = await asyncio.create_subprocess_shell(
-        command,
-        stdout=asyncio.subprocess.DEVNULL,
-        stderr=asyncio.subprocess.DEVNULL
-    )
-    await proc.communicate()
-    return proc.returncode == 0
+    #   METHOD 14:      retry_pass
+    #   DESCRIPTION:    Second pass over every (host, port) whose connect timed out, with retry_timeout per
+    #                   probe and at most retry_concurrency probes in flight, so timeouts caused by our own
+    #                   first-pass congestion or transient drops get a calm second look. Hosts flagged
+    #                   'filtered' are skipped. Ports that answer now are emitted like any other result;
+    #                   ports that time out again stay in timed_out.
+    async def retry_pass(self, emit):
+        pairs = []
+        for target, health in self.host_reports.items():
+            if health.timed_out and health.state != 'filtered':
+                pairs.append((target, health, health.timed_out))
+                health.timed_out = array('H')
+        if not pairs:
+            return
+        count = sum(len(ports) for _, _, ports in pairs)
+        self.ports_total += count
+        self.retry_probed += count
+        log.info("Retrying %d timed-out ports with a %.1fs timeout", count, self.config.retry_timeout)
+        semaphore = asyncio.Semaphore(self.config.retry_concurrency)
+
+        async def retry(target, port, health):
+            async with semaphore:
+                result = await self.scan_port(target, port, health, self.config.retry_timeout)
+            if result:
+                self.retry_opened += 1
+                emit(result)
+
+        for target, health, ports in pairs:
+            health.planned += len(ports)
+            health.share = self.limiter.share(target, host_weight(target, self.config.host_weights))
+            try:
+                for port_batch in batch_ports(ports, self.config.batch_size):
+                    results = await asyncio.gather(*[retry(target, port, health) for port in port_batch],
+                                                   return_exceptions=True)
+                    for result in results:
+                        if isinstance(result, Exception):
+                            log.warning("%s: exception occurred: %s: %s", target, type(result).__name__, result)
+            finally:
+                self.limiter.remove(health.share)
+        self.retry_unanswered += sum(len(health.timed_out) for _, health, _ in pairs)
+
+    #   METHOD 15:      stop / abort
+    #   DESCRIPTION:    stop() ends the scan without losing anything found: no new host, port or retry pass is
+    #                   started and probes already connecting run to completion. Probes waiting for a slot
+    #                   are not woken; each one still queues until a slot frees and then gives it straight
+    #                   back without connecting, so the queue drains at the rate the in-flight probes
+    #                   finish. abort() also cancels those and any ping in progress, and the scan
+    #                   then winds down normally with every result emitted so far. Only tasks holding a slot
+    #                   are cancelled: cancelling thousands of semaphore waiters costs O(n) each.
+    #                   Ports never probed are kept in HostHealth.unscanned.
+    def stop(self):
+        self.stopping = True
 
-#   VAR 07:         scan_network
-#   DESCRIPTION:    Network subnet range loopback
-async def scan_network(target_range, start_port, end_port, timeout):
+    def abort(self):
+        self.stopping = True
+        for task in list(self.probing):
+            task.cancel()
+        if self.discovery:
+            self.discovery.cancel()
+
+    #   METHOD 16:      unscanned_summary
+    #   DESCRIPTION:    Work a stopped scan left undone: {'ports': n, 'hosts': {ip: "1025-65535"}, 'unstarted_hosts':
+    #                   n, 'first_unstarted': ip}, or None when nothing was left
+    def unscanned_summary(self):
+        hosts = {target: port_ranges(health.unscanned) for target, health in self.host_reports.items()
+                 if health.unscanned}
+        if not hosts and not self.hosts_unstarted:
+            return None
+        return {'ports': sum(len(health.unscanned) for health in self.host_reports.values()), 'hosts': hosts,
+                'unstarted_hosts': self.hosts_unstarted, 'first_unstarted': self.first_unstarted}
+
+    #   METHOD 17:      host_progress
+    #   DESCRIPTION:    Per-host progress, least complete first: host, ports done (probed or skipped) and
+    #                   planned, probes in flight and queued for a slot, weight and health state; with
+    #                   active, only the hosts whose scan is running (those holding a limiter share)
+    def host_progress(self, active=False):
+        progress = []
+        targets = [share.key for share in self.limiter.shares if share.key is not None] if active else self.host_reports
+        for target in targets:
+            health = self.host_reports[target]
+            share = health.share
+            progress.append({'host': target, 'done': health.done, 'planned': health.planned,
+                             'in_flight': share.in_flight if share else 0, 'waiting': len(share.waiters) if share else 0,
+                             'weight': share.weight if share else 1, 'state': health.state})
+        progress.sort(key=lambda host: host['done'] / host['planned'] if host['planned'] else 1.0)
+        return progress
+
+
+#   VAR 07:         print_traceback
+#   DESCRIPTION:    Stack traceback for unexpected exceptions
+def print_traceback():
+    import traceback
+    traceback.print_exc()
+
+#   VAR 08:         print_scan_results
+#   DESCRIPTION:    Displays collected results as a colored table, or as plain lines without the table libraries
+def print_scan_results(results, display="table"):
+    if display == "plain":
+        for r in results:
+            print(f"{r['Host']}:{r['Port']}\t{r['Service']}\t{r['Status']}\t{r['Banner']}")
+        return
+    import colorama
+    from colorama import Fore, Style
+    from tabulate import tabulate
+    colorama.init()
+    results_table = [[f"{Fore.GREEN}{r['Port']}{Style.RESET_ALL}",
+                    f"{Fore.CYAN}{r['Service']}{Style.RESET_ALL}",
+                    f"{Fore.GREEN}{r['Status']}{Style.RESET_ALL}",
+                    r['Banner']] for r in results]
+    print(tabulate(results_table, headers=['Port', 'Service', 'Status', 'Banner']))
+
+#   VAR 09:         open_result_writers
+#   DESCRIPTION:    Opens the --output and --store writers before scanning so results are serialized in
+#                   batches as they arrive; a writer that cannot be opened is reported and left out
+def open_result_writers(parsed_args, config):
+    outputs = []
+    if parsed_args.output:
+        outputs.append((parsed_args.output, parsed_args.output_format))
+    if parsed_args.store:
+        outputs.append((parsed_args.store, 'sqlite'))
+    if not outputs:
+        return []
+    from bps_writers import open_writer
+    metadata = {'target': parsed_args.target, 'started': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'loop': loop_name(asyncio.get_running_loop()), 'config': vars(config)}
+    writers = []
+    for path, output_format in outputs:
+        try:
+            writers.append(open_writer(path, output_format, metadata))
+        except (FileNotFoundError, ValueError, ImportError, OSError) as e:
+            print(f"Failed to open results file {path}: {e}")
+    return writers
+
+#   VAR 10:         open_capture
+#   DESCRIPTION:    bps_capture writer for --capture, or None; a directory that cannot be used is reported
+#                   and the scan runs without capture
+def open_capture(parsed_args, config):
+    if not parsed_args.capture:
+        return None
+    from bps_capture import CaptureWriter
+    metadata = {'started': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'config': vars(config)}
     try:
-        print(f"Starting network scan for {target_range}")
-        network = ipaddress.ip_network(target_range, strict=False)
-        tasks = []
-        for ip in network.hosts():
-            if asyncio.current_task().cancelled():
-                print("Scan cancelled.")
-                break
-            if not await is_host_alive(str(ip)):
-                print(f"Host {ip} is not alive. Skipping.")
-                continue
-            task = asyncio.create_task(
-                scan_single_host(str(ip), start_port, end_port, timeout)
-            )
-            tasks.append(task)
-        if tasks:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            for result in results:
-                if isinstance(result, Exception):
-                    print(f"Error scanning IP: {result}")
-    except ValueError as e:
-        print(f"Invalid network: {e}")
-    except Exception as e:
-        print(f"An unexpected error occurred during network scan: {e}")
-        traceback.print_exc()
-
-#   VAR 08:         scan_single_host
-#   DESCRIPTION:    Asynchronous semaphore for single-address scans
-async def scan_single_host(ip, start_port, end_port, timeout):
-    async with network_semaphore:
-        await port_scan(ip, start_port, end_port, timeout)
-
-#   VAR 09:         log_scan_results_to_file
-#   DESCRIPTION:    Redirects scan output to file in directory
-def log_scan_results_to_file(results, output_file):
+        return CaptureWriter(parsed_args.capture, parsed_args.capture_compression, parsed_args.target, metadata)
+    except (ValueError, OSError) as e:
+        print(f"Failed to open capture directory {parsed_args.capture}: {e}")
+        return None
+
+#   VAR 11:         event_loop_factory
+#   DESCRIPTION:    loop_factory for asyncio.Runner: None (the default asyncio loop) or uvloop's; asks for
+#                   uvloop fall back to asyncio with a notice when it is not installed
+def event_loop_factory(name):
+    if name != 'uvloop':
+        return None
     try:
-        directory = os.path.dirname(output_file)
-        if not directory or not os.path.isdir(directory):
-            raise FileNotFoundError(f"Directory does not exist: {directory}")
-        with open(output_file, 'w', encoding='utf-8') as file:
-            file.write("Port,Service,Status,Banner\n")
-            for result in results:
-                port = result.get('Port', 'Unknown')
-                service = result.get('Service', 'Unknown Service')
-                status = result.get('Status', 'Unknown')
-                banner = result.get('Banner', '').replace('\n', ' ').replace(',', ';')
-                file.write(f"{port},{service},{status},{banner}\n")
-        print(f"\nScan results successfully logged to {output_file}")
-    except FileNotFoundError as e:
-        print(f"\nFailed to log scan results: {e}")
-    except Exception as e:
-        print(f"\nUnexpected error while logging scan results: {e}")
+        import uvloop
+    except ImportError:
+        print("uvloop is not installed (pip install uvloop); using the asyncio event loop")
+        return None
+    return uvloop.new_event_loop
+
+#   VAR 12:         loop_name
+#   DESCRIPTION:    Implementation of a running loop as recorded in output metadata: 'uvloop <version>',
+#                   or 'asyncio' plus the loop class when it is not the default selector loop
+def loop_name(loop):
+    module = type(loop).__module__
+    if module.startswith('uvloop'):
+        import uvloop
+        return f"uvloop {uvloop.__version__}"
+    if module.startswith('asyncio'):
+        return 'asyncio'
+    return f"asyncio ({module}.{type(loop).__name__})"
+
+#   VAR 13:         handle_interrupts
+#   DESCRIPTION:    First Ctrl-C stops the scan (no new probes) and gives in-flight probes `grace` seconds
+#                   before aborting them; a second one aborts at once. Returns False where the loop cannot
+#                   take signal handlers (Windows), leaving asyncio.Runner's cancellation in place.
+def handle_interrupts(scanner, grace):
+    import signal
+    loop = asyncio.get_running_loop()
+
+    def interrupted():
+        if scanner.stopping:
+            print("\nAborting in-flight probes")
+            scanner.abort()
+            return
+        print(f"\nStopping: no new probes, waiting up to {grace:g}s for those in flight (Ctrl-C again to abort)")
+        scanner.stop()
+        loop.call_later(grace, scanner.abort)
+
+    try:
+        loop.add_signal_handler(signal.SIGINT, interrupted)
+    except (NotImplementedError, RuntimeError, ValueError):
+        return False
+    return True
+
+#   VAR 14:         unscanned_report
+#   DESCRIPTION:    Console lines for Scanner.unscanned_summary(), at most `limit` hosts listed
+def unscanned_report(unscanned, limit=10):
+    lines = [f"Scan stopped early: {unscanned['ports']} ports on {len(unscanned['hosts'])} hosts not probed"
+             + (f", {unscanned['unstarted_hosts']} hosts not started (first {unscanned['first_unstarted']})"
+                if unscanned['unstarted_hosts'] else "")]
+    for host, ports in list(unscanned['hosts'].items())[:limit]:
+        lines.append(f"  {host}: {ports}")
+    if len(unscanned['hosts']) > limit:
+        lines.append(f"  ... {len(unscanned['hosts']) - limit} more hosts (listed under 'unscanned' in the results metadata)")
+    return "\n".join(lines)
+
+#   VAR 15:         port_ranges
+#   DESCRIPTION:    Port numbers as a compact sorted range list: "22,80-85,443"
+def port_ranges(ports):
+    ports = sorted(set(ports))
+    ranges = []
+    for port in ports:
+        if ranges and port == ranges[-1][1] + 1:
+            ranges[-1][1] = port
+        else:
+            ranges.append([port, port])
+    return ",".join(str(low) if low == high else f"{low}-{high}" for low, high in ranges)
+
+#   VAR 16:         host_weight
+#   DESCRIPTION:    Share weight of a host: the last --host_weights entry whose address or network
+#                   contains it, else 1
+def host_weight(target, weights):
+    if not weights:
+        return 1
+    import ipaddress
+    weight = 1
+    try:
+        address = ipaddress.ip_address(target)
+    except ValueError:
+        return 1
+    for network, value in weights:
+        if address in ipaddress.ip_network(network):
+            weight = value
+    return weight
+
+#   VAR 17:         banner_text
+#   DESCRIPTION:    Banner column for the raw bytes a service sent
+def banner_text(data):
+    banner = bytes(data).decode('utf-8', errors='ignore').strip()
+    return clean_banner(banner) if banner else 'No banner'
 
 # FUNCTIONS
 #   FUNC 01:        Scanner Function
-#   DESCRIPTION:    Handles IP or hostname resolution for GUI interface
+#   DESCRIPTION:    Runs one scan through the Scanner engine and reports it on the command line
 async def main_async(parsed_args):
-    global args
-    args = parsed_args
-    global port_service_mapping
-    port_service_mapping = load_port_service_mapping(args.csv_path)
+    config = ScanConfig.from_args(parsed_args)
+    profiler = None
+    if parsed_args.profile:
+        from bps_profile import ScanProfiler
+        profiler = ScanProfiler(parsed_args.profile, parsed_args.profiler, parsed_args.sample_interval)
+    scanner = Scanner(config, ServiceDatabase.from_csv(parsed_args.csv_path), profiler=profiler)
+    if scanner.sources:
+        try:
+            scanner.sources.check()
+        except ValueError as e:
+            print(e)
+            return
+    if '/' in parsed_args.target:
+        import ipaddress
+        try:
+            ipaddress.ip_network(parsed_args.target, strict=False)
+        except ValueError as e:
+            print(f"Invalid network: {e}")
+            return
+    start_time = time.time()
+    results_by_host = {}
+    found = 0
+    display = None
+    if parsed_args.display == 'live':
+        from bps_display import LiveDisplay
+        display = LiveDisplay(scanner)
+    writers = open_result_writers(parsed_args, config)
+    capture = open_capture(parsed_args, config)
+    scanner.capture = capture
+    from bps_logging import LogPipeline
+    diagnostics = LogPipeline('debug' if parsed_args.verbose else parsed_args.log_level,
+                              parsed_args.log_file, parsed_args.log_sample)
 
+    interrupts = handle_interrupts(scanner, parsed_args.stop_grace)
+    diagnostics.start()
     try:
-        if '/' in args.target:
-            await scan_network(args.target, args.start_port, args.end_port, args.timeout)
-        else:
+        async with profiler or nullcontext(), display or nullcontext():
             try:
-                target_ip = socket.gethostbyname(args.target)
-                await port_scan(target_ip, args.start_port, args.end_port, args.timeout)
+                print(f"Scanning {parsed_args.target} from port {config.start_port} to {config.end_port}")
+                async for result in scanner.scan(parsed_args.target):
+                    started = perf_counter_ns()
+                    found += 1
+                    if display:
+                        display.add(result)
+                    else:
+                        results_by_host.setdefault(result['Host'], []).append(result)
+                    for writer in writers:
+                        writer.write(result)
+                    if profiler:
+                        profiler.record('output', started)
             except socket.gaierror:
-                print(f"Could not resolve hostname: {args.target}")
+                print(f"Could not resolve hostname: {parsed_args.target}")
+            except asyncio.CancelledError:
+                print("Scan cancelled by user.")
             except Exception as e:
-                print(f"Unexpected error: {e}")
-    except asyncio.CancelledError:
-        print("Scan cancelled by user.")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        traceback.print_exc()
+                print(f"An unexpected error occurred: {e}")
+                print_traceback()
+            finally:
+                if capture:
+                    await capture.drain()
+                unscanned = scanner.unscanned_summary()
+                for output in writers + ([capture] if capture else []):
+                    if unscanned:
+                        output.annotate(unscanned=unscanned)
+                    output.close()
+
+            started = perf_counter_ns()
+            for host, host_results in results_by_host.items():
+                host_results.sort(key=lambda r: r['Port'])
+                print(f"\nResults for {host}:")
+                print_scan_results(host_results, parsed_args.display)
+            if profiler:
+                profiler.record('output', started)
+    finally:
+        diagnostics.stop()
+        if interrupts:
+            import signal
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGINT)
+
+    if unscanned:
+        print(unscanned_report(unscanned))
+    if not found:
+        print("No open ports found.")
+    if scanner.budget.throttled:
+        print(scanner.budget.summary())
+    if scanner.resource_errors:
+        print(f"Throttled {scanner.resource_errors} times by local socket exhaustion (open files or ephemeral ports)")
+    if scanner.sources:
+        print(scanner.sources.summary())
+    if scanner.http_requests:
+        print(f"HTTP probe: {scanner.http_requests} requests over {scanner.http_connections} connections")
+    if scanner.learner and scanner.learner.counts:
+        print(scanner.learner.summary())
+    if scanner.retry_probed:
+        print(f"Retry pass: {scanner.retry_probed} timed-out ports re-probed, {scanner.retry_opened} flipped to open, "
+              f"{scanner.retry_unanswered} still timed out")
+    for health in scanner.host_reports.values():
+        if health.state != 'normal':
+            print(health.summary())
+    for writer in writers:
+        print(f"\nScan results successfully logged to {writer.path} ({writer.rows_written} rows)")
+    if capture:
+        print(capture.summary())
+    if profiler:
+        print(f"\n{profiler.report()}")
+
+    elapsed_time = time.time() - start_time
+    print(f"\nScanning of {parsed_args.target} completed in {elapsed_time:.2f} seconds.")
 
 #   FUNC 02:        Function Argument Parser
 #   DESCRIPTION:    Handles arguments for GUI interface
 def main(parsed_args):
-    asyncio.run(main_async(parsed_args))
+    raise_nofile_limit()
+    with asyncio.Runner(loop_factory=event_loop_factory(parsed_args.loop)) as runner:
+        runner.run(main_async(parsed_args))
 
 #   FUNC 03:        Scanner Function
 #   DESCRIPTION:    Processes IP or hostname resolution
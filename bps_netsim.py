@@ -0,0 +1,357 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Simulated network transport on virtual time:    #
+#                       per-host latency, loss, open/closed/filtered    #
+#                       port maps and tarpits for scheduler benchmarks  #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# VIRTUAL TIME
+#   VirtualTimeLoop is a SelectorEventLoop whose clock only moves when the loop has nothing to run:
+#   instead of sleeping until the next timer, the selector jumps the clock to it. Connect latencies,
+#   SYN retransmits, TimerWheel deadlines and banner timeouts all cost the CPU of their callbacks and
+#   nothing else, so a million-probe scan over a lossy WAN replays in seconds of wall time. Runs are
+#   deterministic: the outcome of a probe depends only on the seed, the host and the port (and on
+#   how often that pair already saw loss), never on the order the scheduler issued it in.
+#   Only numeric addresses resolve; getaddrinfo is answered inline instead of on an executor thread.
+#
+# MODEL
+#   Every probe to a host that is not in the model, or to a filtered port, gets no answer. Other probes
+#   are answered after one round trip, median `rtt` seconds with log-normal `jitter`. With probability
+#   `loss` a round trip is lost and the SYN is retransmitted after 1, 2, 4, ... seconds as the kernel
+#   would. Closed ports refuse. Open ports accept and send their reply bytes half a round trip after
+#   the streams open; a tarpit host accepts every port and never sends anything.
+#
+# SPEC (JSON, see SimulatedNetwork.from_spec)
+#   {"seed": 1, "hosts": [{"address": "10.0.0.0/29", "rtt": 0.08, "jitter": 0.3, "loss": 0.01,
+#                          "open": {"22": "SSH-2.0-OpenSSH_9.6", "80": ""}, "filtered": ["1-1023", 3389],
+#                          "default": "closed", "tarpit": false, "alive": true}]}
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import asyncio                      # LIBRARY 01:  Concurrent programming design for high-performance network queues    https://realpython.com/async-io-python/
+import errno                        # LIBRARY 02:  Standard errno system symbols                                        https://docs.python.org/3/library/errno.html
+import ipaddress                    # LIBRARY 03:  IPv4/IPv6 manipulation library                                       https://docs.python.org/3/library/ipaddress.html
+import os                           # LIBRARY 04:  Miscellaneous operating system interfaces                            https://docs.python.org/3/library/os.html
+import random                       # LIBRARY 05:  Seeded per-probe draws for latency and loss                          https://docs.python.org/3/library/random.html
+import selectors                    # LIBRARY 06:  High-level I/O multiplexing                                          https://docs.python.org/3/library/selectors.html
+import socket                       # LIBRARY 07:  Numeric-only getaddrinfo for the virtual loop                        https://github.com/python/cpython/tree/3.13/Lib/socket.py
+
+# CONSTANT VARIABLES
+SYN_BACKOFF = (1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+PING_TIMEOUT = 1.0
+PORT_STATES = ('open', 'closed', 'filtered')
+REPLIES = {
+    21: b"220 (vsFTPd 3.0.5)\r\n",
+    22: b"SSH-2.0-OpenSSH_9.6p1 Ubuntu-3ubuntu13\r\n",
+    25: b"220 mail.example.com ESMTP Postfix\r\n",
+    80: b"HTTP/1.1 200 OK\r\nServer: nginx/1.24.0\r\nContent-Length: 0\r\n\r\n",
+    110: b"+OK Dovecot ready.\r\n",
+    3306: b"J\x00\x00\x00\n8.0.36\x00",
+    6379: b"-ERR unknown command\r\n",
+    8080: b"HTTP/1.1 200 OK\r\nServer: Jetty(9.4.z)\r\nContent-Length: 0\r\n\r\n",
+}
+
+# CLASSES
+#   CLASS 01:       VirtualClockSelector
+#   DESCRIPTION:    Wraps the default selector; a select() that finds no ready file descriptor advances the
+#                   clock by the timeout it was given instead of blocking (a timeout of None still blocks,
+#                   so thread-safe callbacks keep working)
+class VirtualClockSelector:
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.now = 0.0
+
+    def select(self, timeout=None):
+        events = self.selector.select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            return self.selector.select(None)
+        self.now += timeout
+        return events
+
+    def __getattr__(self, name):
+        return getattr(self.selector, name)
+
+#   CLASS 02:       VirtualTimeLoop
+#   DESCRIPTION:    Event loop on the VirtualClockSelector's clock; pass it as a loop_factory (see run())
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    def __init__(self):
+        self.clock = VirtualClockSelector()
+        super().__init__(self.clock)
+
+    def time(self):
+        return self.clock.now
+
+    async def getaddrinfo(self, host, port, *, family=0, type=0, proto=0, flags=0):
+        return socket.getaddrinfo(host, port, family, type, proto, flags | socket.AI_NUMERICHOST)
+
+#   CLASS 03:       SimHost
+#   DESCRIPTION:    One simulated host: latency and loss of its path, port map and behaviour. open_ports
+#                   maps port -> reply bytes (b"" for a service that waits for the client); ports in
+#                   `filtered` drop probes and every other port is `default`.
+class SimHost:
+    def __init__(self, address, rtt=0.05, jitter=0.3, loss=0.0, open_ports=None, filtered=(), default='closed',
+                 tarpit=False, alive=True):
+        if default not in PORT_STATES:
+            raise ValueError(f"default must be one of {', '.join(PORT_STATES)}, not {default!r}")
+        self.address = address
+        self.key = int(ipaddress.IPv4Address(address))
+        self.rtt = rtt
+        self.jitter = jitter
+        self.loss = loss
+        self.open_ports = dict(open_ports or {})
+        self.filtered = frozenset(filtered)
+        self.default = default
+        self.tarpit = tarpit
+        self.alive = alive
+
+    #   METHOD 01:      state
+    #   DESCRIPTION:    'open', 'closed', 'filtered' or 'tarpit' (accepted, never answered)
+    def state(self, port):
+        if port in self.open_ports:
+            return 'open'
+        if self.tarpit:
+            return 'tarpit'
+        return 'filtered' if port in self.filtered else self.default
+
+    #   METHOD 02:      round_trip
+    #   DESCRIPTION:    One round-trip time drawn from the host's latency distribution
+    def round_trip(self, rng):
+        return self.rtt * rng.lognormvariate(0.0, self.jitter) if self.jitter else self.rtt
+
+#   CLASS 04:       SimSocket
+#   DESCRIPTION:    Stand-in for a connected socket
+class SimSocket:
+    def __init__(self, host, port, reply, rtt):
+        self.host = host
+        self.port = port
+        self.reply = reply
+        self.rtt = rtt
+        self.closed = False
+
+#   CLASS 05:       SimWriter
+#   DESCRIPTION:    StreamWriter stand-in: counts bytes written; closing it cancels a reply still in flight
+class SimWriter:
+    def __init__(self, network, sock, delivery=None):
+        self.network = network
+        self.sock = sock
+        self.delivery = delivery
+
+    def write(self, data):
+        self.network.bytes_sent += len(data)
+
+    async def drain(self):
+        pass
+
+    def is_closing(self):
+        return self.sock.closed
+
+    def close(self):
+        if self.delivery:
+            self.delivery.cancel()
+        self.network.release(self.sock)
+
+    async def wait_closed(self):
+        pass
+
+    def get_extra_info(self, name, default=None):
+        return default
+
+#   CLASS 06:       SimulatedNetwork
+#   DESCRIPTION:    In-process network implementing the Scanner transport interface (connect, open_streams,
+#                   discard, abort, is_alive; see bps_m05.SocketTransport). Must run on a VirtualTimeLoop to
+#                   be fast, but works on any loop. Counters: probes issued, refused, unanswered (filtered,
+#                   no such host, or lost past every retransmit), established connections, connects that
+#                   needed a retransmit, and the peaks of SYNs outstanding and of connections held open.
+class SimulatedNetwork:
+    def __init__(self, hosts=(), seed=0):
+        self.hosts = {}
+        self.seed = seed
+        self.lost = {}
+        self.probes = 0
+        self.refused = 0
+        self.unanswered = 0
+        self.established = 0
+        self.retransmitted = 0
+        self.connecting = 0
+        self.connected = 0
+        self.peak_connecting = 0
+        self.peak_connected = 0
+        self.bytes_sent = 0
+        for host in hosts:
+            self.add(host)
+
+    #   METHOD 01:      add
+    #   DESCRIPTION:    Adds (or replaces) a SimHost; returns it
+    def add(self, host):
+        self.hosts[host.address] = host
+        return host
+
+    #   METHOD 02:      random
+    #   DESCRIPTION:    Generator for one probe of host:port, seeded by the pair and by how many of its
+    #                   earlier connects saw loss, so a retry of a lost probe gets fresh draws
+    def random(self, host, port):
+        attempt = self.lost.get((host.address, port), 0) if self.lost else 0
+        return random.Random((self.seed << 64) | (host.key << 24) | (port << 8) | min(attempt, 255))
+
+    #   METHOD 03:      connect
+    #   DESCRIPTION:    Resolves after the simulated handshake: a SimSocket for open and tarpit ports,
+    #                   ConnectionRefusedError for closed ones; unanswered probes never resolve (the caller's
+    #                   deadline cancels them) unless every retransmit was lost, which ends in ETIMEDOUT
+    async def connect(self, ip, port, source=None):
+        self.probes += 1
+        self.connecting += 1
+        if self.connecting > self.peak_connecting:
+            self.peak_connecting = self.connecting
+        try:
+            host = self.hosts.get(ip)
+            state = host.state(port) if host else 'filtered'
+            if state == 'filtered':
+                self.unanswered += 1
+                await asyncio.get_running_loop().create_future()
+            rng = self.random(host, port)
+            rtt = host.round_trip(rng)
+            delay = rtt
+            retries = 0
+            while host.loss and rng.random() < host.loss:
+                if retries == len(SYN_BACKOFF):
+                    delay = None
+                    break
+                delay += SYN_BACKOFF[retries]
+                retries += 1
+            if retries:
+                self.retransmitted += 1
+                self.lost[(ip, port)] = self.lost.get((ip, port), 0) + 1
+            if delay is None:
+                self.unanswered += 1
+                await asyncio.sleep(sum(SYN_BACKOFF))
+                raise OSError(errno.ETIMEDOUT, os.strerror(errno.ETIMEDOUT))
+            await asyncio.sleep(delay)
+        finally:
+            self.connecting -= 1
+        if state == 'closed':
+            self.refused += 1
+            raise ConnectionRefusedError(errno.ECONNREFUSED, os.strerror(errno.ECONNREFUSED))
+        self.established += 1
+        self.connected += 1
+        if self.connected > self.peak_connected:
+            self.peak_connected = self.connected
+        return SimSocket(host, port, host.open_ports.get(port) if state == 'open' else None, rtt)
+
+    #   METHOD 04:      open_streams
+    #   DESCRIPTION:    StreamReader fed with the port's reply half a round trip later, and a SimWriter
+    async def open_streams(self, sock):
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(loop=loop)
+        delivery = None
+        if sock.reply:
+            delivery = loop.call_later(sock.rtt / 2, reader.feed_data, sock.reply)
+        return reader, SimWriter(self, sock, delivery)
+
+    #   METHOD 05:      release
+    #   DESCRIPTION:    Marks a simulated connection closed (idempotent)
+    def release(self, sock):
+        if not sock.closed:
+            sock.closed = True
+            self.connected -= 1
+
+    def discard(self, sock, rst=True):
+        self.release(sock)
+
+    def abort(self, writer):
+        writer.close()
+
+    #   METHOD 06:      is_alive
+    #   DESCRIPTION:    Ping: one round trip for a live host, PING_TIMEOUT of silence otherwise
+    async def is_alive(self, ip):
+        host = self.hosts.get(ip)
+        if host is None or not host.alive:
+            await asyncio.sleep(PING_TIMEOUT)
+            return False
+        await asyncio.sleep(host.round_trip(self.random(host, 0)))
+        return True
+
+    #   METHOD 07:      expected_open
+    #   DESCRIPTION:    Ground truth: (address, port) of every open port in start..end on hosts that answer
+    #                   ping (CIDR scans skip the others) and are not tarpits
+    def expected_open(self, start_port, end_port, pinged_only=True):
+        return {(host.address, port) for host in self.hosts.values()
+                if not host.tarpit and (host.alive or not pinged_only)
+                for port in host.open_ports if start_port <= port <= end_port}
+
+    def summary(self):
+        return (f"Simulated network: {self.probes} probes, {self.established} established, {self.refused} refused, "
+                f"{self.unanswered} unanswered, {self.retransmitted} retransmitted; peak {self.peak_connecting} "
+                f"SYNs outstanding, {self.peak_connected} connections open")
+
+    #   METHOD 08:      from_spec
+    #   DESCRIPTION:    Network described by a SPEC dict (see the notes above); an address may be a CIDR
+    #                   block, giving every host in it the same profile
+    @classmethod
+    def from_spec(cls, spec):
+        network = cls(seed=spec.get('seed', 0))
+        for entry in spec.get('hosts', ()):
+            open_ports = entry.get('open', {})
+            if not isinstance(open_ports, dict):
+                open_ports = {port: REPLIES.get(port, b"") for port in expand_ports(open_ports)}
+            else:
+                open_ports = {int(port): reply.encode('latin-1') if isinstance(reply, str) else reply
+                              for port, reply in open_ports.items()}
+            addresses = ipaddress.ip_network(entry['address'], strict=False)
+            addresses = addresses.hosts() if addresses.num_addresses > 1 else [addresses.network_address]
+            for address in addresses:
+                network.add(SimHost(str(address), entry.get('rtt', 0.05), entry.get('jitter', 0.3),
+                                    entry.get('loss', 0.0), open_ports, expand_ports(entry.get('filtered', ())),
+                                    entry.get('default', 'closed'), entry.get('tarpit', False),
+                                    entry.get('alive', True)))
+        return network
+
+    #   METHOD 09:      synthetic
+    #   DESCRIPTION:    `hosts` live hosts at the start of `cidr`, each with a random open_ratio share of
+    #                   start..end open (well-known replies where REPLIES has one) and a filtered_ratio share
+    #                   filtered; the last `tarpits` of them are tarpits. Deterministic in `seed`.
+    @classmethod
+    def synthetic(cls, cidr, hosts, start_port, end_port, open_ratio=0.002, filtered_ratio=0.2, rtt=0.05,
+                  jitter=0.3, loss=0.0, tarpits=0, seed=0):
+        rng = random.Random(seed)
+        network = cls(seed=seed)
+        ports = range(start_port, end_port + 1)
+        addresses = iter(ipaddress.ip_network(cidr, strict=False).hosts())
+        for index in range(hosts):
+            address = str(next(addresses))
+            opened = rng.sample(ports, round(len(ports) * open_ratio))
+            filtered = rng.sample(ports, round(len(ports) * filtered_ratio))
+            network.add(SimHost(address, rtt * rng.uniform(0.5, 2.0), jitter, loss,
+                                {port: REPLIES.get(port, f"220 service {port} ready\r\n".encode()) for port in opened},
+                                filtered, tarpit=index >= hosts - tarpits))
+        return network
+
+# DECLARED VARIABLES
+#   VAR 01:         expand_ports
+#   DESCRIPTION:    Port numbers from a list of ints and "low-high" strings
+def expand_ports(items):
+    ports = set()
+    for item in items:
+        if isinstance(item, str) and '-' in item:
+            low, high = item.split('-', 1)
+            ports.update(range(int(low), int(high) + 1))
+        else:
+            ports.add(int(item))
+    return ports
+
+#   VAR 02:         run
+#   DESCRIPTION:    asyncio.run() on a VirtualTimeLoop
+def run(coro):
+    with asyncio.Runner(loop_factory=VirtualTimeLoop) as runner:
+        return runner.run(coro)
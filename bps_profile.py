@@ -0,0 +1,156 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            --profile support: per-stage timings, event-    #
+#                       -loop lag, cProfile stats and sampled stacks    #
+#                       in collapsed format for flame graphs            #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# OUTPUT FILES (written to the --profile directory)
+#   stages.json         per stage: count, total/mean/max milliseconds (resolve, discover, connect, banner,
+#                       plugin, clean, output); stage times are per-operation latencies summed over all
+#                       concurrent probes, so they can exceed the scan's wall time
+#   loop_lag.json       event-loop lag samples summary: how late a periodic wake-up ran (mean, p99, max)
+#   profile.pstats      cProfile statistics of the event-loop thread      (--profiler cprofile)
+#   stacks.collapsed    "frame;frame;frame count" lines for flamegraph.pl (--profiler sample)
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import asyncio                      # LIBRARY 01:  Concurrent programming design for high-performance network queues    https://realpython.com/async-io-python/
+import json                         # LIBRARY 02:  JSON encoder and decoder                                             https://docs.python.org/3/library/json.html
+import os                           # LIBRARY 03:  Miscellaneous operating system interfaces                            https://docs.python.org/3/library/os.html
+import sys                          # LIBRARY 04:  System-specific parameters and functions                             https://docs.python.org/3/library/sys.html#module-sys
+import threading                    # LIBRARY 05:  Thread-based parallelism                                             https://github.com/python/cpython/tree/3.13/Lib/threading.py
+import time                         # LIBRARY 06:  Time access and conversions                                          https://docs.python.org/3/library/time.html#module-time
+
+# CONSTANT VARIABLES
+STAGES = ('resolve', 'discover', 'connect', 'banner', 'http', 'plugin', 'clean', 'output')
+
+# CLASSES
+#   CLASS 01:       ScanProfiler
+#   DESCRIPTION:    Async context manager wrapped around a scan. record() costs one perf_counter_ns call
+#                   and three integer updates, so stage timing can stay on during real scans.
+class ScanProfiler:
+    def __init__(self, directory, mode='none', sample_interval=0.005, lag_interval=0.05):
+        self.directory = directory
+        self.mode = mode
+        self.sample_interval = sample_interval
+        self.lag_interval = lag_interval
+        self.stages = {stage: [0, 0, 0] for stage in STAGES}
+        self.lag_samples = []
+        self.stacks = {}
+        self.profile = None
+        self.sampler = None
+        self.lag_task = None
+        self.stopped = threading.Event()
+
+    #   METHOD 01:      record
+    #   DESCRIPTION:    Adds one operation that began at `started_ns` (time.perf_counter_ns) to a stage
+    def record(self, stage, started_ns):
+        elapsed = time.perf_counter_ns() - started_ns
+        entry = self.stages[stage]
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+
+    async def __aenter__(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.lag_task = asyncio.create_task(self.monitor_lag())
+        if self.mode == 'cprofile':
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        elif self.mode == 'sample':
+            loop_thread = threading.get_ident()
+            self.sampler = threading.Thread(target=self.sample_stacks, args=(loop_thread,), daemon=True)
+            self.sampler.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self.profile:
+            self.profile.disable()
+        self.stopped.set()
+        if self.sampler:
+            self.sampler.join()
+        self.lag_task.cancel()
+        try:
+            await self.lag_task
+        except asyncio.CancelledError:
+            pass
+        self.write()
+
+    #   METHOD 02:      monitor_lag
+    #   DESCRIPTION:    Sleeps lag_interval repeatedly and records how late each wake-up was
+    async def monitor_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.lag_samples.append(max(loop.time() - expected, 0.0))
+
+    #   METHOD 03:      sample_stacks
+    #   DESCRIPTION:    Sampling profiler thread: snapshots the loop thread's Python stack every interval
+    def sample_stacks(self, thread_id):
+        while not self.stopped.wait(self.sample_interval):
+            frame = sys._current_frames().get(thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                key = ";".join(reversed(names))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    #   METHOD 04:      summary
+    #   DESCRIPTION:    Stage and loop-lag figures as plain dictionaries
+    def summary(self):
+        stages = {stage: {'count': count, 'total_ms': round(total / 1e6, 3),
+                          'mean_ms': round(total / count / 1e6, 3) if count else 0.0,
+                          'max_ms': round(peak / 1e6, 3)}
+                  for stage, (count, total, peak) in self.stages.items()}
+        lags = sorted(self.lag_samples)
+        lag = {'samples': len(lags), 'interval_ms': self.lag_interval * 1000,
+               'mean_ms': round(sum(lags) / len(lags) * 1000, 3) if lags else 0.0,
+               'p99_ms': round(lags[int(len(lags) * 0.99)] * 1000, 3) if lags else 0.0,
+               'max_ms': round(lags[-1] * 1000, 3) if lags else 0.0}
+        return stages, lag
+
+    #   METHOD 05:      write
+    #   DESCRIPTION:    Writes the OUTPUT FILES listed at the top of this module
+    def write(self):
+        stages, lag = self.summary()
+        with open(os.path.join(self.directory, 'stages.json'), 'w', encoding='utf-8') as file:
+            json.dump(stages, file, indent=2)
+        with open(os.path.join(self.directory, 'loop_lag.json'), 'w', encoding='utf-8') as file:
+            json.dump(lag, file, indent=2)
+        if self.profile:
+            self.profile.dump_stats(os.path.join(self.directory, 'profile.pstats'))
+        if self.stacks:
+            with open(os.path.join(self.directory, 'stacks.collapsed'), 'w', encoding='utf-8') as file:
+                for stack, count in sorted(self.stacks.items()):
+                    file.write(f"{stack} {count}\n")
+
+    #   METHOD 06:      report
+    #   DESCRIPTION:    Human-readable summary for the end of a CLI run
+    def report(self):
+        stages, lag = self.summary()
+        lines = [f"{'Stage':<10}{'Count':>10}{'Total ms':>14}{'Mean ms':>12}{'Max ms':>12}"]
+        for stage, entry in stages.items():
+            if entry['count']:
+                lines.append(f"{stage:<10}{entry['count']:>10}{entry['total_ms']:>14.1f}"
+                             f"{entry['mean_ms']:>12.3f}{entry['max_ms']:>12.3f}")
+        lines.append(f"Event-loop lag: mean {lag['mean_ms']:.2f} ms, p99 {lag['p99_ms']:.2f} ms, "
+                     f"max {lag['max_ms']:.2f} ms over {lag['samples']} samples")
+        lines.append(f"Profile written to {self.directory}")
+        return "\n".join(lines)
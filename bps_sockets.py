@@ -0,0 +1,213 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Socket-level tuning for the bps_m05 engine:     #
+#                       RST close, file-descriptor and ephemeral-port   #
+#                       budgets, exhaustion detection, source pools     #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import errno                        # LIBRARY 01:  Standard errno system symbols                                        https://docs.python.org/3/library/errno.html
+import socket                       # LIBRARY 02:  low-level networking interface                                       https://github.com/python/cpython/tree/3.13/Lib/socket.py
+import struct                       # LIBRARY 03:  Interpret bytes as packed binary data (struct linger)                https://docs.python.org/3/library/struct.html
+import sys                          # LIBRARY 04:  System-specific parameters and functions                             https://docs.python.org/3/library/sys.html#module-sys
+
+try:
+    import resource                 # LIBRARY 05:  Resource usage limits (Unix only)                                    https://docs.python.org/3/library/resource.html
+except ImportError:
+    resource = None
+
+# CONSTANT VARIABLES
+FD_RESERVE = 64
+DEFAULT_EPHEMERAL_RANGE = (32768, 60999) if sys.platform.startswith('linux') else (49152, 65535)
+EPHEMERAL_RANGE_PATH = "/proc/sys/net/ipv4/ip_local_port_range"
+RESOURCE_ERRNOS = frozenset(e for e in (errno.EMFILE, errno.ENFILE, errno.EADDRNOTAVAIL, errno.ENOBUFS,
+                                        getattr(errno, 'EADDRINUSE', None)) if e is not None)
+LINGER_RST = struct.pack('ii', 1, 0)
+IP_BIND_ADDRESS_NO_PORT = getattr(socket, 'IP_BIND_ADDRESS_NO_PORT', 24 if sys.platform.startswith('linux') else None)
+
+# CLASSES
+#   CLASS 01:       SocketBudget
+#   DESCRIPTION:    Effective probe concurrency and the operating-system limits that shaped it; reasons
+#                   are kept in auto mode too, where they explain the size that was picked
+class SocketBudget:
+    def __init__(self, requested, limit, fd_limit, ephemeral_ports, reasons):
+        self.requested = requested
+        self.limit = limit
+        self.fd_limit = fd_limit
+        self.ephemeral_ports = ephemeral_ports
+        self.reasons = reasons
+
+    @property
+    def throttled(self):
+        return bool(self.reasons)
+
+    def summary(self):
+        if not self.reasons:
+            return f"Concurrency {self.limit} (file descriptors {self.fd_limit}, ephemeral ports {self.ephemeral_ports})"
+        if self.requested is None:
+            return f"Concurrency auto-sized to {self.limit}: " + "; ".join(self.reasons)
+        return f"Concurrency throttled to {self.limit}: " + "; ".join(self.reasons)
+
+#   CLASS 02:       SourcePool
+#   DESCRIPTION:    Local addresses probes are bound to in round-robin order. Each source has its own
+#                   ephemeral port range per destination, so N sources give N times the connects to one
+#                   host before EADDRNOTAVAIL and spread TIME_WAIT across them. usage counts, per
+#                   source, connect attempts, established connections and local-exhaustion errors.
+class SourcePool:
+    def __init__(self, addresses):
+        self.addresses = list(dict.fromkeys(addresses))
+        if not self.addresses:
+            raise ValueError("At least one source address is required")
+        self.usage = {address: {'connects': 0, 'open': 0, 'exhausted': 0} for address in self.addresses}
+        self.cursor = 0
+
+    def __len__(self):
+        return len(self.addresses)
+
+    #   METHOD 01:      next
+    #   DESCRIPTION:    Source for the next connect attempt
+    def next(self):
+        address = self.addresses[self.cursor]
+        self.cursor = (self.cursor + 1) % len(self.addresses)
+        self.usage[address]['connects'] += 1
+        return address
+
+    #   METHOD 02:      record
+    #   DESCRIPTION:    Counts an outcome ('open' or 'exhausted') against a source
+    def record(self, address, outcome):
+        self.usage[address][outcome] += 1
+
+    #   METHOD 03:      check
+    #   DESCRIPTION:    Binds a throwaway socket to every source; raises ValueError naming any address
+    #                   this host cannot send from
+    def check(self):
+        for address in self.addresses:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            try:
+                sock.bind((address, 0))
+            except OSError as e:
+                raise ValueError(f"Cannot bind source address {address}: {e.strerror or e}") from None
+            finally:
+                sock.close()
+
+    def summary(self):
+        lines = ["Source address usage:"]
+        for address, usage in self.usage.items():
+            lines.append(f"  {address:<16} {usage['connects']:>8} connects {usage['open']:>8} open "
+                         f"{usage['exhausted']:>6} exhausted")
+        return "\n".join(lines)
+
+# DECLARED VARIABLES
+#   VAR 01:         raise_nofile_limit
+#   DESCRIPTION:    Lifts the soft RLIMIT_NOFILE to the hard limit; returns the resulting soft limit. The limit
+#                   is process-wide, so only the command-line entry points call this; code embedding the
+#                   Scanner raises it (or not) itself.
+def raise_nofile_limit():
+    if resource is None:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        target = hard if hard != resource.RLIM_INFINITY else max(soft, 1 << 20)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return soft
+
+#   VAR 02:         ephemeral_port_count
+#   DESCRIPTION:    Size of the local ephemeral port range
+def ephemeral_port_count():
+    low, high = DEFAULT_EPHEMERAL_RANGE
+    try:
+        with open(EPHEMERAL_RANGE_PATH, encoding='ascii') as file:
+            low, high = map(int, file.read().split())
+    except (OSError, ValueError):
+        pass
+    return high - low + 1
+
+#   VAR 03:         socket_budget
+#   DESCRIPTION:    Caps requested concurrency (None means "as high as the system allows") by the open-file
+#                   limit minus a reserve for stdio, logs and output files, and by the ephemeral port range
+#                   times the number of source addresses in use. The open-file limit is read, never changed.
+def socket_budget(requested=None, source_addresses=1):
+    fd_limit = nofile_limit()
+    ephemeral_ports = ephemeral_port_count() * max(source_addresses, 1)
+    limit = requested or ephemeral_ports
+    reasons = []
+    if fd_limit is not None and limit > fd_limit - FD_RESERVE:
+        limit = max(fd_limit - FD_RESERVE, 1)
+        reasons.append(f"RLIMIT_NOFILE is {fd_limit} (raise it with 'ulimit -n')")
+    if limit > ephemeral_ports:
+        limit = ephemeral_ports
+        reasons.append(f"only {ephemeral_ports} ephemeral ports are available")
+    return SocketBudget(requested, limit, fd_limit, ephemeral_ports, reasons)
+
+#   VAR 04:         is_resource_error
+#   DESCRIPTION:    True for local exhaustion (too many open files, no free source port) rather than a port verdict
+def is_resource_error(exc):
+    return isinstance(exc, OSError) and exc.errno in RESOURCE_ERRNOS
+
+#   VAR 05:         set_rst_linger
+#   DESCRIPTION:    SO_LINGER {on, 0}: the next close() sends RST and skips TIME_WAIT
+def set_rst_linger(sock):
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RST)
+    except OSError:
+        pass
+
+#   VAR 06:         close_with_rst
+#   DESCRIPTION:    Closes a bare socket with RST
+def close_with_rst(sock):
+    set_rst_linger(sock)
+    sock.close()
+
+#   VAR 07:         connect_socket
+#   DESCRIPTION:    Lean connect check: nonblocking connect() on a bare socket, completed by the loop's
+#                   writability watcher and SO_ERROR (loop.sock_connect). No StreamReader/StreamWriter or
+#                   timer task is created; the caller bounds it with a TimerWheel deadline. With a source
+#                   address the socket is bound first; IP_BIND_ADDRESS_NO_PORT (Linux) defers the port
+#                   choice to connect() so each source keeps a full port range per destination.
+async def connect_socket(loop, ip, port, source=None):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.setblocking(False)
+        if source:
+            if IP_BIND_ADDRESS_NO_PORT is not None:
+                try:
+                    sock.setsockopt(socket.IPPROTO_IP, IP_BIND_ADDRESS_NO_PORT, 1)
+                except OSError:
+                    pass
+            sock.bind((source, 0))
+        await loop.sock_connect(sock, (ip, port))
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+#   VAR 08:         abort_with_rst
+#   DESCRIPTION:    Closes an asyncio stream immediately with RST instead of a FIN handshake
+def abort_with_rst(writer):
+    sock = writer.get_extra_info('socket')
+    if sock is not None:
+        set_rst_linger(sock)
+    writer.transport.abort()
+
+#   VAR 09:         nofile_limit
+#   DESCRIPTION:    Current soft RLIMIT_NOFILE, or None when it is unlimited or cannot be read
+def nofile_limit():
+    if resource is None:
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return None if soft == resource.RLIM_INFINITY else soft
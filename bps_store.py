@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Historical results store: every scan appended   #
+#                       to one SQLite file, indexed by host, port, se-  #
+#                       -rvice and time, with a query command line      #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# USAGE
+#   Record:  bps_m05.py 10.0.0.0/24 --store history.db        (or --output history.db, or bps_cluster --output)
+#   Query:   bps_store.py query history.db --port 6379 --days 30 --distinct
+#            bps_store.py query history.db --host "10.0.*" --service http --since 2024-10-01
+#            bps_store.py scans history.db
+#   Import:  bps_store.py import history.db old/scan_results*.csv --host 10.0.0.5
+#            (CSV files from bps_m02-bps_m05; the file's modification time becomes the scan time)
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import argparse                     # LIBRARY 01:  Parser for command-line options, arguments and subcommands           https://docs.python.org/3/library/argparse.html
+import csv                          # LIBRARY 02:  File reading and writing                                             https://github.com/python/cpython/blob/3.13/Lib/csv.py
+import json                         # LIBRARY 03:  JSON encoder and decoder                                             https://docs.python.org/3/library/json.html
+import os                           # LIBRARY 04:  Miscellaneous operating system interfaces                            https://docs.python.org/3/library/os.html
+import sqlite3                      # LIBRARY 05:  Embedded SQL database engine                                         https://docs.python.org/3/library/sqlite3.html
+import sys                          # LIBRARY 06:  System-specific parameters and functions                             https://docs.python.org/3/library/sys.html#module-sys
+import time                         # LIBRARY 07:  Time access and conversions                                          https://docs.python.org/3/library/time.html#module-time
+from datetime import datetime       # LIBRARY 08:  ISO dates for --since/--until and printed timestamps                 https://docs.python.org/3/library/datetime.html
+
+# CONSTANT VARIABLES
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id       INTEGER PRIMARY KEY,
+    target   TEXT,
+    started  REAL NOT NULL,
+    finished REAL,
+    rows     INTEGER,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    scan_id  INTEGER NOT NULL REFERENCES scans(id),
+    seen     REAL NOT NULL,
+    host     TEXT NOT NULL,
+    port     INTEGER NOT NULL,
+    service  TEXT,
+    status   TEXT,
+    banner   TEXT,
+    flags    TEXT
+);
+CREATE INDEX IF NOT EXISTS results_host    ON results(host, seen);
+CREATE INDEX IF NOT EXISTS results_port    ON results(port, seen);
+CREATE INDEX IF NOT EXISTS results_service ON results(service, seen);
+CREATE INDEX IF NOT EXISTS results_seen    ON results(seen);
+CREATE INDEX IF NOT EXISTS results_scan    ON results(scan_id);
+"""
+INSERT_RESULT = "INSERT INTO results (scan_id, seen, host, port, service, status, banner, flags) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Query the historical scan results store")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    query = commands.add_parser("query", help="Results matching every given filter, newest first")
+    query.add_argument("database", help="SQLite store written by --store or --output *.db")
+    query.add_argument("--host", help="Host address; '*' matches any run of characters (10.0.*)")
+    query.add_argument("--port", type=int, help="Port number")
+    query.add_argument("--service", help="Service name")
+    query.add_argument("--status", help="Status, e.g. Open")
+    query.add_argument("--days", type=float, help="Only results seen in the last N days")
+    query.add_argument("--since", type=parse_time, help="Only results seen at or after this ISO date/time")
+    query.add_argument("--until", type=parse_time, help="Only results seen before this ISO date/time")
+    query.add_argument("--distinct", action="store_true", help="One line per host and port with first/last seen and scan count")
+    query.add_argument("--limit", type=int, default=1000, help="Maximum rows printed (0 for all)")
+    query.add_argument("--format", choices=["plain", "jsonl"], default="plain", help="Output format")
+
+    scans = commands.add_parser("scans", help="List recorded scans")
+    scans.add_argument("database", help="SQLite results store")
+    scans.add_argument("--limit", type=int, default=50, help="Most recent scans shown (0 for all)")
+
+    load = commands.add_parser("import", help="Load result CSV files written by bps_m02-bps_m05")
+    load.add_argument("database", help="SQLite results store (created if missing)")
+    load.add_argument("files", nargs="+", help="CSV files with Port, Service, Status, Banner (and optionally Host) columns")
+    load.add_argument("--host", help="Host for files without a Host column")
+    return parser
+
+# CLASSES
+#   CLASS 01:       ResultStore
+#   DESCRIPTION:    Append-only history of scans and their results in one SQLite file. WAL journaling
+#                   lets a query run while a scan is inserting; every insert() batch is one transaction.
+class ResultStore:
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    #   METHOD 01:      begin_scan
+    #   DESCRIPTION:    Records a new scan and returns its id
+    def begin_scan(self, target=None, metadata=None, started=None):
+        with self.db:
+            cursor = self.db.execute("INSERT INTO scans (target, started, metadata) VALUES (?, ?, ?)",
+                                     (target, started or time.time(), json.dumps(metadata or {}, default=str)))
+        return cursor.lastrowid
+
+    #   METHOD 02:      insert
+    #   DESCRIPTION:    Bulk-inserts one batch of result rows (bps_m05 result dicts) in a single transaction;
+    #                   each row is dated by its own 'Seen' time, or by `seen` (default: now) without one
+    def insert(self, scan_id, rows, seen=None):
+        seen = seen or time.time()
+        with self.db:
+            self.db.executemany(INSERT_RESULT, [
+                (scan_id, row.get('Seen') or seen, row.get('Host'), int(row['Port']), row.get('Service'),
+                 row.get('Status'), row.get('Banner'), row.get('Flags')) for row in rows])
+
+    #   METHOD 03:      finish_scan
+    #   DESCRIPTION:    Stamps the end time and row count of a scan (and replaces its metadata when given)
+    def finish_scan(self, scan_id, rows=None, finished=None, metadata=None):
+        with self.db:
+            self.db.execute("UPDATE scans SET finished = ?, rows = ? WHERE id = ?",
+                            (finished or time.time(), rows, scan_id))
+            if metadata is not None:
+                self.db.execute("UPDATE scans SET metadata = ? WHERE id = ?",
+                                (json.dumps(metadata, default=str), scan_id))
+
+    #   METHOD 04:      query
+    #   DESCRIPTION:    Results matching every given filter, newest first; with distinct, one row per host
+    #                   and port with first_seen, last_seen and the number of scans that found it
+    def query(self, host=None, port=None, service=None, status=None, since=None, until=None, distinct=False, limit=None):
+        where, params = [], []
+        if host is not None:
+            if '*' in host:
+                where.append("host LIKE ? ESCAPE '\\'")
+                params.append(host.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_').replace('*', '%'))
+            else:
+                where.append("host = ?")
+                params.append(host)
+        for column, value in (('port', port), ('service', service), ('status', status)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            where.append("seen >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("seen < ?")
+            params.append(until)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        if distinct:
+            sql = (f"SELECT host, port, service, MIN(seen) AS first_seen, MAX(seen) AS last_seen, "
+                   f"COUNT(DISTINCT scan_id) AS scans FROM results{clause} GROUP BY host, port ORDER BY last_seen DESC")
+        else:
+            sql = f"SELECT * FROM results{clause} ORDER BY seen DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.db.execute(sql, params)
+
+    #   METHOD 05:      scans
+    #   DESCRIPTION:    Recorded scans, newest first
+    def scans(self, limit=None):
+        sql = "SELECT id, target, started, finished, rows FROM scans ORDER BY started DESC"
+        return self.db.execute(sql + " LIMIT ?", (limit,)) if limit else self.db.execute(sql)
+
+    def close(self):
+        self.db.close()
+
+# DECLARED VARIABLES
+#   VAR 01:         parse_time
+#   DESCRIPTION:    argparse type for --since/--until: ISO date/time to a Unix timestamp; the ValueError
+#                   of a malformed date makes argparse print a usage error instead of a traceback
+def parse_time(value):
+    return datetime.fromisoformat(value).timestamp()
+
+#   VAR 02:         format_time
+#   DESCRIPTION:    Unix timestamp to local "YYYY-MM-DD HH:MM:SS"
+def format_time(value):
+    return datetime.fromtimestamp(value).strftime('%Y-%m-%d %H:%M:%S') if value else "-"
+
+#   VAR 03:         import_csv
+#   DESCRIPTION:    Loads one result CSV as its own scan, dated by the file's modification time
+def import_csv(store, path, host=None):
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = [row for row in csv.DictReader(file) if row.get('Port')]
+    if rows and 'Host' not in rows[0] and not host:
+        raise ValueError(f"{path} has no Host column; pass --host")
+    for row in rows:
+        row.setdefault('Host', host)
+    seen = os.path.getmtime(path)
+    scan_id = store.begin_scan(host or path, {'imported_from': os.path.abspath(path)}, started=seen)
+    for start in range(0, len(rows), 1000):
+        store.insert(scan_id, rows[start:start + 1000], seen=seen)
+    store.finish_scan(scan_id, len(rows), finished=seen)
+    return len(rows)
+
+# FUNCTIONS
+#   FUNC 01:        main
+#   DESCRIPTION:    Dispatches the query, scans and import commands
+def main(parsed_args):
+    if parsed_args.command != 'import' and not os.path.exists(parsed_args.database):
+        print(f"Results store not found: {parsed_args.database}")
+        return 1
+    with ResultStore(parsed_args.database) as store:
+        if parsed_args.command == 'scans':
+            for scan in store.scans(parsed_args.limit):
+                print(f"{scan['id']:>6}  {format_time(scan['started'])}  {format_time(scan['finished'])}  "
+                      f"{scan['rows'] if scan['rows'] is not None else '-':>7} rows  {scan['target']}")
+            return 0
+
+        if parsed_args.command == 'import':
+            for path in parsed_args.files:
+                try:
+                    print(f"{path}: {import_csv(store, path, parsed_args.host)} rows")
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"{path}: skipped ({e})")
+            return 0
+
+        since = parsed_args.since
+        if parsed_args.days is not None:
+            since = max(since or 0, time.time() - parsed_args.days * 86400)
+        rows = store.query(parsed_args.host, parsed_args.port, parsed_args.service, parsed_args.status, since,
+                           parsed_args.until, parsed_args.distinct, parsed_args.limit)
+        count = 0
+        for row in rows:
+            count += 1
+            if parsed_args.format == 'jsonl':
+                print(json.dumps(dict(row)))
+            elif parsed_args.distinct:
+                print(f"{row['host']}:{row['port']}\t{row['service']}\tfirst {format_time(row['first_seen'])}\t"
+                      f"last {format_time(row['last_seen'])}\t{row['scans']} scans")
+            else:
+                print(f"{format_time(row['seen'])}\t{row['host']}:{row['port']}\t{row['service']}\t"
+                      f"{row['status']}\t{row['banner']}")
+        if parsed_args.format == 'plain':
+            print(f"{count} rows")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(parse_arguments().parse_args()))
@@ -0,0 +1,135 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Hashed timer wheel: one loop callback per tick  #
+#                       tracks every in-flight probe deadline and ca-   #
+#                       -ncels the expired ones in bulk                 #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import asyncio                      # LIBRARY 01:  Concurrent programming design for high-performance network queues    https://realpython.com/async-io-python/
+
+# CONSTANT VARIABLES
+TICK_EPSILON = 1e-6
+
+# CLASSES
+#   CLASS 01:       TimerWheel
+#   DESCRIPTION:    Ring of `size` buckets, each covering `resolution` seconds. Deadlines are rounded up to
+#                   the next tick, so a timeout fires between 0 and one resolution late. While any deadline
+#                   is pending the wheel keeps exactly one loop.call_at handle; each tick sweeps one bucket
+#                   and cancels every task whose deadline has passed. Deadlines further out than one
+#                   revolution stay in their bucket until the revolution that reaches them.
+class TimerWheel:
+    def __init__(self, resolution=0.01, size=1024):
+        self.resolution = resolution
+        self.size = size
+        self.buckets = [[] for _ in range(size)]
+        self.tick = 0
+        self.pending = 0
+        self.stored = 0
+        self.handle = None
+        self.loop = None
+        self.expired = 0
+
+    #   METHOD 01:      timeout
+    #   DESCRIPTION:    Async context manager raising TimeoutError when the block outlives `delay`
+    def timeout(self, delay):
+        return WheelTimeout(self, delay)
+
+    #   METHOD 02:      schedule
+    #   DESCRIPTION:    Registers a deadline for `task` and returns its WheelTimeout entry
+    def schedule(self, entry, delay):
+        loop = self.loop = asyncio.get_running_loop()
+        now_tick = int(loop.time() / self.resolution)
+        if self.pending == 0:
+            if self.stored:
+                for bucket in self.buckets:
+                    bucket.clear()
+                self.stored = 0
+            self.tick = now_tick
+        entry.expiry = max(int((loop.time() + delay) / self.resolution) + 1, self.tick + 1)
+        self.buckets[entry.expiry % self.size].append(entry)
+        self.pending += 1
+        self.stored += 1
+        if self.handle is None:
+            self.handle = loop.call_at((self.tick + 1) * self.resolution, self.advance)
+
+    #   METHOD 03:      discard
+    #   DESCRIPTION:    Marks an entry finished; it is dropped from its bucket on the next sweep
+    def discard(self, entry):
+        if entry.state == 'pending':
+            entry.state = 'done'
+            self.pending -= 1
+
+    #   METHOD 04:      advance
+    #   DESCRIPTION:    Sweeps every bucket up to the current tick and cancels expired tasks in one pass
+    def advance(self):
+        self.handle = None
+        # (tick + 1) * resolution / resolution can land just below the integer; on a clock that stops exactly
+        # at the handle's time (bps_netsim's virtual loop) that would re-arm the same tick forever
+        now_tick = int(self.loop.time() / self.resolution + TICK_EPSILON)
+        expired = []
+        while self.tick < now_tick and self.pending:
+            self.tick += 1
+            index = self.tick % self.size
+            bucket = self.buckets[index]
+            if not bucket:
+                continue
+            keep = []
+            for entry in bucket:
+                if entry.state != 'pending':
+                    continue
+                if entry.expiry <= self.tick:
+                    expired.append(entry)
+                else:
+                    keep.append(entry)
+            self.stored -= len(bucket) - len(keep)
+            self.buckets[index] = keep
+        if not self.pending:
+            self.tick = now_tick
+        for entry in expired:
+            entry.expire()
+        self.pending -= len(expired)
+        self.expired += len(expired)
+        if self.pending:
+            self.handle = self.loop.call_at((self.tick + 1) * self.resolution, self.advance)
+
+#   CLASS 02:       WheelTimeout
+#   DESCRIPTION:    One deadline on a TimerWheel; behaves like asyncio.timeout() for the enclosing task
+class WheelTimeout:
+    def __init__(self, wheel, delay):
+        self.wheel = wheel
+        self.delay = delay
+        self.expiry = 0
+        self.state = 'new'
+        self.task = None
+        self.cancelling = 0
+
+    def expire(self):
+        self.state = 'expired'
+        self.task.cancel()
+
+    async def __aenter__(self):
+        self.task = asyncio.current_task()
+        self.cancelling = self.task.cancelling()
+        self.state = 'pending'
+        self.wheel.schedule(self, self.delay)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self.state == 'expired':
+            if self.task.uncancel() <= self.cancelling and exc_type is asyncio.CancelledError:
+                raise TimeoutError from exc
+        else:
+            self.wheel.discard(self)
+        return None
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Continuous scanning: cycles a target estate     #
+#                       forever under a fixed probes-per-second budg-   #
+#                       -et and emits port changes as events            #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# SCHEDULE
+#   Every host gets a sweep of its whole port range every --interval seconds and, once it has open or
+#   recently changed ports, a check of just those "watched" ports every --check_interval seconds. Both
+#   intervals are divided by (1 + churn), where churn is a decaying count of the changes the host's
+#   sweeps found, and every port's own change count (heat) keeps it watched after it closes. Visits run
+#   in due order, at most --max_hosts at a time, and every probe takes one token from a bucket refilled
+#   at --rate per second: the load stays flat however large the estate, and when the budget cannot
+#   keep up visits simply start late (the status line shows by how much).
+#
+# EVENTS (one JSON object per line on stdout or appended to --events)
+#   {"type": "opened",  "time": ..., "host": ..., "port": ..., "service": ..., "banner": ..., "baseline": false}
+#   {"type": "closed",  "time": ..., "host": ..., "port": ..., "service": ..., "open_for": seconds}
+#   {"type": "changed", "time": ..., "host": ..., "port": ..., "service": ..., "banner": ..., "previous": ...}
+#   {"type": "tarpit",  "time": ..., "host": ...}
+#   Ports found on a host's first sweep are reported as "opened" with "baseline": true. With --state
+#   the estate is saved and reloaded, so a restart neither rescans early nor repeats old events.
+#   A sweep of a host the health breaker flagged 'filtered' only probes COMMON_PORTS, so it cannot
+#   close any other port.
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import argparse                     # LIBRARY 01:  Parser for command-line options, arguments and subcommands           https://docs.python.org/3/library/argparse.html
+import asyncio                      # LIBRARY 02:  Concurrent programming design for high-performance network queues    https://realpython.com/async-io-python/
+import heapq                        # LIBRARY 03:  Heap of hosts ordered by their next due visit                        https://docs.python.org/3/library/heapq.html
+import json                         # LIBRARY 04:  JSON encoder and decoder                                             https://docs.python.org/3/library/json.html
+import os                           # LIBRARY 05:  Miscellaneous operating system interfaces                            https://docs.python.org/3/library/os.html
+import sys                          # LIBRARY 06:  System-specific parameters and functions                             https://docs.python.org/3/library/sys.html#module-sys
+import time                         # LIBRARY 07:  Time access and conversions                                          https://docs.python.org/3/library/time.html#module-time
+
+# SCANNER ENGINE
+from bps_m05 import COMMON_PORTS, DEFAULT_CSV_PATH, ScanConfig, Scanner, ServiceDatabase
+from bps_sockets import raise_nofile_limit
+
+# CONSTANT VARIABLES
+DECAY = 0.5
+HEAT_FLOOR = 0.05
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Continuous budgeted scanning of a target estate",
+                                     fromfile_prefix_chars='@')
+    parser.add_argument("targets", nargs="+", help="Target IP addresses, hostnames or CIDR ranges (@FILE reads one per line)")
+    parser.add_argument("--rate", type=float, default=100.0, help="Probe budget in connects per second")
+    parser.add_argument("--interval", type=float, default=86400.0, help="Seconds between full sweeps of a quiet host")
+    parser.add_argument("--check_interval", type=float, default=3600.0, help="Seconds between checks of a quiet host's open and recently changed ports")
+    parser.add_argument("--start_port", type=int, default=1, help="Start of the swept port range")
+    parser.add_argument("--end_port", type=int, default=1024, help="End of the swept port range")
+    parser.add_argument("--timeout", type=float, default=0.5, help="Socket timeout for each port")
+    parser.add_argument("--no_banner", action="store_true", help="Connect-only probes (no banner changes are detected)")
+    parser.add_argument("--max_hosts", type=int, default=16, help="Hosts visited at the same time")
+    parser.add_argument("--max_concurrency", type=int, default=200, help="Probes in flight at once")
+    parser.add_argument("--events", help="Append events to this JSON Lines file instead of printing them")
+    parser.add_argument("--state", help="JSON file the estate's scan history is loaded from and saved to")
+    parser.add_argument("--status_interval", type=float, default=60.0, help="Seconds between status lines on stderr (0 disables)")
+    parser.add_argument("--duration", type=float, default=0.0, help="Stop after this many seconds (0 runs until interrupted)")
+    parser.add_argument("--csv_path", default=DEFAULT_CSV_PATH, help="Path to the service names CSV file")
+    return parser
+
+# CLASSES
+#   CLASS 01:       TokenBucket
+#   DESCRIPTION:    Stands in for the Scanner's semaphore: entering takes one of `concurrency` probe slots,
+#                   then one token from a bucket refilled at `rate` per second and holding at most `burst`.
+#                   Token waiters are served first come, first served.
+class TokenBucket:
+    def __init__(self, rate, concurrency=200, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate / 10)
+        self.tokens = self.burst
+        self.updated = None
+        self.slots = asyncio.Semaphore(concurrency)
+        self.lock = asyncio.Lock()
+        self.taken = 0
+
+    async def __aenter__(self):
+        await self.slots.acquire()
+        try:
+            await self.take()
+        except BaseException:
+            self.slots.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.slots.release()
+
+    #   METHOD 01:      take
+    #   DESCRIPTION:    Waits for and consumes one token
+    async def take(self):
+        async with self.lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self.updated is None:
+                self.updated = now
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                now = loop.time()
+                self.tokens += (now - self.updated) * self.rate
+                self.updated = now
+            self.tokens -= 1
+            self.taken += 1
+
+#   CLASS 02:       WatchedHost
+#   DESCRIPTION:    Scan history of one target: open ports with their service, banner and opening time,
+#                   per-port heat, host churn and when it was last swept and checked (Unix time)
+class WatchedHost:
+    def __init__(self, target):
+        self.target = target
+        self.open = {}
+        self.heat = {}
+        self.churn = 0.0
+        self.last_sweep = None
+        self.last_check = None
+        self.sweeps = 0
+        self.tarpit = False
+
+    #   METHOD 01:      watched
+    #   DESCRIPTION:    Ports checked between sweeps: open now, or changed recently enough to still be warm
+    def watched(self):
+        return sorted(set(self.open) | {port for port, heat in self.heat.items() if heat >= HEAT_FLOOR})
+
+    #   METHOD 02:      due
+    #   DESCRIPTION:    (time, 'sweep' or 'check') of the next visit
+    def due(self, interval, check_interval):
+        if self.last_sweep is None:
+            return 0.0, 'sweep'
+        speed = 1 + self.churn
+        sweep = self.last_sweep + interval / speed
+        if self.watched():
+            check = max(self.last_check or self.last_sweep, self.last_sweep) + check_interval / speed
+            if check < sweep:
+                return check, 'check'
+        return sweep, 'sweep'
+
+    #   METHOD 03:      apply
+    #   DESCRIPTION:    Folds one visit's results into the history; `probed(port)` says whether the visit
+    #                   could have seen the port. Returns the change events.
+    def apply(self, results, probed, sweep, now):
+        events = []
+        found = {result['Port']: result for result in results}
+        changed = set()
+        for port, result in found.items():
+            previous = self.open.get(port)
+            if previous is None:
+                self.open[port] = {'service': result['Service'], 'banner': result['Banner'], 'since': now}
+                events.append({'type': 'opened', 'time': now, 'host': self.target, 'port': port,
+                               'service': result['Service'], 'banner': result['Banner'],
+                               'baseline': sweep and self.sweeps == 0})
+                changed.add(port)
+            elif result['Banner'] != previous['banner'] and result['Banner'] != 'No banner':
+                events.append({'type': 'changed', 'time': now, 'host': self.target, 'port': port,
+                               'service': result['Service'], 'banner': result['Banner'],
+                               'previous': previous['banner']})
+                previous['banner'] = result['Banner']
+                changed.add(port)
+        for port in [port for port in self.open if port not in found and probed(port)]:
+            closed = self.open.pop(port)
+            events.append({'type': 'closed', 'time': now, 'host': self.target, 'port': port,
+                           'service': closed['service'], 'open_for': round(now - closed['since'], 1)})
+            changed.add(port)
+        if self.sweeps:
+            for port in changed:
+                self.heat[port] = self.heat.get(port, 0.0) + 1
+            self.churn += len(changed)
+        if sweep:
+            self.heat = {port: heat * DECAY for port, heat in self.heat.items() if heat * DECAY >= HEAT_FLOOR}
+            self.churn *= DECAY
+            self.sweeps += 1
+            self.last_sweep = now
+        else:
+            self.last_check = now
+        return events
+
+    def to_dict(self):
+        return {'open': {str(port): info for port, info in self.open.items()},
+                'heat': {str(port): heat for port, heat in self.heat.items()}, 'churn': self.churn,
+                'last_sweep': self.last_sweep, 'last_check': self.last_check, 'sweeps': self.sweeps,
+                'tarpit': self.tarpit}
+
+    @classmethod
+    def from_dict(cls, target, data):
+        host = cls(target)
+        host.open = {int(port): info for port, info in data.get('open', {}).items()}
+        host.heat = {int(port): heat for port, heat in data.get('heat', {}).items()}
+        host.churn = data.get('churn', 0.0)
+        host.last_sweep = data.get('last_sweep')
+        host.last_check = data.get('last_check')
+        host.sweeps = data.get('sweeps', 0)
+        host.tarpit = data.get('tarpit', False)
+        return host
+
+#   CLASS 03:       Watcher
+#   DESCRIPTION:    The continuous scan loop: a heap of hosts keyed by their next due time, visits run under
+#                   a host semaphore, probes under the shared TokenBucket, one Scanner for everything.
+#                   `clock` gives the Unix time stamped on events and state (bps_netsim passes loop.time).
+class Watcher:
+    def __init__(self, targets, config, services, rate, interval=86400.0, check_interval=3600.0, max_hosts=16,
+                 max_concurrency=200, emit=None, state_path=None, transport=None, clock=time.time):
+        self.config = config
+        self.clock = clock
+        self.interval = interval
+        self.check_interval = check_interval
+        self.bucket = TokenBucket(rate, max_concurrency)
+        self.scanner = Scanner(config, services, self.bucket, transport=transport)
+        self.host_slots = asyncio.Semaphore(max_hosts)
+        self.emit = emit or print_event
+        self.state_path = state_path
+        self.hosts = {target: WatchedHost(target) for target in expand_targets(targets)}
+        if state_path and os.path.exists(state_path):
+            self.load(state_path)
+        self.queue = []
+        self.sequence = 0
+        self.visits = {'sweep': 0, 'check': 0}
+        self.events = 0
+        self.lag = 0.0
+        self.started = clock()
+        self.saved = clock()
+
+    #   METHOD 01:      schedule
+    #   DESCRIPTION:    Pushes the host's next visit onto the heap
+    def schedule(self, host):
+        due, _ = host.due(self.interval, self.check_interval)
+        self.sequence += 1
+        heapq.heappush(self.queue, (due, self.sequence, host.target))
+
+    #   METHOD 02:      run
+    #   DESCRIPTION:    Visits hosts in due order until cancelled
+    async def run(self):
+        for host in self.hosts.values():
+            self.schedule(host)
+        tasks = set()
+        try:
+            while True:
+                await self.host_slots.acquire()
+                while not self.queue:
+                    await asyncio.sleep(1.0)
+                due, _, target = self.queue[0]
+                wait = due - self.clock()
+                if wait > 0:
+                    self.host_slots.release()
+                    await asyncio.sleep(min(wait, 1.0))
+                    continue
+                heapq.heappop(self.queue)
+                self.lag = max(0.0, -wait) if due else 0.0
+                task = asyncio.create_task(self.visit(self.hosts[target]))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.save()
+
+    #   METHOD 03:      visit
+    #   DESCRIPTION:    One sweep or check of a host, then its events and its next due time. A scan that fails
+    #                   for any reason (unresolvable or malformed name, socket error) is reported and counted
+    #                   as a visit without results, so the host always goes back on the schedule.
+    async def visit(self, host):
+        try:
+            _, kind = host.due(self.interval, self.check_interval)
+            config = self.config
+            ports = range(config.start_port, config.end_port + 1) if kind == 'sweep' else host.watched()
+            results = []
+            try:
+                ip = await self.scanner.resolve(host.target)
+                await self.scanner.port_scan(ip, results.append, ports=ports)
+            except Exception as e:
+                print(f"{host.target}: {type(e).__name__}: {e}", file=sys.stderr)
+                results = None
+            now = self.clock()
+            if results is None:
+                host.last_sweep, host.last_check = (now, host.last_check) if kind == 'sweep' else (host.last_sweep, now)
+            else:
+                health = self.scanner.host_reports.get(ip)
+                self.record(host, kind, results, health, now)
+            self.visits[kind] += 1
+            self.schedule(host)
+            if self.state_path and now - self.saved >= 30:
+                self.save()
+        finally:
+            self.host_slots.release()
+
+    #   METHOD 04:      record
+    #   DESCRIPTION:    Applies a finished visit and emits its events; a tarpit's results are dropped
+    def record(self, host, kind, results, health, now):
+        if health and health.state == 'tarpit':
+            if not host.tarpit:
+                host.tarpit = True
+                self.publish({'type': 'tarpit', 'time': now, 'host': host.target})
+            results = []
+        else:
+            host.tarpit = False
+        filtered = health is not None and health.state == 'filtered'
+        config = self.config
+        if kind == 'sweep':
+            def probed(port):
+                return config.start_port <= port <= config.end_port and (not filtered or port in COMMON_PORTS)
+        else:
+            checked = set(host.watched())
+
+            def probed(port):
+                return port in checked and (not filtered or port in COMMON_PORTS)
+        for event in host.apply(results, probed, kind == 'sweep', now):
+            self.publish(event)
+
+    def publish(self, event):
+        self.events += 1
+        self.emit(event)
+
+    #   METHOD 05:      status
+    #   DESCRIPTION:    One-line progress report
+    def status(self):
+        elapsed = max(self.clock() - self.started, 1e-9)
+        swept = sum(1 for host in self.hosts.values() if host.sweeps)
+        return (f"[{time.strftime('%H:%M:%S')}] {len(self.hosts)} hosts ({swept} swept), "
+                f"{self.visits['sweep']} sweeps, {self.visits['check']} checks, {self.bucket.taken} probes "
+                f"({self.bucket.taken / elapsed:.1f}/s), {self.events} events, lag {self.lag:.0f}s")
+
+    #   METHOD 06:      save / load
+    #   DESCRIPTION:    Estate history as JSON, replaced atomically
+    def save(self):
+        if not self.state_path:
+            return
+        temporary = self.state_path + ".tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'hosts': {target: host.to_dict() for target, host in self.hosts.items()}}, file)
+        os.replace(temporary, self.state_path)
+        self.saved = self.clock()
+
+    def load(self, path):
+        with open(path, encoding='utf-8') as file:
+            saved = json.load(file).get('hosts', {})
+        for target in self.hosts:
+            if target in saved:
+                self.hosts[target] = WatchedHost.from_dict(target, saved[target])
+
+# DECLARED VARIABLES
+#   VAR 01:         expand_targets
+#   DESCRIPTION:    Addresses of every target; CIDR blocks are expanded (without a ping sweep, so hosts
+#                   that come up later are found), hostnames are kept for resolution at each visit
+def expand_targets(targets):
+    import ipaddress
+    hosts = []
+    for target in targets:
+        target = target.strip()
+        if not target or target.startswith('#'):
+            continue
+        try:
+            hosts.extend(str(ip) for ip in ipaddress.ip_network(target, strict=False).hosts())
+        except ValueError:
+            hosts.append(target)
+    return list(dict.fromkeys(hosts))
+
+#   VAR 02:         print_event
+#   DESCRIPTION:    Default event sink: one JSON line on stdout
+def print_event(event):
+    print(json.dumps(event), flush=True)
+
+# FUNCTIONS
+#   FUNC 01:        watch
+#   DESCRIPTION:    Command-line continuous scan
+async def watch(parsed_args):
+    config = ScanConfig(start_port=parsed_args.start_port, end_port=parsed_args.end_port,
+                        timeout=parsed_args.timeout, banners=not parsed_args.no_banner,
+                        batch_size=parsed_args.max_concurrency, max_concurrency=parsed_args.max_concurrency)
+    events_file = open(parsed_args.events, 'a', encoding='utf-8') if parsed_args.events else None
+
+    def emit(event):
+        if events_file:
+            events_file.write(json.dumps(event) + "\n")
+            events_file.flush()
+        else:
+            print_event(event)
+
+    watcher = Watcher(parsed_args.targets, config, ServiceDatabase.from_csv(parsed_args.csv_path),
+                      parsed_args.rate, parsed_args.interval, parsed_args.check_interval, parsed_args.max_hosts,
+                      parsed_args.max_concurrency, emit, parsed_args.state)
+
+    async def report():
+        while True:
+            await asyncio.sleep(parsed_args.status_interval)
+            print(watcher.status(), file=sys.stderr, flush=True)
+
+    reporter = asyncio.create_task(report()) if parsed_args.status_interval > 0 else None
+    try:
+        if parsed_args.duration:
+            try:
+                await asyncio.wait_for(watcher.run(), parsed_args.duration)
+            except TimeoutError:
+                pass
+        else:
+            await watcher.run()
+    finally:
+        if reporter:
+            reporter.cancel()
+        if events_file:
+            events_file.close()
+        print(watcher.status(), file=sys.stderr)
+    return 0
+
+#   FUNC 02:        main
+#   DESCRIPTION:    Runs the watcher until --duration ends or it is interrupted
+def main(parsed_args):
+    raise_nofile_limit()
+    try:
+        return asyncio.run(watch(parsed_args))
+    except KeyboardInterrupt:
+        return 130
+
+if __name__ == "__main__":
+    sys.exit(main(parse_arguments().parse_args()))
@@ -0,0 +1,262 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Machine-readable result writers: JSON Lines,    #
+#                       quoted CSV, packed columnar binary, Parquet     #
+#                       (when pyarrow is installed) and SQLite history  #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# PACKED FORMAT (.bpsr), all integers little-endian
+#   file    := b"BPSR" | version:u16 (=1) | meta_len:u32 | meta:utf-8 JSON | block*
+#   meta    := {"columns": [name, ...], ...scan metadata}
+#   block   := rows:u32 | column{len(columns)}
+#   column  := "Port" -> rows * u16
+#              other  -> data_len:u32 | rows * end_offset:u32 | data:utf-8    (value i = data[end[i-1]:end[i]])
+#   One block is written per flushed batch; read_packed() yields the rows back as dicts.
+#
+# CSV and JSON Lines carry their metadata in a "<path>.meta.json" sidecar so every line of the
+# data file stays a plain row; Parquet stores it in the schema metadata under b"bps". SQLite
+# (bps_store) appends to the file instead of replacing it: each run becomes a new row in its scans table.
+# annotate() adds metadata known only at the end of a scan; the sidecar and SQLite formats rewrite
+# their metadata on close, the packed and Parquet headers are fixed once the file is opened.
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import csv                          # LIBRARY 01:  File reading and writing                                             https://github.com/python/cpython/blob/3.13/Lib/csv.py
+import json                         # LIBRARY 02:  JSON encoder and decoder                                             https://docs.python.org/3/library/json.html
+import os                           # LIBRARY 03:  Miscellaneous operating system interfaces                            https://docs.python.org/3/library/os.html
+import struct                       # LIBRARY 04:  Interpret bytes as packed binary data                                https://docs.python.org/3/library/struct.html
+import sys                          # LIBRARY 05:  System-specific parameters and functions                             https://docs.python.org/3/library/sys.html#module-sys
+from array import array             # LIBRARY 06:  Compact arrays of fixed-width numbers for packed columns             https://docs.python.org/3/library/array.html
+from operator import itemgetter     # LIBRARY 07:  Row-to-tuple projection without per-row lambdas                      https://docs.python.org/3/library/operator.html
+
+# CONSTANT VARIABLES
+COLUMNS = ['Host', 'Port', 'Service', 'Status', 'Banner', 'Flags']
+PACKED_MAGIC = b"BPSR"
+PACKED_VERSION = 1
+EXTENSIONS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.bpsr': 'packed', '.parquet': 'parquet',
+              '.db': 'sqlite', '.sqlite': 'sqlite', '.sqlite3': 'sqlite'}
+
+# CLASSES
+#   CLASS 01:       ResultWriter
+#   DESCRIPTION:    Buffers result rows and serializes them one batch at a time
+class ResultWriter:
+    def __init__(self, path, metadata=None, columns=COLUMNS, batch_size=1000):
+        self.path = path
+        self.metadata = dict(metadata or {})
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.pending = []
+        self.rows_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, row):
+        self.pending.append(row)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.write_batch(self.pending)
+            self.rows_written += len(self.pending)
+            self.pending = []
+
+    def close(self):
+        self.flush()
+
+    def annotate(self, **fields):
+        self.metadata.update(fields)
+
+    def write_batch(self, rows):
+        raise NotImplementedError
+
+    def write_sidecar(self):
+        with open(self.path + ".meta.json", 'w', encoding='utf-8') as file:
+            json.dump({'columns': self.columns, **self.metadata}, file, indent=2, default=str)
+
+#   CLASS 02:       JsonLinesWriter
+#   DESCRIPTION:    One JSON object per line; keeps every key of the row, not just the columns
+class JsonLinesWriter(ResultWriter):
+    def __init__(self, path, metadata=None, columns=COLUMNS, batch_size=1000):
+        super().__init__(path, metadata, columns, batch_size)
+        self.encode = json.JSONEncoder(ensure_ascii=False, default=str).encode
+        self.file = open(path, 'w', encoding='utf-8')
+        self.write_sidecar()
+
+    def write_batch(self, rows):
+        encode = self.encode
+        self.file.write("\n".join([encode(row) for row in rows]))
+        self.file.write("\n")
+
+    def close(self):
+        super().close()
+        self.file.close()
+        self.write_sidecar()
+
+#   CLASS 03:       CsvWriter
+#   DESCRIPTION:    RFC 4180 quoting via the csv module, so commas and newlines in banners survive
+class CsvWriter(ResultWriter):
+    def __init__(self, path, metadata=None, columns=COLUMNS, batch_size=1000):
+        super().__init__(path, metadata, columns, batch_size)
+        self.project = itemgetter(*self.columns)
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.columns)
+        self.write_sidecar()
+
+    def write_batch(self, rows):
+        self.writer.writerows(map(self.project, rows))
+
+    def close(self):
+        super().close()
+        self.file.close()
+        self.write_sidecar()
+
+#   CLASS 04:       PackedWriter
+#   DESCRIPTION:    Columnar binary blocks described in the PACKED FORMAT notes above
+class PackedWriter(ResultWriter):
+    def __init__(self, path, metadata=None, columns=COLUMNS, batch_size=1000):
+        super().__init__(path, metadata, columns, batch_size)
+        self.file = open(path, 'wb')
+        meta = json.dumps({'columns': self.columns, **self.metadata}, default=str).encode('utf-8')
+        self.file.write(PACKED_MAGIC + struct.pack('<HI', PACKED_VERSION, len(meta)) + meta)
+
+    def write_batch(self, rows):
+        out = [struct.pack('<I', len(rows))]
+        for column in self.columns:
+            if column == 'Port':
+                out.append(little_endian(array('H', [row[column] for row in rows])).tobytes())
+                continue
+            data = bytearray()
+            ends = array('I')
+            for row in rows:
+                value = row.get(column)
+                if value is not None:
+                    data += str(value).encode('utf-8')
+                ends.append(len(data))
+            out.append(struct.pack('<I', len(data)))
+            out.append(little_endian(ends).tobytes())
+            out.append(data)
+        self.file.write(b"".join(out))
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+#   CLASS 05:       ParquetWriter
+#   DESCRIPTION:    One Parquet row group per batch; requires pyarrow
+class ParquetWriter(ResultWriter):
+    def __init__(self, path, metadata=None, columns=COLUMNS, batch_size=1000):
+        super().__init__(path, metadata, columns, batch_size)
+        import pyarrow
+        import pyarrow.parquet
+        self.pyarrow = pyarrow
+        fields = [(c, pyarrow.uint16() if c == 'Port' else pyarrow.string()) for c in self.columns]
+        meta = json.dumps(self.metadata, default=str).encode('utf-8')
+        self.schema = pyarrow.schema(fields, metadata={b"bps": meta})
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write_batch(self, rows):
+        data = {c: [row.get(c) if c == 'Port' or row.get(c) is None else str(row.get(c)) for row in rows]
+                for c in self.columns}
+        self.writer.write_table(self.pyarrow.Table.from_pydict(data, schema=self.schema))
+
+    def close(self):
+        super().close()
+        self.writer.close()
+
+#   CLASS 06:       SqliteWriter
+#   DESCRIPTION:    Appends the scan to a bps_store history database; one transaction per batch
+class SqliteWriter(ResultWriter):
+    def __init__(self, path, metadata=None, columns=COLUMNS, batch_size=1000):
+        super().__init__(path, metadata, columns, batch_size)
+        from bps_store import ResultStore
+        self.store = ResultStore(path)
+        target = self.metadata.get('target') or ",".join(self.metadata.get('targets', []))
+        self.scan_id = self.store.begin_scan(target, self.metadata)
+
+    def write_batch(self, rows):
+        self.store.insert(self.scan_id, rows)
+
+    def close(self):
+        super().close()
+        self.store.finish_scan(self.scan_id, self.rows_written, metadata=self.metadata)
+        self.store.close()
+
+WRITERS = {'csv': CsvWriter, 'jsonl': JsonLinesWriter, 'packed': PackedWriter, 'parquet': ParquetWriter,
+           'sqlite': SqliteWriter}
+
+# DECLARED VARIABLES
+#   VAR 01:         little_endian
+#   DESCRIPTION:    Byte-swaps an array in place on big-endian hosts so packed files are portable
+def little_endian(values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+#   VAR 02:         open_writer
+#   DESCRIPTION:    Creates the writer for an explicit format, or one inferred from the file extension
+def open_writer(path, fmt=None, metadata=None, columns=COLUMNS, batch_size=1000):
+    if fmt is None:
+        fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+        if fmt is None:
+            raise ValueError(f"Cannot infer an output format from {path}; choose one of {sorted(WRITERS)}")
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown output format {fmt}; choose one of {sorted(WRITERS)}")
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        raise FileNotFoundError(f"Directory does not exist: {directory}")
+    return WRITERS[fmt](path, metadata, columns, batch_size)
+
+#   VAR 03:         read_packed
+#   DESCRIPTION:    Reads a packed file back; returns (metadata, iterator of row dicts)
+def read_packed(path):
+    with open(path, 'rb') as file:
+        buffer = file.read()
+    if buffer[:4] != PACKED_MAGIC:
+        raise ValueError(f"{path} is not a packed results file")
+    version, meta_len = struct.unpack_from('<HI', buffer, 4)
+    if version != PACKED_VERSION:
+        raise ValueError(f"Unsupported packed results version {version}")
+    offset = 10 + meta_len
+    metadata = json.loads(buffer[10:offset])
+    columns = metadata['columns']
+
+    def rows():
+        position = offset
+        while position < len(buffer):
+            (count,) = struct.unpack_from('<I', buffer, position)
+            position += 4
+            values = {}
+            for column in columns:
+                if column == 'Port':
+                    ports = little_endian(array('H', buffer[position:position + 2 * count]))
+                    position += 2 * count
+                    values[column] = ports
+                    continue
+                (data_len,) = struct.unpack_from('<I', buffer, position)
+                position += 4
+                ends = little_endian(array('I', buffer[position:position + 4 * count]))
+                position += 4 * count
+                data = buffer[position:position + data_len]
+                position += data_len
+                starts = [0, *ends[:-1]]
+                values[column] = [data[s:e].decode('utf-8') for s, e in zip(starts, ends)]
+            for i in range(count):
+                yield {column: values[column][i] for column in columns}
+
+    return metadata, rows()
@@ -0,0 +1,89 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Unit tests for raw response capture: compres-   #
+#                       -sion off the event loop and keyed lookups of   #
+#                       captured records; run with: python -m pytest -q #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import tempfile                     # LIBRARY 01:  Scratch capture directories                                          https://docs.python.org/3/library/tempfile.html
+import unittest                     # LIBRARY 02:  Unit testing framework                                               https://docs.python.org/3/library/unittest.html
+
+# Project Modules
+from bps_capture import CaptureReader, CaptureWriter
+
+# CONSTANT VARIABLES
+HOSTS = ('10.0.0.1', '10.0.0.2', '10.0.0.3')
+PORTS = (22, 80, 443, 8080)
+
+# CLASSES
+#   CLASS 01:       CompressionTests
+#   DESCRIPTION:    Compressed records are queued on a running loop and reach the capture in order
+class CompressionTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def payload(self, host, port):
+        return f"{host}:{port} ".encode() * 50
+
+    def record_all(self, capture):
+        for host in HOSTS:
+            for port in PORTS:
+                capture.record(host, port, 'banner', self.payload(host, port))
+
+    def read_all(self):
+        with CaptureReader(self.directory.name) as reader:
+            return [(entry.host, entry.port, entry.codec, reader.read(entry)[1]) for entry in reader.entries()]
+
+    def expected(self):
+        return [(host, port, 1, self.payload(host, port)) for host in HOSTS for port in PORTS]
+
+    async def test_drain_writes_queued_records_in_order(self):
+        with CaptureWriter(self.directory.name, 'zlib') as capture:
+            self.record_all(capture)
+            self.assertEqual((capture.records, len(capture.queue)), (0, len(HOSTS) * len(PORTS)))
+            await capture.drain()
+            self.assertEqual((capture.records, capture.queue, capture.compressing), (len(HOSTS) * len(PORTS), [], None))
+        self.assertEqual(self.read_all(), self.expected())
+
+    async def test_close_compresses_leftovers(self):
+        with CaptureWriter(self.directory.name, 'lzma') as capture:
+            self.record_all(capture)
+        self.assertEqual([row[:2] + row[3:] for row in self.read_all()],
+                         [row[:2] + row[3:] for row in self.expected()])
+        self.assertIsNone(capture.inflight)
+
+#   CLASS 02:       KeyedLookupTests
+#   DESCRIPTION:    Host and port filters over several scans match a full pass over the index
+class KeyedLookupTests(unittest.TestCase):
+    def test_lookups_match_linear_filter(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for scan in range(2):
+                with CaptureWriter(directory) as capture:
+                    for host in HOSTS:
+                        for port in PORTS:
+                            capture.record(host, port, 'banner', f"{scan} {host}:{port}".encode())
+                    capture.record(HOSTS[0], 80, 'http', b"HTTP/1.1 200 OK\r\n\r\n", '/')
+            with CaptureReader(directory) as reader:
+                everything = list(reader.entries())
+                for scan, host, port in ((2, HOSTS[0], 80), (None, HOSTS[1], None), (None, None, 443),
+                                         (1, None, 22), (3, HOSTS[0], 80)):
+                    expected = [entry for entry in everything if (scan is None or entry.scan == scan)
+                                and (host is None or entry.host == host) and (port is None or entry.port == port)]
+                    self.assertEqual(list(reader.entries(scan, host, port)), expected)
+                self.assertEqual([entry.kind for entry in reader.entries(2, HOSTS[0], 80)], ['banner', 'http'])
+                self.assertEqual(len(reader.tables), 4)
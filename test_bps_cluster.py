@@ -0,0 +1,138 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Cluster tests on localhost: one coordinator,    #
+#                       three workers, lost and stalled leases, late    #
+#                       completions; run with: python -m pytest -q      #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import asyncio                      # LIBRARY 01:  Concurrent programming design for high-performance network queues    https://realpython.com/async-io-python/
+import contextlib                   # LIBRARY 02:  Suppressing the cancellation of killed workers                       https://docs.python.org/3/library/contextlib.html
+import json                         # LIBRARY 03:  JSON encoder and decoder                                             https://docs.python.org/3/library/json.html
+import socket                       # LIBRARY 04:  low-level networking interface                                       https://github.com/python/cpython/tree/3.13/Lib/socket.py
+import unittest                     # LIBRARY 05:  Unit testing framework                                               https://docs.python.org/3/library/unittest.html
+
+# Project Modules
+from bps_cluster import ClusterWorker, Coordinator, WorkerLink, hello_error
+from bps_m05 import ServiceDatabase
+
+# CONSTANT VARIABLES
+LISTENERS = 8
+UNIT_PORTS = 2
+
+# CLASSES
+#   CLASS 01:       StalledWorker
+#   DESCRIPTION:    Accepts units but never scans them or renews their leases, like a hung node
+class StalledWorker(ClusterWorker):
+    async def heartbeat(self, writer, interval):
+        await asyncio.Event().wait()
+
+    async def run_unit(self, message, writer):
+        await asyncio.Event().wait()
+
+#   CLASS 02:       ClusterTests
+#   DESCRIPTION:    Units of a lost worker are reassigned and the merged results still cover every port
+class ClusterTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Silent listeners on consecutive ports: every unit then holds its lease for one banner_timeout
+        self.servers = []
+        for base in range(42000, 60000, 101):
+            try:
+                for port in range(base, base + LISTENERS):
+                    self.servers.append(await asyncio.start_server(self.silent, '127.0.0.1', port))
+                break
+            except OSError:
+                await self.close_servers()
+        self.ports = range(base, base + LISTENERS)
+
+    async def asyncTearDown(self):
+        await self.close_servers()
+
+    async def close_servers(self):
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        self.servers = []
+
+    async def silent(self, reader, writer):
+        await reader.read()
+        writer.close()
+
+    async def run_cluster(self, victim, lease, kill=False):
+        config = {'timeout': 0.5, 'banner_timeout': 0.4, 'learn_ports': False}
+        coordinator = Coordinator(['127.0.0.1'], self.ports[0], self.ports[-1], UNIT_PORTS, config, lease)
+        serving = asyncio.create_task(coordinator.serve('127.0.0.1:0'))
+        while coordinator.address is None:
+            await asyncio.sleep(0.01)
+        workers = [victim] + [ClusterWorker(f"worker-{i}", ServiceDatabase({}), capacity=1) for i in (2, 3)]
+        runs = [asyncio.create_task(worker.run(coordinator.address)) for worker in workers]
+        while not victim.tasks:
+            await asyncio.sleep(0.01)
+        if kill:
+            runs[0].cancel()
+        await asyncio.wait_for(serving, 30)
+        await asyncio.gather(*runs, return_exceptions=True)
+        return coordinator
+
+    def assert_complete(self, coordinator):
+        self.assertEqual(coordinator.seen, {('127.0.0.1', port) for port in self.ports})
+        self.assertEqual(coordinator.completed, LISTENERS // UNIT_PORTS)
+        self.assertEqual(coordinator.failed, [])
+        self.assertGreaterEqual(coordinator.reassigned, 1)
+
+    async def test_killed_worker_units_are_reassigned(self):
+        victim = ClusterWorker("victim", ServiceDatabase({}), capacity=1)
+        coordinator = await self.run_cluster(victim, lease=30.0, kill=True)
+        self.assert_complete(coordinator)
+        self.assertNotIn("victim", coordinator.workers)
+
+    async def test_stalled_worker_lease_expires(self):
+        victim = StalledWorker("stalled", ServiceDatabase({}), capacity=1)
+        coordinator = await self.run_cluster(victim, lease=1.0)
+        self.assert_complete(coordinator)
+
+    async def test_malformed_hello_gets_error(self):
+        coordinator = Coordinator(['127.0.0.1'], 1, 1)
+        serving = asyncio.create_task(coordinator.serve('127.0.0.1:0'))
+        while coordinator.address is None:
+            await asyncio.sleep(0.01)
+        host, port = coordinator.address.rsplit(':', 1)
+        reader, writer = await asyncio.open_connection(host, int(port))
+        writer.write(json.dumps({'type': 'hello', 'worker': 'w', 'capacity': None}).encode() + b"\n")
+        reply = json.loads(await reader.readline())
+        self.assertEqual(reply['type'], 'error')
+        self.assertEqual(await reader.read(), b"")
+        writer.close()
+        serving.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await serving
+        self.assertIsNone(hello_error({'worker': socket.gethostname(), 'capacity': 2}))
+        self.assertIsNotNone(hello_error({'capacity': True}))
+        self.assertIsNotNone(hello_error({'capacity': 0}))
+
+#   CLASS 03:       LateCompletionTests
+#   DESCRIPTION:    A "done" arriving after the coordinator gave up on the unit
+class LateCompletionTests(unittest.TestCase):
+    def test_late_done_clears_failure_once(self):
+        coordinator = Coordinator(['127.0.0.1'], 1, 1, max_attempts=1)
+        unit = coordinator.take_unit()
+        unit.attempts = 1
+        coordinator.requeue(unit)
+        self.assertEqual(coordinator.failed, [unit])
+        link = WorkerLink('late', None, 1)
+        coordinator.complete(link, unit.unit_id)
+        self.assertEqual((coordinator.failed, coordinator.completed, link.completed), ([], 1, 1))
+        coordinator.complete(link, unit.unit_id)
+        self.assertEqual((coordinator.completed, link.completed), (1, 1))
+        self.assertTrue(coordinator.finished.is_set())
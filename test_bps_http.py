@@ -0,0 +1,76 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Unit tests for the HTTP deep probe's incremen-  #
+#                       -tal response parser and banner summary; run    #
+#                       with: python -m pytest -q                       #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import unittest                     # LIBRARY 01:  Unit testing framework                                               https://docs.python.org/3/library/unittest.html
+
+# Project Modules
+from bps_http import HttpResponseParser, summarize
+
+# CLASSES
+#   CLASS 01:       HttpResponseParserTests
+#   DESCRIPTION:    Framing, reuse and title extraction, fed whole and one byte at a time
+class HttpResponseParserTests(unittest.TestCase):
+    def parsed(self, response, step=None, method='GET'):
+        parser = HttpResponseParser(method)
+        step = step or len(response)
+        for i in range(0, len(response), step):
+            if parser.feed(response[i:i + step]):
+                break
+        return parser
+
+    def test_content_length_keeps_connection(self):
+        body = b"<html><title>Welcome &amp; hi</title></html>"
+        response = b"HTTP/1.1 200 OK\r\nServer: nginx\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body)
+        for step in (None, 1):
+            parser = self.parsed(response, step)
+            self.assertEqual((parser.status, parser.reason, parser.title), (200, 'OK', 'Welcome & hi'))
+            self.assertTrue(parser.done and parser.reusable)
+            self.assertEqual(parser.body_bytes, len(body))
+
+    def test_chunked_body(self):
+        response = (b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                    b"7\r\n<title>\r\n5;ext=1\r\nHello\r\n8\r\n</title>\r\n0\r\n\r\n")
+        for step in (None, 1):
+            parser = self.parsed(response, step)
+            self.assertEqual(parser.title, 'Hello')
+            self.assertTrue(parser.done and parser.reusable)
+
+    def test_unframed_body_ends_at_eof(self):
+        parser = self.parsed(b"HTTP/1.0 200 OK\r\n\r\nno title here")
+        self.assertFalse(parser.done)
+        parser.eof()
+        self.assertEqual(parser.state, 'done')
+        self.assertFalse(parser.reusable)
+
+    def test_connection_reuse_rules(self):
+        self.assertFalse(self.parsed(b"HTTP/1.1 204 No Content\r\nConnection: close\r\n\r\n").reusable)
+        self.assertTrue(self.parsed(b"HTTP/1.0 304 Not Modified\r\nConnection: keep-alive\r\n\r\n").reusable)
+        self.assertFalse(self.parsed(b"HTTP/1.0 204 No Content\r\n\r\n").reusable)
+        self.assertTrue(self.parsed(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\n", method='HEAD').done)
+
+    def test_interim_response_is_skipped(self):
+        parser = self.parsed(b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 302 Found\r\nLocation: /login\r\n"
+                             b"Content-Length: 0\r\n\r\n")
+        self.assertEqual((parser.status, parser.headers.get('location')), (302, '/login'))
+        self.assertEqual(summarize([parser.as_dict('/')]), 'HTTP 302 Found | -> /login')
+
+    def test_not_http(self):
+        parser = self.parsed(b"SSH-2.0-OpenSSH_9.6\r\n")
+        self.assertEqual((parser.state, parser.status), ('error', None))
+        self.assertEqual(summarize([]), 'No banner')
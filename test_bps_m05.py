@@ -0,0 +1,205 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Unit tests for the scanner engine: fair-share   #
+#                       limiter, breaker, service intervals and banner  #
+#                       probes; run with: python -m pytest -q           #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import asyncio                      # LIBRARY 01:  Concurrent programming design for high-performance network queues    https://realpython.com/async-io-python/
+import tempfile                     # LIBRARY 02:  Scratch directories for capture files                                https://docs.python.org/3/library/tempfile.html
+import unittest                     # LIBRARY 03:  Unit testing framework                                               https://docs.python.org/3/library/unittest.html
+
+# Project Modules
+from bps_capture import CaptureReader, CaptureWriter
+from bps_m05 import FairShareLimiter, HostHealth, ScanConfig, Scanner, ServiceDatabase, build_service_intervals
+
+# CLASSES
+#   CLASS 01:       FairShareLimiterTests
+#   DESCRIPTION:    Slot accounting of FairShareLimiter and its shares
+class FairShareLimiterTests(unittest.IsolatedAsyncioTestCase):
+    async def queue(self, limiter, share, count):
+        tasks = [asyncio.ensure_future(limiter.acquire(share)) for _ in range(count)]
+        await asyncio.sleep(0)
+        return tasks
+
+    async def test_freed_slot_goes_to_least_served_share(self):
+        limiter = FairShareLimiter(2)
+        big, small = limiter.share('big'), limiter.share('small')
+        await limiter.acquire(big)
+        await limiter.acquire(big)
+        queued = await self.queue(limiter, big, 4) + await self.queue(limiter, small, 2)
+        limiter.release(big)
+        self.assertEqual((big.in_flight, small.in_flight), (1, 1))
+        limiter.release(big)
+        self.assertEqual((big.in_flight, small.in_flight), (1, 1))
+        for task in queued:
+            task.cancel()
+        await asyncio.gather(*queued, return_exceptions=True)
+
+    async def test_slots_split_by_weight(self):
+        limiter = FairShareLimiter(8)
+        holder = limiter.share('holder')
+        for _ in range(8):
+            await limiter.acquire(holder)
+        heavy, light = limiter.share('heavy', 3), limiter.share('light', 1)
+        queued = await self.queue(limiter, heavy, 8) + await self.queue(limiter, light, 8)
+        for _ in range(8):
+            limiter.release(holder)
+        self.assertEqual((heavy.in_flight, light.in_flight), (6, 2))
+        self.assertEqual(limiter.in_use, 8)
+        for task in queued:
+            task.cancel()
+        await asyncio.gather(*queued, return_exceptions=True)
+
+    async def test_uncontended_acquire_skips_queue(self):
+        limiter = FairShareLimiter(2)
+        share = limiter.share('host')
+        async with share:
+            self.assertEqual((limiter.in_use, share.in_flight), (1, 1))
+            self.assertFalse(share.waiters)
+        self.assertEqual((limiter.in_use, share.in_flight), (0, 0))
+        limiter.remove(share)
+        self.assertNotIn(share, limiter.shares)
+
+    async def test_cancelled_waiters_popped_by_release(self):
+        limiter = FairShareLimiter(1)
+        share = limiter.share('host')
+        await limiter.acquire(share)
+        tasks = await self.queue(limiter, share, 3)
+        for task in tasks:
+            task.cancel()
+        limiter.release(share)
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertTrue(all(isinstance(result, asyncio.CancelledError) for result in results))
+        self.assertEqual((limiter.in_use, share.in_flight), (0, 0))
+        self.assertFalse(limiter.waiting)
+        self.assertFalse(share.waiters)
+
+    async def test_cancel_after_grant_passes_slot_on(self):
+        limiter = FairShareLimiter(1)
+        share = limiter.share('host')
+        await limiter.acquire(share)
+        first, second = await self.queue(limiter, share, 2)
+        limiter.release(share)
+        first.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        await second
+        self.assertEqual((limiter.in_use, share.in_flight), (1, 1))
+        self.assertFalse(limiter.waiting)
+
+#   CLASS 02:       HostHealthTests
+#   DESCRIPTION:    Breaker verdicts after health_sample probes
+class HostHealthTests(unittest.TestCase):
+    def sampled(self, *outcomes):
+        health = HostHealth('10.0.0.1', ScanConfig(health_sample=10))
+        for outcome, count in outcomes:
+            for _ in range(count):
+                health.record_connect(outcome)
+        health.evaluate()
+        return health
+
+    def test_silent_host_is_filtered(self):
+        health = self.sampled(('timeout', 10))
+        self.assertEqual(health.state, 'filtered')
+        self.assertFalse(health.admit(1))
+
+    def test_local_errors_do_not_count_toward_filtered(self):
+        health = self.sampled(('error', 50), ('timeout', 9))
+        self.assertEqual(health.state, 'normal')
+        self.assertFalse(health.evaluated)
+        self.assertEqual(health.done, 59)
+        self.assertEqual(self.sampled(('error', 50), ('refused', 10)).state, 'normal')
+
+#   CLASS 03:       ServiceIntervalTests
+#   DESCRIPTION:    Overlapping CSV ranges split into bisectable intervals
+class ServiceIntervalTests(unittest.TestCase):
+    def test_overlaps_split_and_equal_neighbours_merge(self):
+        starts, ends, entries = build_service_intervals([(6000, 6063, 'x11'), (6010, 6010, 'extra'), (80, 80, 'http'),
+                                                         (81, 81, 'http')])
+        self.assertEqual(list(zip(starts, ends, entries)), [(80, 81, ('http',)), (6000, 6009, ('x11',)),
+                                                            (6010, 6010, ('x11', 'extra')), (6011, 6063, ('x11',))])
+        self.assertIs(entries[1], entries[3])
+
+    def test_lookup_and_names(self):
+        services = ServiceDatabase(ranges=[(22, 22, 'ssh'), (22, 22, 'ssh-alt'), (65530, 65535, 'high')])
+        self.assertEqual(services.lookup(22), 'ssh')
+        self.assertEqual(services.names(22), ('ssh', 'ssh-alt'))
+        self.assertEqual(services.lookup(65535), 'high')
+        self.assertEqual(services.lookup(23), 'Unknown Service')
+        self.assertEqual(services.names(1), ())
+
+#   CLASS 04:       HttpPortBannerTests
+#   DESCRIPTION:    A non-HTTP service listening on one of the http_ports keeps its banner and capture
+class HttpPortBannerTests(unittest.IsolatedAsyncioTestCase):
+    async def scan_listener(self, greeting, close):
+        async def serve(reader, writer):
+            writer.write(greeting)
+            await writer.drain()
+            if close:
+                await reader.read(1)
+            else:
+                await asyncio.sleep(5)
+            writer.close()
+
+        server = await asyncio.start_server(serve, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        with tempfile.TemporaryDirectory() as directory:
+            try:
+                with CaptureWriter(directory, target='127.0.0.1') as capture:
+                    config = ScanConfig(start_port=port, end_port=port, http_ports=(port,), banner_timeout=0.3,
+                                        learn_ports=False)
+                    results = [result async for result in Scanner(config, ServiceDatabase({}), capture=capture)
+                               .scan('127.0.0.1')]
+            finally:
+                server.close()
+                await server.wait_closed()
+            with CaptureReader(directory) as reader:
+                captured = [(entry.kind, reader.read(entry)[1]) for entry in reader.entries(port=port)]
+        return results, captured
+
+    async def test_line_based_service(self):
+        results, captured = await self.scan_listener(b"SSH-2.0-OpenSSH_9.6\r\n", close=True)
+        self.assertEqual([result['Banner'] for result in results], ['SSH-2.0-OpenSSH_9.6'])
+        self.assertEqual(captured, [('banner', b"SSH-2.0-OpenSSH_9.6\r\n")])
+
+    async def test_service_that_stalls_after_greeting(self):
+        results, captured = await self.scan_listener(b"+OK ready", close=False)
+        self.assertEqual([result['Banner'] for result in results], ['+OK ready'])
+        self.assertEqual(captured, [('banner', b"+OK ready")])
+
+#   CLASS 05:       ThreadsBackendTests
+#   DESCRIPTION:    The threads backend hands results, progress and unscanned ports back to the loop
+class ThreadsBackendTests(unittest.IsolatedAsyncioTestCase):
+    async def test_results_and_progress_reach_the_loop(self):
+        server = await asyncio.start_server(lambda reader, writer: writer.close(), '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        scanner = Scanner(ScanConfig(backend='threads', batch_size=7, max_concurrency=16, timeout=0.3),
+                          ServiceDatabase(ranges=[(port, port, 'listener')]))
+        results = []
+        try:
+            await scanner.port_scan_threads('127.0.0.1', range(port - 20, port + 20), results.append)
+        finally:
+            server.close()
+            await server.wait_closed()
+        self.assertEqual([(result['Port'], result['Service']) for result in results], [(port, 'listener')])
+        self.assertEqual(scanner.ports_done, 40)
+
+    async def test_stopped_scan_leaves_ports_unscanned(self):
+        scanner = Scanner(ScanConfig(backend='threads'), ServiceDatabase({}))
+        scanner.stopping = True
+        unscanned = []
+        await scanner.port_scan_threads('127.0.0.1', [1, 2, 3], unscanned.append, unscanned)
+        self.assertEqual((unscanned, scanner.ports_done), ([1, 2, 3], 0))
@@ -0,0 +1,92 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Unit tests for the socket tuning module: source #
+#                       pools bound across loopback aliases and socket  #
+#                       budgets; run with: python -m pytest -q          #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import asyncio                      # LIBRARY 01:  Concurrent programming design for high-performance network queues    https://realpython.com/async-io-python/
+import collections                  # LIBRARY 02:  Counting the peer addresses a listener accepted                      https://docs.python.org/3/library/collections.html
+import unittest                     # LIBRARY 03:  Unit testing framework                                               https://docs.python.org/3/library/unittest.html
+from unittest import mock           # LIBRARY 04:  Fixing the open-file limit the budget reads                          https://docs.python.org/3/library/unittest.mock.html
+
+# Project Modules
+from bps_m05 import ScanConfig, Scanner, ServiceDatabase
+from bps_sockets import FD_RESERVE, SourcePool, socket_budget
+
+# CONSTANT VARIABLES
+SOURCES = ('127.0.0.1', '127.0.0.2', '127.0.0.3')
+
+# CLASSES
+#   CLASS 01:       SourcePoolTests
+#   DESCRIPTION:    Probes bound round-robin across loopback aliases, as seen by a local listener
+class SourcePoolTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.peers = []
+        self.servers = [await asyncio.start_server(self.accept, '127.0.0.1', 0) for _ in range(2 * len(SOURCES))]
+        self.ports = sorted(server.sockets[0].getsockname()[1] for server in self.servers)
+        self.scanner = Scanner(ScanConfig(source_addresses=SOURCES, banner_timeout=0.2, learn_ports=False),
+                               ServiceDatabase({}))
+
+    async def asyncTearDown(self):
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+
+    async def accept(self, reader, writer):
+        self.peers.append(writer.get_extra_info('peername')[0])
+        writer.close()
+
+    async def test_connects_cycle_through_sources(self):
+        for connects in range(1, 2 * len(SOURCES) + 1):
+            sock = await self.scanner.open_probe('127.0.0.1', self.ports[0])
+            sock.close()
+            while len(self.peers) < connects:
+                await asyncio.sleep(0.01)
+        self.assertEqual(self.peers, list(SOURCES) * 2)
+
+    async def test_scan_spreads_ports_and_counts_usage(self):
+        results = []
+        await self.scanner.port_scan('127.0.0.1', results.append, ports=self.ports)
+        self.assertEqual(sorted(result['Port'] for result in results), self.ports)
+        self.assertEqual(collections.Counter(self.peers), {source: 2 for source in SOURCES})
+        self.assertEqual(self.scanner.sources.usage,
+                         {source: {'connects': 2, 'open': 2, 'exhausted': 0} for source in SOURCES})
+        self.assertIn("127.0.0.3", self.scanner.sources.summary())
+
+    def test_unbindable_source_is_named(self):
+        pool = SourcePool(['127.0.0.1', '127.0.0.1', '192.0.2.1'])
+        self.assertEqual(len(pool), 2)
+        with self.assertRaisesRegex(ValueError, "192.0.2.1"):
+            pool.check()
+
+#   CLASS 02:       SocketBudgetTests
+#   DESCRIPTION:    Limits that shaped the budget are reported whether concurrency was requested or auto
+class SocketBudgetTests(unittest.TestCase):
+    def budget(self, requested, fd_limit=1024):
+        with mock.patch('bps_sockets.nofile_limit', return_value=fd_limit):
+            return socket_budget(requested)
+
+    def test_auto_mode_keeps_reasons(self):
+        budget = self.budget(None)
+        self.assertEqual(budget.limit, 1024 - FD_RESERVE)
+        self.assertTrue(budget.throttled)
+        self.assertIn("RLIMIT_NOFILE is 1024", budget.summary())
+        self.assertTrue(budget.summary().startswith("Concurrency auto-sized"))
+
+    def test_requested_within_limits(self):
+        budget = self.budget(100)
+        self.assertEqual((budget.limit, budget.reasons), (100, []))
+        self.assertTrue(self.budget(5000).summary().startswith(f"Concurrency throttled to {1024 - FD_RESERVE}"))
@@ -0,0 +1,118 @@
+# ----------------------------------------------------------------------#
+# FILE PROPERTIES AND AUTHOR INFO                                       #
+#   fileName            basic_port_scanner                              #
+#   fileType            Python 3 Script (.py)                           #
+#   language            Python (v3.12)                                  #
+#   author              Jeret E. Obermeyer                              #
+#   courseNum           IS-4543-002                                     #
+#                                                                       #
+# COURSE PROJECT: PRELIM INFORMATION                                    #
+#   projName            Automated Port Scanner with Service Detection   #
+#   projDesc            Unit tests for the result writers: packed file  #
+#                       round trips, sidecar metadata and the results   #
+#                       store; run with: python -m pytest -q            #
+#                                                                       #
+#                 Copyright (c) 2024, UT at San Antonio                 #
+# ----------------------------------------------------------------------#
+
+# Python Standard Library
+# MODULES                           LIBRARY TYPE                                                                        SOURCE CODE
+import contextlib                   # LIBRARY 01:  Silencing the usage message of a rejected argument                   https://docs.python.org/3/library/contextlib.html
+import io                           # LIBRARY 02:  In-memory stream for that usage message                              https://docs.python.org/3/library/io.html
+import json                         # LIBRARY 03:  JSON encoder and decoder                                             https://docs.python.org/3/library/json.html
+import os                           # LIBRARY 04:  Miscellaneous operating system interfaces                            https://docs.python.org/3/library/os.html
+import tempfile                     # LIBRARY 05:  Scratch directories for written result files                         https://docs.python.org/3/library/tempfile.html
+import unittest                     # LIBRARY 06:  Unit testing framework                                               https://docs.python.org/3/library/unittest.html
+
+# Project Modules
+from bps_store import ResultStore, parse_arguments
+from bps_writers import PACKED_MAGIC, open_writer, read_packed
+
+# CONSTANT VARIABLES
+ROWS = [
+    {'Host': '10.0.0.1', 'Port': 22, 'Service': 'ssh', 'Status': 'Open', 'Banner': 'SSH-2.0-OpenSSH_9.6', 'Flags': ''},
+    {'Host': '10.0.0.1', 'Port': 80, 'Service': 'http', 'Status': 'Open', 'Banner': 'HTTP 200 OK | Grüße, "a,b"\nx',
+     'Flags': 'mute'},
+    {'Host': '10.0.0.2', 'Port': 65535, 'Service': 'Unknown Service', 'Status': 'Open', 'Banner': '', 'Flags': ''},
+]
+
+# CLASSES
+#   CLASS 01:       PackedRoundTripTests
+#   DESCRIPTION:    Rows and metadata written by PackedWriter come back unchanged from read_packed
+class PackedRoundTripTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'scan.bpsr')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def written(self, rows, batch_size=1000, metadata=None):
+        with open_writer(self.path, metadata=metadata, batch_size=batch_size) as writer:
+            for row in rows:
+                writer.write(row)
+        return read_packed(self.path)
+
+    def test_rows_and_metadata_round_trip(self):
+        metadata, rows = self.written(ROWS, metadata={'target': '10.0.0.0/30', 'ports': [1, 65535]})
+        self.assertEqual(metadata['target'], '10.0.0.0/30')
+        self.assertEqual(metadata['columns'], list(ROWS[0]))
+        self.assertEqual(list(rows), ROWS)
+
+    def test_many_blocks_round_trip(self):
+        many = [dict(ROWS[0], Port=port) for port in range(1, 1001)]
+        _, rows = self.written(many, batch_size=64)
+        self.assertEqual(list(rows), many)
+
+    def test_missing_values_read_back_empty(self):
+        _, rows = self.written([dict(ROWS[0], Banner=None)])
+        self.assertEqual(next(rows)['Banner'], '')
+
+    def test_empty_file_has_header_only(self):
+        metadata, rows = self.written([])
+        self.assertEqual(list(rows), [])
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(4), PACKED_MAGIC)
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as file:
+            file.write(b"Host,Port\n")
+        with self.assertRaises(ValueError):
+            read_packed(self.path)
+
+#   CLASS 02:       SidecarTests
+#   DESCRIPTION:    CSV and JSON Lines sidecars carry metadata added by annotate() before close
+class SidecarTests(unittest.TestCase):
+    def test_annotate_reaches_sidecar(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ('scan.csv', 'scan.jsonl'):
+                path = os.path.join(directory, name)
+                with open_writer(path, metadata={'target': '10.0.0.1'}) as writer:
+                    writer.write(ROWS[0])
+                    writer.annotate(unscanned={'ports': 3})
+                with open(path + '.meta.json', encoding='utf-8') as file:
+                    sidecar = json.load(file)
+                self.assertEqual((sidecar['target'], sidecar['unscanned']), ('10.0.0.1', {'ports': 3}))
+                self.assertEqual(writer.rows_written, 1)
+
+    def test_unknown_extension_is_rejected(self):
+        with self.assertRaises(ValueError):
+            open_writer('scan.txt')
+
+#   CLASS 03:       StoreTests
+#   DESCRIPTION:    The results store dates each row by the time its port was seen, not by the batch flush
+class StoreTests(unittest.TestCase):
+    def test_rows_keep_their_seen_time(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'history.db')
+            with open_writer(path, metadata={'target': '10.0.0.0/30'}) as writer:
+                writer.write(dict(ROWS[0], Seen=1700000000.5))
+                writer.write(dict(ROWS[2], Seen=1700000090.0))
+            with ResultStore(path) as store:
+                seen = [(row['port'], row['seen']) for row in store.query()]
+        self.assertEqual(seen, [(65535, 1700000090.0), (22, 1700000000.5)])
+
+    def test_malformed_since_is_a_usage_error(self):
+        with contextlib.redirect_stderr(io.StringIO()) as stderr, self.assertRaises(SystemExit):
+            parse_arguments().parse_args(['query', 'history.db', '--since', 'last tuesday'])
+        self.assertIn("--since", stderr.getvalue())